@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    # Every index, store and cache a module keeps next to the scripts goes to tmp_path
+    import vr_backup, vr_bepinex, vr_build_cache, vr_fingerprint, vr_preflight
+    import vr_patch, vr_provision, vr_steam, vr_store, vr_timing
+    state = tmp_path / "_state"
+    state.mkdir()
+    for mod, attr in ((vr_preflight, "INDEX_FILE"), (vr_provision, "INDEX_FILE"),
+                      (vr_steam, "INDEX_FILE"), (vr_bepinex, "INDEX_FILE"),
+                      (vr_timing, "INDEX_FILE"), (vr_store, "LAUNCHER_DB"), (vr_store, "WRAPPER_DB"),
+                      (vr_patch, "LAUNCHER_CONFIG"), (vr_patch, "WRAPPER_CONFIG")):
+        monkeypatch.setattr(mod, attr, str(state / f"{mod.__name__}.{attr}"))
+    monkeypatch.setattr(vr_fingerprint, "_default", vr_fingerprint.HashCache(str(state / "fp.json")))
+    monkeypatch.setattr(vr_backup, "_default", vr_backup.BackupStore(str(state / "backups")))
+    monkeypatch.setattr(vr_build_cache, "_default", vr_build_cache.BuildCache(str(state / "builds")))
+    return state
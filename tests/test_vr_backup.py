@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from vr_backup import BackupStore, place
+from vr_fingerprint import HashCache
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BackupStore(str(tmp_path / "backups"), HashCache(str(tmp_path / "fp.json")))
+
+
+def _game(tmp_path, data=b"MZ original"):
+    folder = tmp_path / "Game"
+    folder.mkdir(exist_ok=True)
+    exe = folder / "Game.exe"
+    exe.write_bytes(data)
+    return str(folder), str(exe)
+
+
+def test_live_exe_is_never_hardlinked(tmp_path, store):
+    folder, exe = _game(tmp_path)
+    sha, method = store.add(exe, folder, "Game.exe")
+    assert method in ("reflink", "copy")
+    assert os.stat(exe).st_nlink == 1
+    # an updater writing the EXE in place leaves the backup intact
+    with open(exe, "r+b") as f:
+        f.write(b"XX")
+    assert store.entries()[0][2]
+    assert store.add(exe, folder, "Game.exe")[1] != "stored"
+
+
+def test_allow_link_for_files_about_to_be_replaced(tmp_path):
+    src = tmp_path / "a"
+    src.write_bytes(b"x")
+    method = place(str(src), str(tmp_path / "b"), allow_link=True)
+    assert method in ("reflink", "hardlink")
+    assert place(str(src), str(tmp_path / "c"), allow_link=False) in ("reflink", "copy")
+    assert (tmp_path / "c").read_bytes() == b"x" and not list(tmp_path.glob("*.tmp"))
+
+
+def test_restore_release_and_damage(tmp_path, store):
+    folder, exe = _game(tmp_path)
+    sha, _ = store.add(exe, folder, "Game.exe")
+    assert store.add(exe, folder, "Game.exe") == (sha, "stored")
+    assert store.latest(folder, "Game.exe") == sha
+    dest = str(tmp_path / "restored.exe")
+    store.restore(sha, dest)
+    assert open(dest, "rb").read() == b"MZ original"
+
+    with open(store._blob(sha), "ab") as f:
+        f.write(b"!")
+    with pytest.raises(OSError, match="damaged"):
+        store.restore(sha, dest)
+    assert store.release(folder, "Game.exe") == 1
+    assert store.latest(folder, "Game.exe") is None and not os.path.exists(store._blob(sha))
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import vr_batch
+import vr_patch
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    # Every patch operation run_operation can reach, recording its name and succeeding
+    seen = []
+    for name in ("apply_launcher", "remove_launcher", "launcher_status",
+                 "apply_wrapper", "undo_wrapper", "wrapper_status"):
+        monkeypatch.setattr(vr_patch, name, lambda *a, _n=name, **k: seen.append(_n) or True)
+    return seen
+
+
+def _entry(tool, folder, **extra):
+    p = {"folder": str(folder), "exe": "Game.exe", **extra}
+    return vr_batch.make_entry(tool, "Game", p, "test")
+
+
+@pytest.mark.parametrize("tool,action,op", [
+    ("launcher", "apply", "apply_launcher"), ("launcher", "remove", "remove_launcher"),
+    ("launcher", "check", "launcher_status"), ("wrapper", "apply", "apply_wrapper"),
+    ("wrapper", "undo", "undo_wrapper"), ("wrapper", "remove", "undo_wrapper"),
+    ("wrapper", "check", "wrapper_status"),
+])
+def test_run_operation_dispatch(tmp_path, calls, tool, action, op):
+    assert vr_batch.run_operation(tool, action, _entry(tool, tmp_path), lambda *a: None)
+    assert calls == [op]
+
+
+@pytest.mark.parametrize("tool,action", [("launcher", "undo"), ("wrapper", "frobnicate"), ("nope", "apply")])
+def test_run_operation_rejects_unknown_actions(tmp_path, calls, tool, action):
+    lines = []
+    entry = {"folder": str(tmp_path), "exe": "Game.exe"}
+    assert vr_batch.run_operation(tool, action, entry, lambda m, t="info": lines.append((t, m))) is False
+    assert calls == [] and lines[0][0] == "err"
+
+
+def test_run_operation_missing_folder(tmp_path, calls):
+    assert not vr_batch.run_operation("wrapper", "apply", _entry("wrapper", tmp_path / "gone"),
+                                      lambda *a: None)
+    assert calls == []
+
+
+def test_make_entry_defaults_and_errors(tmp_path):
+    e = _entry("launcher", tmp_path)
+    assert (e["launcher_name"], e["mode"], e["args"]) == ("GameLauncher.exe", "exe", vr_patch.DEFAULT_ARGS)
+    assert _entry("launcher", tmp_path, launcher_name="VR")["launcher_name"] == "VR.exe"
+    for bad in ({"exe": ""}, {"mode": "magic"}, {"presets": ["nope"]}, {"affinity": "x"}):
+        with pytest.raises(ValueError, match="test: entry 'Game'"):
+            vr_batch.make_entry("launcher", "Game", {"folder": str(tmp_path), "exe": "Game.exe", **bad}, "test")
+
+
+def _manifest(tmp_path, entries):
+    path = tmp_path / "games.json"
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return str(path)
+
+
+def test_main_exit_codes(tmp_path, monkeypatch, calls, capsys):
+    ok, bad = tmp_path / "ok", tmp_path / "missing"
+    ok.mkdir()
+    good = _manifest(tmp_path, [{"name": "ok", "folder": str(ok), "exe": "Game.exe"}])
+    assert vr_batch.main("wrapper", ["check", "--manifest", good]) == 0
+    assert calls == ["wrapper_status"]
+
+    mixed = _manifest(tmp_path, [{"name": "ok", "folder": str(ok), "exe": "Game.exe"},
+                                 {"name": "bad", "folder": str(bad), "exe": "Game.exe"}])
+    assert vr_batch.main("wrapper", ["undo", "--manifest", mixed, "-j", "2"]) == 1
+    assert vr_batch.main("wrapper", ["undo", "--manifest", mixed, "--only", "nobody"]) == 2
+    assert vr_batch.main("wrapper", ["check", "--manifest", str(tmp_path / "none.json")]) == 2
+    with pytest.raises(SystemExit) as e:
+        vr_batch.main("launcher", ["undo", "--manifest", good])
+    assert e.value.code == 2
+
+    monkeypatch.setattr(vr_patch, "find_compiler", lambda log=None: None)
+    assert vr_batch.main("launcher", ["apply", "--manifest", good, "--no-steam-options"]) == 2
+    assert "no C# compiler" in capsys.readouterr().err
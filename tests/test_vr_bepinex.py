@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+import vr_bepinex
+
+HEADER = "[Message:   BepInEx] BepInEx 5.4.21.0 - SubnauticaZero ({when})\n"
+START = ("[Info   :   BepInEx] Running under Unity v2019.4.36\n"
+         '[Info   :   BepInEx] Command line: "C:\\Games\\SubnauticaZero.exe" {cmd}\n'
+         "[Info   :   BepInEx] Loading [Nautilus 1.0.0.34]\n"
+         "[Error  :   BepInEx] Error loading [BadMod 1.2]\n"
+         "[Info   :   BepInEx] Skipping [Picky 0.1]\n")
+DONE = "[Message:   BepInEx] Chainloader startup complete\n"
+
+
+def _log(folder, text, mode="w"):
+    path = os.path.join(folder, vr_bepinex.LOG_REL)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, mode, encoding="utf-8", newline="") as f:
+        f.write(text)
+    return path
+
+
+def _session(tmp_path):
+    return vr_bepinex.session(str(tmp_path), str(tmp_path / "index.json"))[0]
+
+
+def _launch(when="10/18/2026 12:00:00", cmd="-vrmode openvr"):
+    return HEADER.format(when=when) + START.format(cmd=cmd)
+
+
+def test_session_parse(tmp_path):
+    _log(str(tmp_path), _launch() + DONE)
+    s = _session(tmp_path)
+    assert (s["bepinex"], s["game"], s["started"], s["unity"]) == \
+        ("5.4.21.0", "SubnauticaZero", "10/18/2026 12:00:00", "2019.4.36")
+    assert s["command_line"].endswith("-vrmode openvr")
+    assert s["plugins"] == {"Nautilus": "loaded", "BadMod": "failed", "Picky": "skipped"}
+    assert s["chainloader_done"] and len(s["errors"]) == 1
+    assert vr_bepinex.session(str(tmp_path / "nothing")) is None
+
+
+def test_only_new_bytes_are_read_and_half_lines_wait(tmp_path):
+    path = _log(str(tmp_path), _launch())
+    assert not _session(tmp_path)["chainloader_done"]
+    offset = os.path.getsize(path)
+    _log(str(tmp_path), "[Info   :   BepInEx] Loading [Late 2.0]\n[Message:   BepInEx] Chainloader", "a")
+    s = _session(tmp_path)
+    assert s["plugins"]["Late"] == "loaded" and not s["chainloader_done"]
+    entry = vr_bepinex.load_index(str(tmp_path / "index.json"))["logs"].popitem()[1]
+    assert entry["offset"] == offset + len("[Info   :   BepInEx] Loading [Late 2.0]\n")
+    _log(str(tmp_path), " startup complete\n", "a")
+    assert _session(tmp_path)["chainloader_done"]
+
+
+def test_rewritten_log_starts_a_new_session(tmp_path):
+    _log(str(tmp_path), _launch() + DONE + "[Error  :   X] boom\n" * 3)
+    assert len(_session(tmp_path)["errors"]) == 4
+    _log(str(tmp_path), _launch(when="10/18/2026 13:00:00", cmd="-vrmode oculus") + DONE + "x" * 500 + "\n")
+    s = _session(tmp_path)
+    assert s["started"] == "10/18/2026 13:00:00" and s["command_line"].endswith("oculus")
+    assert len(s["errors"]) == 1
+
+
+def test_big_first_look_reads_head_and_tail_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(vr_bepinex, "HEAD_BYTES", 1024)
+    monkeypatch.setattr(vr_bepinex, "TAIL_BYTES", 1024)
+    middle = "[Error  :   Spam] hidden in the middle\n" * 200
+    _log(str(tmp_path), _launch() + middle + "[Error  :   Mod] the last error\n" + DONE)
+    s = _session(tmp_path)
+    assert s["command_line"] and s["chainloader_done"]
+    assert s["errors"][-1].endswith("the last error")
+    assert all(e.startswith("[Error") for e in s["errors"])      # tail read started mid-line
+
+
+@pytest.mark.parametrize("cmd,args,tag,text", [
+    ("-vrmode openvr -nolog", "-vrmode openvr -nolog", "ok", "took effect"),
+    ("-vrmode none -vrmode openvr", "-vrmode openvr", "err", "-vrmode none reached the game first"),
+    ("-screen-fullscreen 0", "-vrmode openvr", "err", "not on the command line"),
+    ("-vrmode OpenVR", "-vrmode openvr -nolog", "warn", "Not on the command line: -nolog"),
+])
+def test_verify_vrmode(tmp_path, cmd, args, tag, text):
+    _log(str(tmp_path), _launch(cmd=cmd) + DONE)
+    results = vr_bepinex.verify(_session(tmp_path), args)
+    assert results[0][0] == "info"
+    assert results[1][0] == tag and text in results[1][1]
+
+
+def test_verify_plugins(tmp_path):
+    _log(str(tmp_path), _launch())
+    msgs = dict((m, t) for t, m in vr_bepinex.verify(_session(tmp_path), ""))
+    assert msgs["BepInEx plugins: 1 loaded, 1 failed (BadMod), 1 skipped (Picky)"] == "warn"
+    assert msgs["Plugin loading never finished (crashed or still starting)"] == "warn"
+    assert msgs["Nautilus: loaded"] == "ok"
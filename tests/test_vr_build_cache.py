@@ -0,0 +1,81 @@
+import os
+
+from vr_build_cache import BuildCache, place_file
+
+
+def _built(tmp_path, name="out.exe", data=b"MZ built"):
+    p = tmp_path / name
+    p.write_bytes(data)
+    return str(p)
+
+
+def test_key_depends_on_compiler_flags_and_source(tmp_path):
+    csc = _built(tmp_path, "csc.exe", b"compiler")
+    cache = BuildCache(str(tmp_path / "c"))
+    base = cache.key(csc, ["/target:exe"], "class A {}")
+    assert base == cache.key(csc, ["/target:exe"], "class A {}")
+    assert base != cache.key(csc, ["/target:winexe"], "class A {}")
+    assert base != cache.key(csc, ["/target:exe"], "class B {}")
+    os.utime(csc, ns=(1, 1))
+    assert base != cache.key(csc, ["/target:exe"], "class A {}")
+
+
+def test_store_then_fetch(tmp_path):
+    cache = BuildCache(str(tmp_path / "c"))
+    key = cache.key("csc", [], "src")
+    dest = str(tmp_path / "game.exe")
+    assert not cache.fetch(key, dest)
+    cache.store(key, _built(tmp_path))
+    assert cache.fetch(key, dest)
+    assert open(dest, "rb").read() == b"MZ built"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_fetch_drops_entry_changed_in_place(tmp_path):
+    cache = BuildCache(str(tmp_path / "c"))
+    key = cache.key("csc", [], "src")
+    cache.store(key, _built(tmp_path))
+    with open(cache._entry(key), "ab") as f:
+        f.write(b"tampered")
+    assert not cache.fetch(key, str(tmp_path / "game.exe"))
+    assert not os.path.exists(cache._entry(key))
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = BuildCache(str(tmp_path / "c"))
+    keys = [cache.key("csc", [], f"src{i}") for i in range(3)]
+    for key in keys:
+        cache.store(key, _built(tmp_path, data=b"x" * 10))
+    cache._save_index({keys[0]: 1.0, keys[1]: 2.0, keys[2]: 3.0})
+    cache.fetch(keys[0], str(tmp_path / "game.exe"))      # now the most recently used
+    cache.limit = 25
+    cache.store(cache.key("csc", [], "new"), _built(tmp_path, data=b"y" * 10))
+    assert os.path.exists(cache._entry(keys[0]))
+    assert not os.path.exists(cache._entry(keys[1]))
+    assert not os.path.exists(cache._entry(keys[2]))
+    assert sorted(cache._load_index()) == sorted([keys[0], cache.key("csc", [], "new")])
+
+
+def test_fetched_copy_shares_nothing_with_the_entry(tmp_path):
+    cache = BuildCache(str(tmp_path / "c"))
+    key = cache.key("csc", [], "src")
+    cache.store(key, _built(tmp_path))
+    games = [str(tmp_path / f"game{i}.exe") for i in range(2)]
+    assert cache.fetch(key, games[0])
+    os.utime(games[0], ns=(5, 5))
+    entry_mtime = os.stat(cache._entry(key)).st_mtime_ns
+    assert cache.fetch(key, games[1])
+    assert os.stat(games[0]).st_mtime_ns == 5                 # a hit touches no other copy
+    assert os.stat(cache._entry(key)).st_mtime_ns == entry_mtime
+    assert os.stat(games[0]).st_nlink == 1
+    with open(games[0], "r+b") as f:                         # an updater writing in place
+        f.write(b"XX")
+    assert cache.fetch(key, games[1]) and open(games[1], "rb").read() == b"MZ built"
+
+
+def test_place_file_replaces_existing(tmp_path):
+    src = _built(tmp_path, "src.exe", b"new")
+    dest = _built(tmp_path, "dest.exe", b"old")
+    place_file(src, dest)
+    assert open(dest, "rb").read() == b"new"
+    assert not os.path.exists(dest + ".vrtmp")
@@ -0,0 +1,49 @@
+import os
+
+import vr_compilers
+from vr_compilers import DotnetCsc, MonoMcs, NetFxCsc, RoslynCsc
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+    return path
+
+
+def test_roslyn_uses_the_server_only_when_vbcscompiler_is_beside_it(tmp_path):
+    vs = _touch(str(tmp_path / "vs" / "csc.exe"))
+    _touch(str(tmp_path / "vs" / "VBCSCompiler.exe"))
+    cmd = RoslynCsc(vs).command("o.exe", "exe", True, "a.cs")
+    assert RoslynCsc(vs).server
+    assert cmd == [vs, "/nologo", "/shared", f"/keepalive:{vr_compilers.KEEPALIVE}",
+                   "/out:o.exe", "/target:exe", "/optimize+", "a.cs"]
+
+
+def test_roslyn_wrapper_script_compiles_without_shared(tmp_path):
+    script = _touch(str(tmp_path / "bin" / "csc"))
+    comp = RoslynCsc(script)
+    assert not comp.server and "[server]" not in comp.describe()
+    cmd = comp.command("o.exe", "winexe", False, "a.cs")
+    assert not any(a.startswith(("/shared", "/keepalive")) for a in cmd)
+    assert cmd[-2:] == ["/target:winexe", "a.cs"]
+
+
+def test_flags_are_what_the_cache_keys_on():
+    assert NetFxCsc("csc").flags("exe", True) == ["/target:exe", "/optimize+"]
+    assert MonoMcs("mcs").command("o.exe", "exe", False, "a.cs") == ["mcs", "-out:o.exe", "-target:exe", "a.cs"]
+    d = DotnetCsc("dotnet", "csc.dll", ["/r/mscorlib.dll"])
+    assert d.flags("exe", False) == ["-noconfig", "-nostdlib", "-r:/r/mscorlib.dll", "-target:exe"]
+    assert d.command("o.exe", "exe", False, "a.cs")[:4] == ["dotnet", "csc.dll", "-nologo", "-shared"]
+
+
+def test_detect_and_choose(tmp_path, monkeypatch):
+    monkeypatch.setattr(vr_compilers, "ROSLYN_GLOBS", [])
+    monkeypatch.setattr(vr_compilers.shutil, "which", lambda name: None)
+    monkeypatch.setattr(vr_compilers, "_detect_dotnet", lambda: (None, "dotnet not found"))
+    monkeypatch.delenv("VR_COMPILER", raising=False)
+    netfx = _touch(str(tmp_path / "csc.exe"))
+    results = vr_compilers.detect([str(tmp_path / "missing.exe"), netfx])
+    assert [k for k, _, _ in results] == list(vr_compilers.ORDER)
+    chosen = vr_compilers.choose(results)
+    assert isinstance(chosen, NetFxCsc) and chosen.path == netfx
+    assert vr_compilers.choose(results, "mono-mcs") is None
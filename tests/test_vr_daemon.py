@@ -0,0 +1,189 @@
+import json
+import os
+import socket
+import stat
+import threading
+import types
+
+import pytest
+
+import vr_batch
+import vr_daemon
+
+
+@pytest.fixture
+def service():
+    svc = vr_daemon.Service(jobs=2)
+    yield svc
+    svc.close()
+
+
+class Conn:
+    # A _Handler on one end of a socketpair, the test as the client on the other
+    def __init__(self, service, token=None):
+        self.sock, theirs = socket.socketpair()
+        server = types.SimpleNamespace(service=service, token=token)
+        self.thread = threading.Thread(target=self._serve, args=(theirs, server), daemon=True)
+        self.thread.start()
+        self.f = self.sock.makefile("rwb")
+
+    @staticmethod
+    def _serve(sock, server):
+        with sock:
+            vr_daemon._Handler(sock, "socketpair", server)
+
+    def send(self, msg):
+        self.f.write(msg if isinstance(msg, bytes) else (json.dumps(msg) + "\n").encode("utf-8"))
+        self.f.flush()
+
+    def recv(self):
+        line = self.f.readline()
+        return json.loads(line) if line else None
+
+    def request(self, method, params=None, rid=1, **extra):
+        self.send(dict({"jsonrpc": "2.0", "id": rid, "method": method, "params": params or {}}, **extra))
+        return self.recv()
+
+    def close(self):
+        self.f.close()
+        self.sock.close()
+        self.thread.join(5)
+
+
+@pytest.fixture
+def conn(service):
+    c = Conn(service)
+    yield c
+    c.close()
+
+
+def test_ping_round_trip(conn):
+    reply = conn.request("ping", rid=7)
+    assert reply["jsonrpc"] == "2.0" and reply["id"] == 7
+    assert reply["result"]["pid"] == os.getpid()
+
+
+@pytest.mark.parametrize("line, code", [
+    (b'{"jsonrpc": "2.0", "id": 1, "method": \n', vr_daemon.PARSE_ERROR),
+    (b'{"id": 1, "method": "ping"}\n', vr_daemon.INVALID_REQUEST),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": 5}\n', vr_daemon.INVALID_REQUEST),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "nope"}\n', vr_daemon.METHOD_NOT_FOUND),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "ping", "params": [1]}\n', vr_daemon.INVALID_PARAMS),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "profiles.list", "params": {"tool": "x"}}\n',
+     vr_daemon.INVALID_PARAMS),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "profiles.get", '
+     b'"params": {"tool": "wrapper", "name": "Missing"}}\n', vr_daemon.NOT_FOUND),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "status", '
+     b'"params": {"tool": "wrapper", "profile": "A", "entry": {}}}\n', vr_daemon.INVALID_PARAMS),
+])
+def test_error_codes(conn, line, code):
+    conn.send(line)
+    reply = conn.recv()
+    assert reply["error"]["code"] == code
+    assert reply["id"] == (None if code == vr_daemon.PARSE_ERROR else 1)
+
+
+def test_notifications_get_no_reply_and_blank_lines_are_skipped(conn):
+    conn.send(b'\n{"jsonrpc": "2.0", "method": "ping"}\n')
+    assert conn.request("ping", rid=2)["id"] == 2
+
+
+def test_non_json_rpc_drops_the_connection(conn):
+    conn.send(b"GET / HTTP/1.1\r\n")
+    assert conn.recv() is None
+
+
+def test_profiles_crud(conn, tmp_path):
+    game = tmp_path / "Game"
+    game.mkdir()
+    profile = {"folder": str(game), "exe": "Game.exe", "args": "-vrmode openvr"}
+    put = {"tool": "wrapper", "name": "BZ", "profile": profile}
+    assert conn.request("profiles.put", put)["result"] == {"changed": True}
+    assert conn.request("profiles.put", put)["result"] == {"changed": False}
+    assert conn.request("profiles.get", {"tool": "wrapper", "name": "BZ"})["result"] == profile
+    assert list(conn.request("profiles.list", {"tool": "wrapper"})["result"]) == ["BZ"]
+    bad = dict(put, profile={"folder": str(game)})
+    assert conn.request("profiles.put", bad)["error"]["code"] == vr_daemon.INVALID_PARAMS
+    assert conn.request("profiles.delete", {"tool": "wrapper", "name": "BZ"})["result"] == {"deleted": True}
+
+
+def test_auth_token_is_checked(service):
+    c = Conn(service, token="s3cret")
+    try:
+        assert c.request("ping")["error"]["code"] == vr_daemon.UNAUTHORIZED
+        assert c.request("ping", auth="wrong")["error"]["code"] == vr_daemon.UNAUTHORIZED
+        assert c.request("ping", auth="s3cret")["result"]["pid"] == os.getpid()
+    finally:
+        c.close()
+
+
+def test_progress_is_streamed_before_the_result(conn, service, monkeypatch):
+    monkeypatch.setattr(service, "_entry", lambda tool, params: {"folder": params["folder"]})
+
+    def run(tool, action, entry, log):
+        log("checking", "info")
+        log("all good", "ok")
+        return True
+    monkeypatch.setattr(vr_batch, "run_operation", run)
+    conn.send({"jsonrpc": "2.0", "id": 3, "method": "status", "params": {"tool": "wrapper", "folder": "A"}})
+    msgs = [conn.recv() for _ in range(3)]
+    assert [m["params"]["message"] for m in msgs[:2]] == ["checking", "all good"]
+    assert msgs[0]["method"] == "progress" and msgs[1]["params"] == {"id": 3, "tag": "ok", "message": "all good"}
+    assert msgs[2]["id"] == 3 and msgs[2]["result"]["ok"] is True
+
+
+def test_queued_folder_does_not_hold_a_job_slot(service, monkeypatch):
+    # jobs=2: A runs, a second A waits for its folder, B must still get the other slot
+    monkeypatch.setattr(service, "_entry", lambda tool, params: {"folder": params["folder"]})
+    release, running, queued, started = threading.Event(), threading.Event(), threading.Event(), []
+
+    def run(tool, action, entry, log):
+        started.append(entry["folder"])
+        if entry["folder"] == "A":
+            running.set()
+            release.wait(10)
+        return True
+    monkeypatch.setattr(vr_batch, "run_operation", run)
+
+    def op(folder, progress=lambda msg, tag="info": None):
+        return service.call("status", {"tool": "wrapper", "folder": folder}, progress)
+    first = threading.Thread(target=op, args=("A",))
+    first.start()
+    assert running.wait(5)
+    second = threading.Thread(target=op, args=("A", lambda msg, tag="info": queued.set()))
+    second.start()
+    assert queued.wait(5)               # "Waiting for another operation on this folder…"
+    done = []
+    other = threading.Thread(target=lambda: done.append(op("B")))
+    other.start()
+    other.join(5)
+    try:
+        assert done and done[0]["ok"] and started == ["A", "B"]
+    finally:
+        release.set()
+        first.join(5)
+        second.join(5)
+    assert started == ["A", "B", "A"]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="no Unix sockets")
+def test_unix_socket_is_private_and_has_no_token(service, tmp_path):
+    path = str(tmp_path / "d.sock")
+    server = vr_daemon.make_server(service, path=path)
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert server.token is None and server.endpoint["unix"] == path
+        with pytest.raises(OSError, match="already listening"):
+            vr_daemon.make_server(service, path=path)
+    finally:
+        server.server_close()
+        os.remove(path)
+
+
+def test_tcp_server_gets_a_random_token(service):
+    server = vr_daemon.make_server(service, port=0)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        assert len(server.token) == 32 and server.endpoint["token"] == server.token
+    finally:
+        server.server_close()
@@ -0,0 +1,95 @@
+import json
+import os
+
+from vr_fingerprint import HashCache, hash_file, install_key
+
+
+def _file(tmp_path, name, data):
+    p = tmp_path / name
+    p.write_bytes(data)
+    return str(p)
+
+
+def _on_disk(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_sha_is_cached_by_stat_and_saved_later(tmp_path):
+    index = str(tmp_path / "fp.json")
+    cache = HashCache(index)
+    a = _file(tmp_path, "a.exe", b"game")
+    assert cache.sha(a) == hash_file(a)
+    assert cache.sha(a) == hash_file(a) and cache.hashed == 1
+    assert not os.path.exists(index)          # no write per hash
+    cache.save()
+    assert HashCache(index).sha(a) == hash_file(a)
+
+    with open(a, "ab") as f:
+        f.write(b" updated")
+    os.utime(a, ns=(1, 1))
+    assert cache.sha(a) == hash_file(a) and cache.hashed == 2
+    assert cache.sha(str(tmp_path / "missing.exe")) is None
+
+
+def test_sha_many_saves_once_and_save_prunes_missing_files(tmp_path, monkeypatch):
+    index = str(tmp_path / "fp.json")
+    cache = HashCache(index)
+    paths = [_file(tmp_path, f"{i}.dll", bytes([i]) * 10) for i in range(5)]
+    saves = []
+    real_save = cache.save
+    monkeypatch.setattr(cache, "save", lambda: (saves.append(1), real_save()))
+    out = cache.sha_many(paths + [str(tmp_path / "gone.dll")])
+    assert len(saves) == 1 and cache.hashed == 5
+    assert out[str(tmp_path / "gone.dll")] is None
+    assert len(_on_disk(index)["files"]) == 5
+
+    os.remove(paths[0])
+    cache.sha(_file(tmp_path, "new.dll", b"new"))
+    real_save()
+    assert sorted(os.path.basename(p) for p in _on_disk(index)["files"]) == \
+        ["1.dll", "2.dll", "3.dll", "4.dll", "new.dll"]
+
+
+def test_record_install_and_classify(tmp_path):
+    cache = HashCache(str(tmp_path / "fp.json"))
+    folder = tmp_path / "Game"
+    folder.mkdir()
+    real = _file(folder, "GameReal.exe", b"original")
+    wrap = _file(folder, "Game.exe", b"wrapper")
+    _file(folder, "UnityPlayer.dll", b"player")
+    rec = cache.record_install(str(folder), "Game.exe", real, wrap, str(folder / "GameReal_Data"))
+    assert rec["original"] == hash_file(real) and list(rec["data"]) == ["UnityPlayer.dll"]
+
+    fresh = HashCache(str(tmp_path / "fp.json"))
+    assert fresh.install(str(folder), "GAME.exe") == rec
+    assert fresh.classify(wrap) == ("wrapper", rec["wrapper"])
+    assert fresh.classify(real, rec["original"])[0] == "original"
+    assert fresh.classify(real, "0" * 64)[0] == "modified since patch"
+    assert fresh.classify(real)[0] == "unknown binary"
+    assert fresh.classify(str(folder / "nope.exe")) == ("missing", None)
+
+    _file(folder, "UnityPlayer.dll", b"patched player")
+    assert fresh.changed_key_files(str(folder), None, rec) == ["UnityPlayer.dll"]
+    fresh.forget_install(str(folder), "Game.exe")
+    assert HashCache(str(tmp_path / "fp.json")).install(str(folder), "Game.exe") is None
+
+
+
+def test_forgotten_install_is_not_resurrected_by_another_instance(tmp_path):
+    # e.g. the GUI undoes a wrapper while the watcher, which read the index earlier, records another
+    index = str(tmp_path / "fp.json")
+    folder = tmp_path / "Game"
+    folder.mkdir()
+    real = _file(folder, "GameReal.exe", b"original")
+    gui, watcher = HashCache(index), HashCache(index)
+    gui.record_install(str(folder), "Game.exe", real)
+    assert watcher.install(str(folder), "Game.exe")
+    watcher.sha(_file(folder, "UnityPlayer.dll", b"player"))      # unsaved hash: watcher is dirty
+
+    gui.forget_install(str(folder), "Game.exe")
+    os.utime(index, ns=(1, 1))          # coarse mtimes could hide the change otherwise
+    watcher.record_install(str(folder), "Other.exe", real)
+    assert sorted(_on_disk(index)["installs"]) == [install_key(str(folder), "Other.exe")]
+    assert gui.install(str(folder), "Game.exe") is None
+    assert gui.install(str(folder), "Other.exe")
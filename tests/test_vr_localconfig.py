@@ -0,0 +1,100 @@
+import os
+
+import vr_localconfig
+
+NEVER = lambda old: False
+
+VDF = b'''"UserLocalConfigStore"
+{
+\t"Software"
+\t{
+\t\t"Valve"
+\t\t{
+\t\t\t"Steam"
+\t\t\t{
+\t\t\t\t"apps"
+\t\t\t\t{
+\t\t\t\t\t"848450"
+\t\t\t\t\t{
+\t\t\t\t\t\t"LastPlayed"\t\t"1700000000"
+\t\t\t\t\t\t"LaunchOptions"\t\t"-old \\"quoted\\""
+\t\t\t\t\t}
+\t\t\t\t\t"264710"
+\t\t\t\t\t{
+\t\t\t\t\t\t"cloud"
+\t\t\t\t\t\t{
+\t\t\t\t\t\t\t"last_sync_state"\t\t"synchronized"
+\t\t\t\t\t\t}
+\t\t\t\t\t}
+\t\t\t\t}
+\t\t\t}
+\t\t}
+\t}
+\t"friends"
+\t{
+\t\t"apps" { "848450" { "LaunchOptions" "not this one" } }
+\t}
+}
+'''
+
+
+def _apply(buf, changes):
+    edits, summary = vr_localconfig.plan(buf, changes)
+    out, pos = b"", 0
+    for start, end, data in edits:
+        out += buf[pos:start] + data
+        pos = end
+    return out + buf[pos:], summary
+
+
+def test_scan_finds_only_the_apps_path():
+    apps_end, apps = vr_localconfig.scan(VDF, {"848450", "264710", "1"})
+    assert apps["848450"]["value"] == '-old "quoted"'
+    assert VDF[slice(*apps["848450"]["span"])] == b'"-old \\"quoted\\""'
+    assert apps["264710"]["span"] is None and VDF[apps["264710"]["end"]:][:1] == b"}"
+    assert "1" not in apps and VDF[apps_end:][:1] == b"}"
+
+
+def test_plan_replaces_existing_value():
+    out, summary = _apply(VDF, {"848450": ("-vrmode openvr", NEVER)})
+    assert summary == {"848450": ('-old "quoted"', "-vrmode openvr")}
+    assert b'\t\t\t\t\t\t"LaunchOptions"\t\t"-vrmode openvr"\n' in out
+    assert b'"not this one"' in out and len(out.splitlines()) == len(VDF.splitlines())
+
+
+def test_plan_inserts_into_an_app_without_options():
+    out, _ = _apply(VDF, {"264710": ("-vrmode openvr", NEVER)})
+    assert (b'\t\t\t\t\t\t}\n\t\t\t\t\t\t"LaunchOptions"\t\t"-vrmode openvr"\n\t\t\t\t\t}\n') in out
+    assert vr_localconfig.scan(out, {"264710"})[1]["264710"]["value"] == "-vrmode openvr"
+
+
+def test_plan_adds_a_new_app_block():
+    out, summary = _apply(VDF, {"999": ("-x", NEVER)})
+    assert summary == {"999": (None, "-x")}
+    assert (b'\t\t\t\t\t"999"\n\t\t\t\t\t{\n\t\t\t\t\t\t"LaunchOptions"\t\t"-x"\n\t\t\t\t\t}\n\t\t\t\t}') in out
+    assert vr_localconfig.scan(out, {"999", "848450"})[1]["848450"]["value"] == '-old "quoted"'
+
+
+def test_plan_keeps_crlf_and_clears_only_foreign_values():
+    crlf = VDF.replace(b"\n", b"\r\n")
+    out, _ = _apply(crlf, {"999": ("-x", NEVER)})
+    assert b"\n" not in out.replace(b"\r\n", b"")
+    assert _apply(crlf, {"848450": (None, lambda old: "quoted" in old)}) == (crlf, {})
+    out, summary = _apply(crlf, {"848450": (None, NEVER)})
+    assert summary == {"848450": ('-old "quoted"', "")} and b'"LaunchOptions"\t\t""\r\n' in out
+    assert _apply(crlf, {"848450": ('-old "quoted"', NEVER)}) == (crlf, {})
+
+
+def test_rewrite_swaps_in_the_new_file_and_keeps_a_backup(tmp_path):
+    (tmp_path / "config").mkdir()
+    path = str(tmp_path / "config" / "localconfig.vdf")
+    with open(path, "wb") as f:
+        f.write(VDF)
+    assert vr_localconfig.rewrite(path, {"848450": ("-vrmode openvr", NEVER)}) == \
+        {"848450": ('-old "quoted"', "-vrmode openvr")}
+    with open(path + vr_localconfig.BACKUP_EXT, "rb") as f:
+        assert f.read() == VDF
+    with open(path, "rb") as f:
+        assert f.read() == _apply(VDF, {"848450": ("-vrmode openvr", NEVER)})[0]
+    assert vr_localconfig.rewrite(path, {"848450": ("-vrmode openvr", NEVER)}) == {}
+    assert sorted(os.listdir(tmp_path / "config")) == ["localconfig.vdf", "localconfig.vdf.vrbak"]
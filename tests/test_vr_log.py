@@ -0,0 +1,66 @@
+from vr_log import LogSink
+
+
+class FakeText:
+    # The bits of tk.Text LogSink uses, with Tk's index rules: the widget keeps
+    # a newline of its own after the content, and "end-1c" is just before it
+    def __init__(self):
+        self.content = ""
+
+    def after(self, ms, fn):
+        return "id"
+
+    def after_cancel(self, after_id):
+        pass
+
+    def configure(self, **kw):
+        pass
+
+    def yview(self):
+        return (0.0, 1.0)
+
+    def see(self, index):
+        pass
+
+    def insert(self, index, *chunks):
+        self.content += "".join(chunks[0::2])
+
+    def index(self, index):
+        assert index == "end-1c"
+        lines = self.content.split("\n")
+        return f"{len(lines)}.{len(lines[-1])}"
+
+    def delete(self, start, end):
+        assert start == "1.0" and end.endswith(".0")
+        self.content = "\n".join(self.content.split("\n")[int(end[:-2]) - 1:])
+
+    def lines(self):
+        return self.content.splitlines()
+
+
+def test_flush_trims_to_exactly_max_lines():
+    text = FakeText()
+    sink = LogSink(text, max_lines=3)
+    for i in range(5):
+        sink.write(f"line {i}")
+    sink.flush()
+    assert [line.split("] ", 1)[1] for line in text.lines()] == ["  line 2", "  line 3", "  line 4"]
+
+
+def test_flush_keeps_everything_up_to_max_lines():
+    text = FakeText()
+    sink = LogSink(text, max_lines=3)
+    for i in range(3):
+        sink.write(f"line {i}", "ok")
+    sink.flush()
+    assert len(text.lines()) == 3 and text.lines()[0].endswith("✓ line 0")
+
+
+def test_full_ring_reports_dropped_lines():
+    text = FakeText()
+    sink = LogSink(text, ring_size=2)
+    for i in range(5):
+        sink.write(f"line {i}")
+    sink.flush()
+    assert text.lines()[0] == "… 3 line(s) dropped …"
+    assert len(text.lines()) == 3
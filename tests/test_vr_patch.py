@@ -0,0 +1,252 @@
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import vr_backup
+import vr_compilers
+import vr_patch
+import vr_store
+from vr_worker import Cancelled
+
+
+# ── sidecar ─────────────────────────────────────────────────────────────────
+
+def test_sidecar_round_trip(tmp_path):
+    path = str(tmp_path / "Launch.vrargs")
+    launch = vr_patch.launch_options({"priority": "high", "affinity": "0-3", "env": "A=1; B=two"})
+    vr_patch.write_sidecar(path, "SubnauticaZero.exe", "-vrmode openvr", timing=True, launch=launch)
+    assert not (tmp_path / "Launch.vrargs.tmp").exists()
+    got = vr_patch.read_sidecar(path)
+    assert got == {"version": vr_patch.SIDECAR_VERSION, "exe": "SubnauticaZero.exe",
+                   "args": "-vrmode openvr", "timing": True,
+                   "launch": {"priority": "High", "affinity": 0xF, "env": {"A": "1", "B": "two"}}}
+
+
+def test_read_sidecar_skips_comments_bom_and_defaults(tmp_path):
+    path = tmp_path / "x.vrargs"
+    path.write_text("\ufeff# made by hand\n\n exe = Game.exe \nargs=\n", encoding="utf-8")
+    got = vr_patch.read_sidecar(str(path))
+    assert (got["version"], got["exe"], got["args"], got["timing"]) == (1, "Game.exe", "", False)
+
+
+@pytest.mark.parametrize("text", [
+    "exe=Game.exe\nargs\n",                     # no "="
+    "version=x\nexe=Game.exe\n",                # bad version
+    f"version={vr_patch.SIDECAR_VERSION + 1}\nexe=Game.exe\n",
+    "exe=bin/Game.exe\n",                        # not a plain file name
+    "args=-vrmode openvr\n",                     # no exe
+    "exe=Game.exe\naffinity=zero\n",
+])
+def test_read_sidecar_rejects(tmp_path, text):
+    path = tmp_path / "x.vrargs"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        vr_patch.read_sidecar(str(path))
+
+
+@pytest.mark.parametrize("exe,args", [
+    ("", "-x"), ("a\\Game.exe", "-x"), ("Game.bat", "-x"),
+    ("Game.exe", "-a\n-b"), ("Game.exe", " -x"), (" Game.exe", "-x"),
+])
+def test_validate_sidecar_rejects(exe, args):
+    with pytest.raises(ValueError):
+        vr_patch.validate_sidecar(exe, args)
+
+
+# ── launch options ──────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("text,mask", [
+    ("", None), (None, None), ("0xF0", 0xF0), ("0-3,6", 0b1001111), (" 2 ", 4), ("62", 1 << 62),
+])
+def test_parse_affinity(text, mask):
+    assert vr_patch.parse_affinity(text) == mask
+
+
+@pytest.mark.parametrize("text", ["abc", "3-1", "-1", "63", "0x0", "0x8000000000000000", "1,,2"])
+def test_parse_affinity_rejects(text):
+    with pytest.raises(ValueError):
+        vr_patch.parse_affinity(text)
+
+
+def test_parse_env():
+    assert vr_patch.parse_env("A=1; B = x=y \n_C=") == {"A": "1", "B": "x=y", "_C": ""}
+    assert vr_patch.parse_env({"K": 2}) == {"K": "2"}
+    assert vr_patch.parse_env("") == {} and vr_patch.parse_env(None) == {}
+    assert vr_patch.format_env({"A": "1", "B": "2"}) == "A=1; B=2"
+
+
+@pytest.mark.parametrize("value", ["NOEQUALS", "1A=x", "A-B=x", "=x", {"A": "two\nlines"}])
+def test_parse_env_rejects(value):
+    with pytest.raises(ValueError):
+        vr_patch.parse_env(value)
+
+
+def test_launch_options_normalises_priority():
+    assert vr_patch.launch_options({"priority": "abovenormal"})["priority"] == "AboveNormal"
+    assert vr_patch.launch_options() == {"priority": "", "affinity": None, "env": {}}
+    with pytest.raises(ValueError):
+        vr_patch.launch_options({"priority": "turbo"})
+
+
+# ── rendering ───────────────────────────────────────────────────────────────
+
+def test_cs_string():
+    assert vr_patch.cs_string('a "b" \\c\n\r\t') == '"a \\"b\\" \\\\c\\n\\r\\t"'
+
+
+def test_render_launcher_escapes_names_and_args():
+    src = vr_patch.render_launcher('Odd"Name\\.exe', '-vrmode openvr -x "a b"')
+    assert 'Path.Combine(dir, "Odd\\"Name\\\\.exe");' in src
+    assert 'psi.Arguments = "-vrmode openvr -x \\"a b\\"";' in src
+    assert "        Process.Start(psi);\n" in src
+    assert "vrClock" not in src and "RecordLaunch" not in src
+
+
+def test_render_wrapper_with_timing_and_launch_options():
+    launch = vr_patch.launch_options({"priority": "High", "affinity": "0-1", "env": 'K=say "hi"'})
+    src = vr_patch.render_wrapper("Game_real.exe", "-vrmode openvr", timing=True, launch=launch)
+    assert 'Path.Combine(dir, "Game_real.exe");' in src
+    assert 'psi.EnvironmentVariables["K"] = "say \\"hi\\"";' in src
+    assert "child.PriorityClass = ProcessPriorityClass.High;" in src
+    assert "child.ProcessorAffinity = (IntPtr)0x3L;" in src
+    assert vr_patch.TIMING_RECORD in src and vr_patch.TIMING_HELPER in src
+    assert src.index("Process child = Process.Start(psi);") < src.index("child.PriorityClass")
+
+
+# ── provisioning happens only after a successful build ──────────────────────
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    folder = tmp_path / "Game"
+    (folder / "Game_Data").mkdir(parents=True)
+    (folder / "Game.exe").write_bytes(b"MZ" + bytes(vr_patch.WRAPPER_MAX_SIZE))   # too big for a wrapper
+    provisioned = []
+    monkeypatch.setattr(vr_patch, "_preflight", lambda folder, exe, *a: provisioned.append(exe))
+    monkeypatch.setattr(vr_patch, "find_compiler", lambda log=None: vr_compilers.NetFxCsc("csc"))
+    outcome = {"build": True}
+
+    def compile_(compiler, target, optimize, cs_code, out_path, cs_path, log, cancel=None):
+        vr_patch._check(cancel)
+        if outcome["build"]:
+            with open(out_path, "wb") as f:
+                f.write(b"MZ built")
+        return "error CS1002"
+    monkeypatch.setattr(vr_patch, "_compile", compile_)
+    return str(folder), outcome, provisioned
+
+
+@pytest.mark.parametrize("failure", ["no compiler", "compile", "cancel"])
+def test_failed_apply_provisions_nothing(build, monkeypatch, failure):
+    folder, outcome, provisioned = build
+    cancel = threading.Event()
+    if failure == "no compiler":
+        monkeypatch.setattr(vr_patch, "find_compiler", lambda log=None: None)
+    outcome["build"] = failure != "compile"
+    if failure == "cancel":
+        cancel.set()
+    for apply in (lambda: vr_patch.apply_launcher(folder, "Game.exe", "GameVR.exe", "-vrmode openvr",
+                                                  cancel=cancel, steam_options=False),
+                  lambda: vr_patch.apply_wrapper(folder, "Game.exe", "-vrmode openvr", cancel=cancel)):
+        try:
+            assert apply() is False
+        except Cancelled:
+            assert failure == "cancel"
+    assert provisioned == []
+    assert vr_backup.default_store().latest(folder, "Game.exe") is None
+    assert os.path.exists(os.path.join(folder, "Game_Data"))
+
+
+def test_successful_apply_provisions(build):
+    folder, _, provisioned = build
+    assert vr_patch.apply_launcher(folder, "Game.exe", "GameVR.exe", "-vrmode openvr", steam_options=False)
+    assert vr_patch.apply_wrapper(folder, "Game.exe", "-vrmode openvr")
+    assert provisioned == ["Game.exe", "Game.exe"]
+    assert vr_backup.default_store().latest(folder, "Game.exe")
+
+
+def test_failed_undo_or_remove_stays_armed(build):
+    folder, _, _ = build
+    assert vr_patch.apply_wrapper(folder, "Game.exe", "-vrmode openvr")
+    assert vr_store.patched_state("wrapper", folder, "Game.exe")
+    # A Steam update put a new game EXE over the wrapper; undo refuses to delete it
+    with open(os.path.join(folder, "Game.exe"), "wb") as f:
+        f.write(b"MZ" + bytes(vr_patch.WRAPPER_MAX_SIZE) + b"update")
+    assert vr_patch.undo_wrapper(folder, "Game.exe") is False
+    assert vr_store.patched_state("wrapper", folder, "Game.exe")
+
+    vr_store.mark_patched("launcher", folder, "GameVR.exe", True)
+    assert vr_patch.remove_launcher(folder, "GameVR.exe", steam_options=False) is False
+    assert vr_store.patched_state("launcher", folder, "GameVR.exe")
+
+
+def test_successful_undo_and_remove_disarm(build):
+    folder, _, _ = build
+    assert vr_patch.apply_launcher(folder, "Game.exe", "GameVR.exe", "-vrmode openvr", steam_options=False)
+    assert vr_patch.apply_wrapper(folder, "Game.exe", "-vrmode openvr")
+    assert vr_patch.remove_launcher(folder, "GameVR.exe", exe="Game.exe", steam_options=False)
+    assert vr_patch.undo_wrapper(folder, "Game.exe")
+    assert not vr_store.patched_state("launcher", folder, "GameVR.exe")
+    assert not vr_store.patched_state("wrapper", folder, "Game.exe")
+
+
+# ── Proton shell script ─────────────────────────────────────────────────────
+
+PRINT_ARGV = "import json, os, sys; print(json.dumps([sys.argv[1:], os.environ.get('VR_TEST')]))"
+
+
+@pytest.fixture
+def proton_game(tmp_path):
+    folder = tmp_path / "it's a \"game\" $HOME"
+    folder.mkdir()
+    (folder / "Game.exe").write_bytes(b"MZ")
+    return str(folder)
+
+
+def _run(argv):
+    out = subprocess.run(argv, capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+@pytest.mark.skipif(shutil.which("sh") is None, reason="needs a POSIX shell")
+def test_proton_script_strips_vrmode_and_quotes_args(proton_game):
+    launch = vr_patch.launch_options({"env": "VR_TEST=a 'b' $c"})
+    assert vr_patch.apply_proton_script(proton_game, "Game.exe", "GameVR.exe",
+                                        "-vrmode openvr -name \"two words\" -q 'x\"y'", launch=launch)
+    script = os.path.join(proton_game, "GameVR.sh")
+    assert os.access(script, os.X_OK) and vr_patch._is_our_script(script)
+    assert vr_patch.read_proton_args(script).startswith("-vrmode openvr")
+
+    steam = [sys.executable, "-c", PRINT_ARGV, "waitforexitandrun", "Z:\\game dir\\Game.exe",
+             "-vrmode", "none", "-keep", "spaced arg", "-vrmode=none", "it's"]
+    argv, env = _run(["sh", script] + steam)
+    assert argv == ["waitforexitandrun", "Z:\\game dir\\Game.exe", "-keep", "spaced arg", "it's",
+                    "-vrmode", "openvr", "-name", "two words", "-q", 'x"y']
+    assert env == "a 'b' $c"
+
+
+@pytest.mark.skipif(shutil.which("sh") is None, reason="needs a POSIX shell")
+def test_proton_steam_hint_survives_the_shell(proton_game):
+    assert vr_patch.apply_proton_script(proton_game, "Game.exe", "GameVR.exe", "-vrmode openvr")
+    hint = vr_patch.steam_hint(proton_game, "GameVR.exe", "proton")
+    command = " ".join(shlex.quote(a) for a in [sys.executable, "-c", PRINT_ARGV, "Game.exe"])
+    argv, _ = _run(["sh", "-c", hint.replace("%command%", command)])
+    assert argv == ["Game.exe", "-vrmode", "openvr"]
+    with open(os.path.join(proton_game, "GameVR.sh"), encoding="utf-8") as f:
+        assert f"# Steam launch option: {hint}\n" in f.read()
+
+
+def test_proton_script_refuses_unsplittable_args_and_foreign_scripts(proton_game):
+    assert not vr_patch.apply_proton_script(proton_game, "Game.exe", "GameVR.exe", '-x "open')
+    with open(os.path.join(proton_game, "GameVR.sh"), "w") as f:
+        f.write("#!/bin/sh\necho mine\n")
+    assert not vr_patch.apply_proton_script(proton_game, "Game.exe", "GameVR.exe", "-vrmode openvr")
+    assert open(os.path.join(proton_game, "GameVR.sh")).read() == "#!/bin/sh\necho mine\n"
+    assert not vr_patch.apply_launcher(proton_game, "Game.exe", "GameVR.exe", "-vrmode openvr",
+                                       mode="proton", steam_options=False)
+    assert vr_backup.default_store().latest(proton_game, "Game.exe") is None
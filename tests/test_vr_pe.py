@@ -0,0 +1,74 @@
+import os
+import struct
+
+import pytest
+
+import vr_pe
+from vr_bench import stub_pe
+
+
+def _exe(tmp_path, name, data):
+    p = tmp_path / name
+    p.write_bytes(data)
+    return str(p)
+
+
+@pytest.mark.parametrize("kw,want", [
+    ({}, {"arch": "x64", "pe32_plus": True, "subsystem": "gui", "dll": False, "dotnet": False}),
+    ({"x64": False, "gui": False}, {"arch": "x86", "pe32_plus": False, "subsystem": "console",
+                                    "dll": False, "dotnet": False}),
+    ({"dotnet": True, "x64": False}, {"arch": "x86", "pe32_plus": False, "subsystem": "gui",
+                                      "dll": False, "dotnet": True}),
+])
+def test_read_pe_info(tmp_path, kw, want):
+    assert vr_pe.read_pe_info(_exe(tmp_path, "a.exe", stub_pe(**kw))) == want
+
+
+def test_dll_flag_and_unknown_machine(tmp_path):
+    buf = bytearray(stub_pe())
+    struct.pack_into("<H", buf, 0x80 + 4, 0x1234)
+    struct.pack_into("<H", buf, 0x80 + 22, 0x2022)
+    info = vr_pe.read_pe_info(_exe(tmp_path, "a.dll", bytes(buf)))
+    assert info["dll"] and info["arch"] == "0x1234"
+
+
+def test_header_past_the_first_read(tmp_path):
+    far = 8192
+    small = stub_pe(size=0)
+    buf = bytearray(far) + small[0x80:]
+    buf[:0x40] = small[:0x40]
+    struct.pack_into("<I", buf, 0x3C, far)
+    assert vr_pe.read_pe_info(_exe(tmp_path, "far.exe", bytes(buf)))["arch"] == "x64"
+
+
+@pytest.mark.parametrize("data", [
+    b"", b"MZ", b"not a pe at all" * 10,
+    stub_pe()[:0x40],                    # PE offset points past the end
+    stub_pe()[:0x80 + 60],               # cut inside the optional header
+    stub_pe().replace(b"PE\0\0", b"PX\0\0", 1),
+])
+def test_truncated_and_non_pe_files(tmp_path, data):
+    assert vr_pe.read_pe_info(_exe(tmp_path, "bad.exe", data)) is None
+
+
+def test_bad_optional_header_magic(tmp_path):
+    buf = bytearray(stub_pe())
+    struct.pack_into("<H", buf, 0x80 + 24, 0x107)
+    assert vr_pe.read_pe_info(_exe(tmp_path, "rom.exe", bytes(buf))) is None
+    assert vr_pe.read_pe_info(str(tmp_path / "missing.exe")) is None
+
+
+def test_rank_game_exes(tmp_path):
+    _exe(tmp_path, "Game.exe", stub_pe(size=8192))
+    _exe(tmp_path, "UnityCrashHandler64.exe", stub_pe(size=16384))
+    _exe(tmp_path, "GameLauncher.exe", stub_pe(dotnet=True))
+    _exe(tmp_path, "tool.exe", stub_pe(gui=False))
+    _exe(tmp_path, "readme.exe", b"not a PE")
+    _exe(tmp_path, "UnityPlayer.dll", b"")
+    os.mkdir(tmp_path / "Game_Data")
+    ranked = vr_pe.rank_game_exes(str(tmp_path))
+    assert [c["name"] for c in ranked] == ["Game.exe", "tool.exe", "UnityCrashHandler64.exe",
+                                           "GameLauncher.exe"]
+    top = ranked[0]
+    assert top["unity"] and top["has_data"] and top["confidence"] == 0.95 and top["size"] == 8192
+    assert vr_pe.describe(top) == "Game.exe (x64 gui native, _Data, 95%)"
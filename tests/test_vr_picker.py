@@ -0,0 +1,40 @@
+import os
+
+from vr_picker import ProfileIndex
+
+ROWS = [("Subnautica", "D:/Steam/steamapps/common/Subnautica"),
+        ("SubnauticaZero", "D:/Steam/steamapps/common/SubnauticaZero"),
+        ("Beat Saber", "E:/Games/Beat Saber"),
+        ("Outer Wilds", "D:/Steam/steamapps/common/Outer Wilds")]
+
+
+def test_empty_query_lists_everything_alphabetically():
+    assert ProfileIndex(ROWS).search("  ") == ["Beat Saber", "Outer Wilds", "Subnautica", "SubnauticaZero"]
+
+
+def test_prefix_matches_come_first():
+    idx = ProfileIndex(ROWS + [("Zero Gravity", "")])
+    assert idx.search("zero") == ["Zero Gravity", "SubnauticaZero"]
+    assert idx.search("SUB") == ["Subnautica", "SubnauticaZero"]
+
+
+def test_short_queries_match_substrings_without_trigrams():
+    assert ProfileIndex(ROWS).search("er") == ["Beat Saber", "Outer Wilds", "SubnauticaZero"]
+
+
+def test_folder_is_searched_too():
+    assert ProfileIndex(ROWS).search(os.path.normcase("E:/Games")) == ["Beat Saber"]
+    assert ProfileIndex(ROWS).search(os.path.normcase("steamapps/common/outer")) == ["Outer Wilds"]
+
+
+def test_add_and_remove_keep_the_index_consistent():
+    idx = ProfileIndex(ROWS)
+    idx.remove("Beat Saber")
+    idx.remove("not there")
+    idx.add("Subnautica", "F:/Moved")
+    idx.add("Aardvark", "")
+    assert "Beat Saber" not in idx and len(idx) == 4
+    assert idx.search("saber") == []
+    assert idx.search("moved") == ["Subnautica"]
+    assert idx.search(os.path.normcase("steamapps/common/subnautica")) == ["SubnauticaZero"]
+    assert idx.names()[0] == "Aardvark"
@@ -0,0 +1,113 @@
+import os
+import struct
+
+import pytest
+
+import vr_preflight
+from vr_bench import stub_pe
+
+
+def _header(fmt, version):
+    head = bytearray(vr_preflight.HEADER_BYTES)
+    struct.pack_into(">I", head, 8, fmt)
+    start = 48 if fmt >= 22 else 20
+    head[start:start + len(version) + 1] = version.encode("ascii") + b"\0"
+    return bytes(head)
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.fixture
+def game(tmp_path):
+    # A 64-bit build with SteamVR in Plugins/x86_64, a 32-bit Oculus DLL and built-in VR on
+    folder = tmp_path / "Game"
+    data = folder / "Game_Data"
+    _write(str(folder / "Game.exe"), stub_pe())
+    _write(str(data / "globalgamemanagers"), _header(17, "2019.4.40f1"))
+    _write(str(data / "Plugins" / "x86_64" / "openvr_api.dll"), stub_pe())
+    _write(str(data / "Plugins" / "OVRPlugin.dll"), stub_pe(x64=False))
+    _write(str(data / "Plugins" / "x86_64" / "deep" / "too" / "UnityOpenXR.dll"), stub_pe())
+    _write(str(data / "Plugins" / "Other.dll"), stub_pe())
+    _write(str(data / "boot.config"), b"gfx-enable-gfx-jobs=1\nvr-enabled=1\nvr-device-list=OpenVR, None\n")
+    return str(folder), str(data)
+
+
+@pytest.mark.parametrize("fmt, version, expected", [
+    (17, "2019.4.40f1", "2019.4.40f1"),
+    (22, "2021.3.5f1", "2021.3.5f1"),
+    (9, "5.6.7f1", None),              # not a four-digit year: not a version
+    (8, "2019.4.40f1", None),          # too old a format
+])
+def test_unity_version(tmp_path, fmt, version, expected):
+    path = str(tmp_path / "ggm")
+    _write(path, _header(fmt, version))
+    assert vr_preflight.unity_version(path) == expected
+
+
+def test_unity_version_of_short_or_missing_files(tmp_path):
+    path = str(tmp_path / "ggm")
+    _write(path, b"\0" * 10)
+    assert vr_preflight.unity_version(path) is None
+    assert vr_preflight.unity_version(str(tmp_path / "missing")) is None
+
+
+def test_scan_reads_plugins_boot_config_and_header(game):
+    folder, data = game
+    facts = vr_preflight.scan(os.path.join(folder, "Game.exe"), data)
+    assert facts["cached"] is False
+    assert facts["unity"] == "2019.4.40f1" and facts["arch"] == "x64"
+    assert facts["devices"] == ["openvr", "none"]
+    assert facts["boot"] == {"vr-enabled": "1", "vr-device-list": "OpenVR, None"}
+    assert facts["plugins"] == {"openvr_api.dll": [{"rel": "Plugins/x86_64/openvr_api.dll", "arch": "x64"}],
+                                "ovrplugin.dll": [{"rel": "Plugins/OVRPlugin.dll", "arch": "x86"}]}
+    assert facts["xr"] == []
+
+
+def test_scan_is_cached_until_something_changes(game):
+    folder, data = game
+    exe = os.path.join(folder, "Game.exe")
+    vr_preflight.scan(exe, data)
+    assert vr_preflight.scan(exe, data)["cached"] is True
+    _write(os.path.join(data, "UnitySubsystems", "OpenXR Plugin", "UnitySubsystemsManifest.json"), b"{}")
+    facts = vr_preflight.scan(exe, data)
+    assert facts["cached"] is False and facts["xr"] == ["OpenXR Plugin"]
+    assert vr_preflight.scan(exe, data)["cached"] is True
+
+
+def test_assess_states(game):
+    folder, data = game
+    facts = vr_preflight.scan(os.path.join(folder, "Game.exe"), data)
+    runtimes = vr_preflight.assess(facts)
+    assert runtimes["openvr"] == ("ready", "Plugins/x86_64/openvr_api.dll")
+    assert runtimes["oculus"] == ("wrong arch", "Plugins/OVRPlugin.dll is x86, the game is x64")
+    assert "openxr" not in runtimes            # too deep in Plugins to be loaded
+
+    facts["plugins"]["ovrplugin.dll"][0]["arch"] = "x64"
+    assert vr_preflight.assess(facts)["oculus"][0] == "not enabled"
+    facts["xr"] = ["OpenXR Plugin"]
+    assert vr_preflight.assess(facts)["openxr"] == ("missing", "UnityOpenXR.dll not in Plugins")
+
+
+def test_check_warns_only_for_the_requested_runtime(game):
+    folder, _ = game
+    lines = []
+
+    def log(msg, tag="info"):
+        lines.append((tag, msg))
+    assert vr_preflight.check(folder, "Game.exe", "-vrmode openvr", log)
+    assert "Unity 2019.4.40f1, x64" in lines[0][1] and not any(tag == "warn" for tag, _ in lines)
+    lines.clear()
+    assert not vr_preflight.check(folder, "Game.exe", '-vrmode "Oculus"', log)
+    assert lines[-1][0] == "warn" and "wrong arch" in lines[-1][1]
+    assert vr_preflight.check(folder, "Other.exe", "-vrmode openvr", log)     # no Other_Data: skipped
+
+
+def test_requested_runtime():
+    assert vr_preflight.requested_runtime("-vrmode steamvr -x -vrmode Oculus") == "oculus"
+    assert vr_preflight.requested_runtime("-vrmode steamvr") == "openvr"
+    assert vr_preflight.requested_runtime("-novrmode openvr") is None
+    assert vr_preflight.requested_runtime(None) is None
@@ -0,0 +1,60 @@
+import os
+import json
+
+import pytest
+
+import vr_presets
+
+
+@pytest.fixture
+def nofile(tmp_path):
+    return str(tmp_path / "vr_presets.json")
+
+
+def test_split_flags():
+    assert vr_presets.split_flags('-A 1 -b -c x "y z"') == [
+        ("-a", ["-A", "1"]), ("-b", ["-b"]), ("-c", ["-c", "x", '"y z"'])]
+    assert vr_presets.split_flags("stray -x") == [(None, ["stray"]), ("-x", ["-x"])]
+    assert vr_presets.split_flags("") == []
+
+
+def test_compose_stacks_presets_then_args(nofile):
+    line, notes = vr_presets.compose(["openvr", "jobs-4"], "-nolog", nofile)
+    assert line == "-vrmode openvr -job-worker-count 4 -nolog"
+    assert notes == []
+
+
+def test_compose_last_occurrence_wins(nofile):
+    line, notes = vr_presets.compose(["fullscreen", "small-mirror"], "-screen-width 1920", nofile)
+    assert line == "-screen-fullscreen 0 -screen-height 720 -screen-width 1920"
+    assert notes == ["-screen-fullscreen 1 (fullscreen) replaced by -screen-fullscreen 0 (small-mirror)",
+                     "-screen-width 1280 (small-mirror) replaced by -screen-width 1920 (args)"]
+    # repeating the same tokens is not worth a note
+    assert vr_presets.compose(["openvr"], "-vrmode openvr", nofile) == ("-vrmode openvr", [])
+
+
+def test_compose_conflict_group_keeps_one_renderer(nofile):
+    line, notes = vr_presets.compose(["d3d11", "vulkan"], "-FORCE-D3D12", nofile)
+    assert line == "-FORCE-D3D12"
+    assert len(notes) == 2 and notes[-1].endswith("replaced by -FORCE-D3D12 (args)")
+
+
+def test_compose_rejects_unknown_presets_and_bad_quoting(nofile):
+    with pytest.raises(ValueError, match="nope"):
+        vr_presets.compose(["openvr", "nope"], "", nofile)
+    with pytest.raises(ValueError):
+        vr_presets.compose([], '-x "open', nofile)
+
+
+def test_user_file_adds_presets_and_conflicts(tmp_path):
+    path = tmp_path / "vr_presets.json"
+    path.write_text(json.dumps({"presets": {"mine": "-my-a", "openvr": {"args": "-vrmode openxr"}},
+                                "conflicts": [["-My-A", "-my-b"]]}), encoding="utf-8")
+    catalog, _ = vr_presets.load_catalog(str(path))
+    assert catalog["mine"]["user"] and catalog["openvr"]["args"] == "-vrmode openxr"
+    assert vr_presets.compose(["mine", "openvr"], "-my-b", str(path))[0] == "-vrmode openxr -my-b"
+
+    path.write_text(json.dumps({"presets": {"bad": {"description": "no args"}}}), encoding="utf-8")
+    os.utime(path, ns=(1, 1))     # a changed mtime is what triggers the re-read
+    with pytest.raises(ValueError, match="bad"):
+        vr_presets.load_catalog(str(path))
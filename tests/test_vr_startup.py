@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+import vr_presets
+import vr_startup
+import vr_store
+
+pytest.importorskip("tkinter")
+import vr_launcher_maker    # needs tkinter, but no window is ever opened here
+import vr_wrapper_maker
+
+
+class Clock:
+    def __init__(self, *times):
+        self.times = list(times)
+
+    def __call__(self):
+        return self.times.pop(0)
+
+
+def test_timer_phases_are_measured_from_the_previous_mark(monkeypatch):
+    monkeypatch.setattr(vr_startup.time, "perf_counter", Clock(1.010, 1.250, 1.300))
+    timer = vr_startup.StartupTimer(1.0)
+    assert timer.total_ms() == 0
+    for phase in ("imports", "UI build", "profiles"):
+        timer.mark(phase)
+    assert [(p, round(ms)) for p, ms in timer.phases()] == [("imports", 10), ("UI build", 240), ("profiles", 50)]
+    assert round(timer.total_ms()) == 300
+    assert timer.report() == "Start-up: imports 10 ms · UI build 240 ms · profiles 50 ms · total 300 ms"
+
+
+def test_requested(monkeypatch):
+    assert vr_startup.requested(["--startup-timing"])
+    assert not vr_startup.requested(["launcher", "list"])
+    monkeypatch.setattr(vr_startup.sys, "argv", ["vr_launcher_maker.py", "--startup-timing"])
+    assert vr_startup.requested()
+
+
+# ── deferred loading, driven without a window ───────────────────────────────
+
+class FakeApp:
+    # Just the attributes the loading methods use; widgets record what they were given
+    def __init__(self, maker):
+        self.maker = maker
+        self.timer = vr_startup.StartupTimer()
+        self._loading = False
+        self.submitted, self.logged, self.profiles, self.catalogs = [], [], [], []
+        self.runner = self
+        self.picker = type("Picker", (), {"set_profiles": lambda _, rows, last: self.profiles.append((rows, last))})()
+        self.presets = type("Presets", (), {"set_catalog": lambda _, c: self.catalogs.append(c)})()
+
+    def submit(self, title, fn, on_done=None, on_error=None):
+        self.submitted.append((title, fn, on_done, on_error))
+
+    def _update_final(self):
+        pass
+
+    def log_err(self, msg):
+        self.logged.append(msg)
+
+    def __getattr__(self, name):
+        # App methods under test, bound to this fake
+        return getattr(self.maker.App, name).__get__(self)
+
+
+@pytest.fixture(params=[vr_launcher_maker, vr_wrapper_maker], ids=lambda m: m.__name__)
+def app(request):
+    return FakeApp(request.param)
+
+
+def test_loading_starts_once_on_the_worker(app):
+    app._start_loading()
+    app._start_loading()                 # the Expose after the 1 s fallback, or vice versa
+    assert len(app.submitted) == 1
+    title, fn, on_done, on_error = app.submitted[0]
+    assert title == "Loading profiles" and fn == app._load_state
+    assert [p for p, _ in app.timer.phases()] == ["first paint"]
+
+
+def test_load_state_reads_the_store_off_the_ui_thread(app, monkeypatch):
+    tool = "launcher" if app.maker is vr_launcher_maker else "wrapper"
+    store = vr_store.open_store(tool)
+    store.put("Game", {"folder": "C:/Games/Game"})
+    store.set_setting("last_profile", "Game")
+    store.set_setting("log_max_lines", 50)
+    store.close()
+    monkeypatch.setattr(vr_presets, "load_catalog", lambda: ({"mine": {"args": "-x"}}, []))
+
+    result = {}
+    t = threading.Thread(target=lambda: result.update(app._load_state(None)))
+    t.start()
+    t.join()
+    try:
+        assert result["last"] == "Game"
+        assert result["rows"] == [("Game", vr_store._norm_folder("C:/Games/Game"))]
+        assert result["catalog"] == {"mine": {"args": "-x"}} and result["preset_error"] is None
+        assert result["log_max_lines"] == 50 and result["log_file"] is None
+    finally:
+        result["store"].close()
+
+
+def test_load_state_falls_back_to_builtin_presets(app, monkeypatch):
+    def broken():
+        raise ValueError("bad JSON")
+    monkeypatch.setattr(vr_presets, "load_catalog", broken)
+    state = app._load_state(None)
+    state["store"].close()
+    assert state["catalog"] is vr_presets.BUILTIN and str(state["preset_error"]) == "bad JSON"
+    assert state["last"] == "" and state["rows"] == []
+
+
+def test_failed_load_leaves_a_usable_window(app):
+    app._on_load_failed(OSError("share offline"))
+    assert app.store.path == ":memory:" and len(app.store) == 0
+    assert app.profiles == [([], "")] and app.catalogs == [vr_presets.BUILTIN]
+    assert "share offline" in app.logged[0]
+    assert [p for p, _ in app.timer.phases()] == ["profiles"]
@@ -0,0 +1,89 @@
+import os
+
+import vr_steam
+import vr_store
+
+
+def _write(path, text=""):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _unity_game(steamapps, installdir, exe="Game", appid="100", name=None):
+    game = os.path.join(steamapps, "common", installdir)
+    _write(os.path.join(game, f"{exe}.exe"), "MZ")
+    _write(os.path.join(game, "UnityPlayer.dll"))
+    os.makedirs(os.path.join(game, f"{exe}_Data"))
+    _write(os.path.join(steamapps, f"appmanifest_{appid}.acf"),
+           f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"{name or installdir}"\n'
+           f'\t"installdir"\t\t"{installdir}"\n}}\n')
+    return game
+
+
+def test_parse_vdf():
+    text = ('// comment\n"Root"\n{\n  "Key"  "a \\"quoted\\" \\\\ value"\n'
+            '  "Nested" { "x" "1" [$WIN32] }\n  bare   token\n  "Tab" "a\\tb" // trailing\n}\n')
+    root = vr_steam.parse_vdf(text)
+    r = vr_steam.vdf_get(root, "root")
+    assert r["Key"] == 'a "quoted" \\ value'
+    assert r["Nested"] == {"x": "1"} and r["bare"] == "token" and r["Tab"] == "a\tb"
+    assert vr_steam.vdf_get(r, "NESTED") == {"x": "1"} and vr_steam.vdf_get(r, "no", 5) == 5
+    assert vr_steam.parse_vdf('"a" { "b" "1" } } } "c" "2"') == {"a": {"b": "1"}, "c": "2"}
+    assert vr_steam.parse_vdf('"a" { "b" "unterminated') == {"a": {"b": "unterminated"}}
+
+
+def test_library_paths_both_formats(tmp_path):
+    root = tmp_path / "Steam"
+    _write(root / "steamapps" / "libraryfolders.vdf",
+           '"libraryfolders"\n{\n\t"contentstatsid"\t"1"\n'
+           f'\t"0"\n\t{{\n\t\t"path"\t\t"{root}"\n\t}}\n'
+           '\t"1"\n\t{\n\t\t"path"\t\t"/games/lib1"\n\t}\n'
+           '\t"2"\t\t"/games/old-style"\n}\n')
+    assert vr_steam.library_paths(str(root)) == [
+        os.path.normpath(str(root)), os.path.normpath("/games/lib1"), os.path.normpath("/games/old-style")]
+    assert vr_steam.library_paths(str(tmp_path / "none")) == [os.path.normpath(str(tmp_path / "none"))]
+
+
+def test_find_unity_exe(tmp_path):
+    game = _unity_game(str(tmp_path), "Plain")
+    assert vr_steam._find_unity_exe(game) == "Game.exe"
+    os.remove(os.path.join(game, "UnityPlayer.dll"))
+    assert vr_steam._find_unity_exe(game) is None
+    assert vr_steam._find_unity_exe(str(tmp_path / "missing")) is None
+
+
+def test_find_unity_exe_on_a_wrapped_install(tmp_path):
+    game = _unity_game(str(tmp_path), "Wrapped", exe="SubnauticaZero")
+    os.rename(os.path.join(game, "SubnauticaZero.exe"), os.path.join(game, "SubnauticaZeroReal.exe"))
+    os.rename(os.path.join(game, "SubnauticaZero_Data"), os.path.join(game, "SubnauticaZeroReal_Data"))
+    _write(os.path.join(game, "SubnauticaZero.exe"), "MZ wrapper")
+    assert vr_steam._find_unity_exe(game) == "SubnauticaZero.exe"
+    # Real pair without a wrapper next to it: that is the game's own name
+    os.remove(os.path.join(game, "SubnauticaZero.exe"))
+    assert vr_steam._find_unity_exe(game) == "SubnauticaZeroReal.exe"
+
+
+def test_scan_uses_the_index_and_adds_profiles(tmp_path):
+    root = tmp_path / "Steam"
+    steamapps = str(root / "steamapps")
+    game = _unity_game(steamapps, "Below Zero", exe="SubnauticaZero", appid="848450", name="Below Zero")
+    _write(os.path.join(steamapps, "appmanifest_1.acf"), '"AppState" { "appid" "1" "installdir" "NotUnity" }')
+    _write(os.path.join(steamapps, "common", "NotUnity", "game.exe"))
+    index = str(tmp_path / "index.json")
+    lines = []
+    log = lambda m, t="info": lines.append(m)
+
+    games = vr_steam.scan(str(root), index, log=log)
+    assert games == [{"appid": "848450", "name": "Below Zero", "folder": game, "exe": "SubnauticaZero.exe"}]
+    assert "0 unchanged, 1 rescanned, 2 manifest(s) read" in lines[-1]
+    assert vr_steam.scan(str(root), index, log=log) == games
+    assert "1 unchanged, 0 rescanned, 0 manifest(s) read" in lines[-1]
+    assert vr_steam.scan(str(root), index, force=True, log=log) == games
+    assert "2 manifest(s) read" in lines[-1]
+
+    store = vr_store.open_store("launcher")
+    assert vr_steam.add_profiles(store, games + games, "launcher") == ["Below Zero"]
+    assert vr_steam.add_profiles(store, games, "launcher") == []
+    assert store.get("Below Zero")["exe"] == "SubnauticaZero.exe"
+    store.close()
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import vr_store
+from vr_store import ProfileStore
+
+
+def _legacy(tmp_path, text):
+    p = tmp_path / "profiles.json"
+    p.write_text(text, encoding="utf-8")
+    return str(p)
+
+
+def test_migrates_legacy_json_once(tmp_path):
+    legacy = _legacy(tmp_path, json.dumps({"profiles": {"BZ": {"folder": "D:/BZ", "exe": "BZ.exe"}},
+                                           "last_profile": "BZ"}))
+    store = ProfileStore(str(tmp_path / "p.db"), legacy)
+    assert store.migrated == 1 and store.migration_error is None
+    assert store.get("BZ")["exe"] == "BZ.exe"
+    assert store.get_setting("last_profile") == "BZ"
+    assert store.by_folder("D:/BZ/") == ["BZ"]
+    store.close()
+    assert ProfileStore(str(tmp_path / "p.db"), legacy).migrated == 0
+
+
+def test_corrupt_legacy_json_is_reported_and_retried(tmp_path):
+    legacy = _legacy(tmp_path, "{not json")
+    store = ProfileStore(str(tmp_path / "p.db"), legacy)
+    assert store.migrated == 0 and "Could not import profiles.json" in store.migration_error
+    assert store.get_setting("migrated_from") is None
+
+
+def test_put_skips_identical_rows():
+    store = ProfileStore(":memory:")
+    assert store.put("A", {"folder": "x", "exe": "a.exe"})
+    assert not store.put("A", {"folder": "x", "exe": "a.exe"})
+    assert store.names() == ["A"] and len(store) == 1
+    assert store.delete("A") and not store.delete("A")
+
+
+@pytest.mark.parametrize("text", ["{broken", "[1, 2]", '{"profiles": []}'])
+def test_import_of_bad_file_fails_loudly(tmp_path, capsys, text):
+    path = _legacy(tmp_path, text)
+    assert vr_store.main(["launcher", "import", path]) == 2
+    assert "could not import" in capsys.readouterr().err
+
+
+def test_import_of_missing_file_fails(tmp_path, capsys):
+    assert vr_store.main(["launcher", "import", str(tmp_path / "nope.json")]) == 2
+    assert "could not import" in capsys.readouterr().err
+
+
+def test_export_then_import_round_trip(tmp_path):
+    store = vr_store.open_store("launcher")
+    store.put("BZ", {"folder": "D:/BZ", "exe": "BZ.exe"})
+    store.close()
+    path = str(tmp_path / "out.json")
+    assert vr_store.main(["launcher", "export", path]) == 0
+    assert vr_store.main(["wrapper", "import", path]) == 0
+    assert vr_store.open_store("wrapper").get("BZ") == {"folder": "D:/BZ", "exe": "BZ.exe"}
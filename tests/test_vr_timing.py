@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+import vr_timing
+
+
+def _line(when="2026-10-01T12:00:00", boot=20.0, call=1.0, ret=5.5, pid=42, extra=""):
+    return f"v1\t{when}.1234567Z\tLaunch.exe\t{boot}\t{call}\t{ret}\t{pid}{extra}\n"
+
+
+def _now(offset_days=0):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - offset_days * 86400))
+
+
+def test_parse_line():
+    rec = vr_timing.parse_line(_line(boot=-1.0, extra="\t-foo"))
+    assert rec == {"when": "2026-10-01T12:00:00", "exe": "Launch.exe", "boot_ms": -1.0,
+                   "call_ms": 1.0, "return_ms": 5.5, "overhead_ms": 5.5, "pid": 42, "dropped": "-foo"}
+    assert vr_timing.parse_line(_line())["overhead_ms"] == 25.5
+
+
+@pytest.mark.parametrize("line", ["", "v2\ta\tb\t1\t2\t3\t4", "v1\ta\tb\t1\t2\t3",
+                                  "v1\ta\tb\tx\t2\t3\t4", "v1\ta\tb\t1\t2\t3\tpid"])
+def test_parse_line_rejects(line):
+    assert vr_timing.parse_line(line) is None
+
+
+def test_update_reads_only_the_new_tail(tmp_path):
+    index = str(tmp_path / "index.json")
+    log = tmp_path / vr_timing.LOG_NAME
+    log.write_text(_line(_now(2)) + _line(_now(1))[:20], encoding="utf-8")
+    assert len(vr_timing.update([str(tmp_path)], index)[str(tmp_path)]) == 1
+
+    # the half-written line is finished later and parsed once
+    log.write_text(_line(_now(2)) + _line(_now(1)) + "garbage\n", encoding="utf-8")
+    records = vr_timing.update([str(tmp_path)], index)[str(tmp_path)]
+    assert [r[1] for r in records] == [25.5, 25.5]
+    assert vr_timing.update([str(tmp_path)], index)[str(tmp_path)] == records
+
+    log.write_text(_line(_now(0), ret=1.0), encoding="utf-8")    # truncated: start over
+    assert [r[1] for r in vr_timing.update([str(tmp_path)], index)[str(tmp_path)]] == [21.0]
+    assert vr_timing.update([str(tmp_path / "nolog")], index) == {}
+
+
+def test_index_drops_old_records_and_caps_the_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(vr_timing, "KEEP_RECORDS", 3)
+    index = str(tmp_path / "index.json")
+    lines = [_line(_now(400))] + [_line(_now(5), ret=float(i)) for i in range(5)]
+    (tmp_path / vr_timing.LOG_NAME).write_text("".join(lines), encoding="utf-8")
+    vr_timing.update([str(tmp_path)], index)
+    kept = vr_timing.load_index(index)["logs"].popitem()[1]["records"]
+    assert [r[2] for r in kept] == [2.0, 3.0, 4.0]
+
+
+def test_percentile_and_summarize():
+    assert vr_timing.percentile([], 0.5) is None
+    assert vr_timing.percentile([4, 1, 3, 2], 0.5) == 2.5
+    records = [["2026-09-30T10:00:00", 10.0, 0, "a"], ["2026-10-01T10:00:00", 30.0, 0, "a"],
+               ["2026-10-01T11:00:00", 50.0, 0, "a"]]
+    assert vr_timing.summarize(records) == [{"period": "all", "count": 3, "p50": 30.0, "p95": 48.0}]
+    assert [r["period"] for r in vr_timing.summarize(records, "month")] == ["2026-09", "2026-10"]
+    assert [r["count"] for r in vr_timing.summarize(records, "day")] == [1, 2]
+    assert [r["period"] for r in vr_timing.summarize(records, "week")] == ["2026-W40"]
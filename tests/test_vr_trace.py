@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+
+import pytest
+
+import vr_trace
+
+
+@pytest.fixture(autouse=True)
+def fresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(vr_trace, "_metrics", {})
+    monkeypatch.setattr(vr_trace, "TRACE_FILE", str(tmp_path / "trace.jsonl"))
+    monkeypatch.setattr(vr_trace, "METRICS_FILE", str(tmp_path / "metrics.prom"))
+    monkeypatch.delenv("VR_TRACE", raising=False)
+    monkeypatch.delenv("VR_PROFILE", raising=False)
+
+
+# ── spans ───────────────────────────────────────────────────────────────────
+
+def test_spans_nest_into_paths_and_one_record():
+    with vr_trace.span("apply", folder="C:/Game") as top:
+        with vr_trace.span("compile") as c:
+            with vr_trace.span("csc"):
+                pass
+        with vr_trace.span("backup"):
+            pass
+    assert [s.path for s in top.children] == ["apply/compile", "apply/backup"]
+    assert c.children[0].path == "apply/compile/csc"
+    rec = vr_trace.record(top)
+    assert rec["op"] == "apply" and rec["ok"] and rec["folder"] == "C:/Game"
+    assert [s["span"] for s in rec["spans"]] == ["apply/compile", "apply/compile/csc", "apply/backup"]
+    assert all(s["start_ms"] >= 0 and s["ms"] >= 0 for s in rec["spans"])
+    assert sorted(vr_trace._metrics) == ["apply", "apply/backup", "apply/compile", "apply/compile/csc"]
+
+
+def test_a_raising_span_fails_and_unwinds():
+    with pytest.raises(KeyError):
+        with vr_trace.span("op") as top:
+            with vr_trace.span("step"):
+                raise KeyError("x")
+    assert top.ok is False and top.children[0].ok is False
+    assert vr_trace._stack() == []
+    assert vr_trace.record(top)["spans"][0]["ok"] is False
+    assert vr_trace._metrics["op/step"][2] == 1
+
+
+def test_each_thread_has_its_own_stack():
+    paths = []
+
+    def worker():
+        with vr_trace.span("other") as s:
+            paths.append(s.path)
+    with vr_trace.span("main"):
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+    assert paths == ["other"]
+
+
+def test_traced_takes_outcome_folder_and_log_timing():
+    lines = []
+
+    @vr_trace.traced("patch")
+    def op(folder, log=None, fail=False):
+        log("working", "dim")
+        with vr_trace.span("inner"):
+            pass
+        return not fail
+
+    assert op("C:/Game", lambda msg, tag="info": lines.append(msg)) is True
+    assert op("C:/Game", lambda msg, tag="info": None, fail=True) is False
+    assert lines == ["working"]
+    count, _, failures, _ = vr_trace._metrics["patch"]
+    assert (count, failures) == (2, 1) and vr_trace._metrics["patch/inner"][0] == 2
+
+
+def test_trace_file_and_metrics_are_written_only_when_enabled(monkeypatch):
+    with vr_trace.span("quiet"):
+        pass
+    assert not os.path.exists(vr_trace.TRACE_FILE)
+    monkeypatch.setenv("VR_TRACE", "1")
+    for _ in range(2):
+        with vr_trace.span("loud"):
+            with vr_trace.span("step"):
+                pass
+    with open(vr_trace.TRACE_FILE, encoding="utf-8") as f:
+        recs = [json.loads(line) for line in f]
+    assert [r["op"] for r in recs] == ["loud", "loud"]
+    with open(vr_trace.METRICS_FILE, encoding="utf-8") as f:
+        assert 'vr_span_seconds_count{span="loud/step"} 2' in f.read()
+    samples = vr_trace.summarize(vr_trace.TRACE_FILE)
+    assert sorted(samples) == ["loud", "loud/step"] and len(samples["loud/step"]) == 2
+    assert vr_trace.summarize(vr_trace.TRACE_FILE, op="other") == {}
+
+
+# ── Prometheus exposition ───────────────────────────────────────────────────
+
+def test_histogram_buckets_are_cumulative():
+    for seconds in (0.003, 0.003, 0.2, 60.0):
+        vr_trace.observe("op", seconds)
+    vr_trace.observe("op", 0.04, failed=True)
+    text = vr_trace.prometheus()
+    lines = text.splitlines()
+    assert lines[:2] == ["# HELP vr_span_seconds Time spent in patch operations and their stages.",
+                         "# TYPE vr_span_seconds histogram"]
+    buckets = {line.split('le="')[1].split('"')[0]: int(line.rsplit(" ", 1)[1])
+               for line in lines if line.startswith("vr_span_seconds_bucket")}
+    assert list(buckets) == [f"{le:g}" for le in vr_trace.BUCKETS] + ["+Inf"]
+    assert (buckets["0.001"], buckets["0.005"], buckets["0.05"], buckets["0.25"]) == (0, 2, 3, 4)
+    assert buckets["30"] == 4 and buckets["+Inf"] == 5
+    assert 'vr_span_seconds_count{span="op"} 5' in lines
+    assert 'vr_span_seconds_sum{span="op"} 60.246000' in lines
+    assert 'vr_span_failures_total{span="op"} 1' in lines
+    assert text.endswith("\n")
+
+
+def test_label_values_are_escaped():
+    vr_trace.observe('say "hi"\\now\nplease', 0.01)
+    text = vr_trace.prometheus()
+    assert 'vr_span_seconds_count{span="say \\"hi\\"\\\\now\\nplease"} 1' in text
+    assert "\nplease" not in text          # a raw newline would split the sample line
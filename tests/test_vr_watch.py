@@ -0,0 +1,64 @@
+import io
+import os
+
+import pytest
+
+import vr_patch
+import vr_store
+import vr_watch
+
+
+@pytest.fixture
+def game(tmp_path):
+    folder = tmp_path / "Game"
+    folder.mkdir()
+    (folder / "Game.exe").write_bytes(b"MZ game")
+    (folder / "Game_VR.exe").write_bytes(b"MZ launcher")
+    store = vr_store.open_store("launcher")
+    store.put("Game", {"folder": str(folder), "exe": "Game.exe", "launcher_name": "Game_VR.exe"})
+    store.close()
+    return folder
+
+
+def _watcher():
+    w = vr_watch.Watcher(["launcher"], use_inotify=False, out=io.StringIO())
+    w.load()
+    return w
+
+
+def _check(w):
+    key = ("launcher", "Game")
+    return w.check(key, w.watched[key]), w.problems.get(key)
+
+
+def test_launcher_deleted_behind_the_tools_back_is_missing(game):
+    vr_store.mark_patched("launcher", str(game), "Game_VR.exe", True)
+    os.remove(game / "Game_VR.exe")
+    # seen by a watcher that never saw it patched, thanks to the stored state
+    assert _check(_watcher()) == (False, "Game_VR.exe deleted")
+
+
+def test_launcher_removed_with_the_tool_stays_off(game):
+    vr_store.mark_patched("launcher", str(game), "Game_VR.exe", True)
+    w = _watcher()
+    assert _check(w) == (True, None)
+    assert vr_patch.remove_launcher(str(game), "Game_VR.exe", steam_options=False)
+    assert vr_store.patched_state("launcher", str(game), "Game_VR.exe") is False
+    assert _check(w) == (True, None)
+
+
+def test_unrecorded_patch_falls_back_to_what_was_seen(game):
+    w = _watcher()
+    assert _check(w) == (True, None)
+    os.remove(game / "Game_VR.exe")
+    assert _check(w) == (False, "Game_VR.exe deleted")
+    assert _check(_watcher()) == (True, None)
+
+
+def test_patch_state_round_trip(tmp_path):
+    store = vr_store.open_store("wrapper")
+    assert store.is_patched(str(tmp_path), "Game.exe") is None
+    store.set_patched(str(tmp_path), "Game.exe", True)
+    store.set_patched(str(tmp_path) + os.sep, "Game.exe", False)
+    assert store.is_patched(str(tmp_path), "Game.exe") is False
+    store.close()
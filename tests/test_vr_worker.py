@@ -0,0 +1,38 @@
+import threading
+
+from vr_worker import TaskRunner
+
+
+class FakeRoot:
+    # Stands in for Tk: after() callbacks are run by hand through pump()
+    def after(self, ms, fn):
+        return "id"
+
+    def after_cancel(self, after_id):
+        pass
+
+
+def _run(submit):
+    logs, results = [], []
+    done = threading.Event()
+    runner = TaskRunner(FakeRoot(), lambda msg, tag="info": logs.append((tag, msg)))
+    submit(runner, results, done)
+    runner.submit("sentinel", lambda t: None, on_done=lambda _: done.set())
+    while not done.is_set():
+        runner._pump()
+    runner.shutdown()
+    return logs, results
+
+
+def test_on_done_gets_the_result():
+    logs, results = _run(lambda r, res, done: r.submit("ok", lambda t: 42, on_done=res.append))
+    assert results == [42]
+
+
+def test_on_error_gets_the_exception():
+    def boom(task):
+        raise OSError("disk gone")
+    logs, results = _run(lambda r, res, done: r.submit(
+        "Loading profiles", boom, on_done=lambda _: res.append("done"), on_error=res.append))
+    assert len(results) == 1 and isinstance(results[0], OSError)
+    assert ("err", "Loading profiles failed: disk gone") in logs
@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import threading
+
+import vr_fingerprint
+
+# Content-addressed safety copies of original game EXEs, shared by every
+# profile: objects/<sha[:2]>/<sha> holds each distinct binary once, and
+# refs.json lists which install (folder + EXE name) still needs which blob.
+# A blob is a reflink (copy-on-write clone) where the filesystem has them and a
+# plain copy otherwise. The backed-up EXE stays in use (a launcher runs it, a
+# wrapper only renames it), so it is never hardlinked: an updater writing it in
+# place would change the backup too. Blobs are still checked against their hash
+# on restore, which also catches hardlinked blobs from older versions. Releasing an install's refs deletes
+# blobs nobody else uses; gc() sweeps anything left over.
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".vr_backups")
+KEEP      = 3            # versions kept per install, newest first
+FICLONE   = 0x40049409   # Linux ioctl: share extents with another file
+
+
+def _reflink(src, dst):
+    import fcntl
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def place(src, dst, allow_link=True):
+    # Cheapest independent-enough copy of src at dst; returns the method used
+    tmp = dst + f".{os.getpid()}.tmp"
+    methods = [("reflink", _reflink)]
+    if allow_link:
+        methods.append(("hardlink", os.link))
+    methods.append(("copy", shutil.copyfile))
+    for name, fn in methods:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            fn(src, tmp)
+        except (OSError, ImportError, NotImplementedError):
+            continue
+        os.replace(tmp, dst)
+        return name
+    raise OSError(f"could not copy {src}")
+
+
+class BackupStore:
+    def __init__(self, root=STORE_DIR, hashes=None):
+        self.root   = root
+        self.hashes = hashes
+        self._lock  = threading.RLock()
+
+    @property
+    def _hashes(self):
+        return self.hashes or vr_fingerprint.default_cache()
+
+    def _blob(self, sha):
+        return os.path.join(self.root, "objects", sha[:2], sha)
+
+    def _refs_path(self):
+        return os.path.join(self.root, "refs.json")
+
+    def _load(self):
+        try:
+            with open(self._refs_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, refs):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._refs_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(refs, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self._refs_path())
+
+    # ── backups ─────────────────────────────────────────────────────────────
+
+    def add(self, path, folder, exe, allow_link=False):
+        # Returns (sha, method) where method is "stored" (already had it) or how it was placed.
+        # allow_link only for a file about to be replaced, whose inode then belongs to the blob alone
+        sha = self._hashes.sha(path)
+        if sha is None:
+            raise OSError(f"not found: {path}")
+        blob = self._blob(sha)
+        with self._lock:
+            if os.path.isfile(blob) and self._hashes.sha(blob) == sha:
+                method = "stored"
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                method = place(path, blob, allow_link)
+            refs = self._load()
+            versions = [v for v in refs.get(vr_fingerprint.install_key(folder, exe), [])
+                        if v["sha"] != sha]
+            versions.insert(0, {"sha": sha, "name": os.path.basename(path), "folder": folder,
+                                "when": time.strftime("%Y-%m-%dT%H:%M:%S")})
+            dropped = versions[KEEP:]
+            refs[vr_fingerprint.install_key(folder, exe)] = versions[:KEEP]
+            self._save(refs)
+            self._collect(refs, [v["sha"] for v in dropped])
+        return sha, method
+
+    def latest(self, folder, exe):
+        versions = self._load().get(vr_fingerprint.install_key(folder, exe)) or []
+        return versions[0]["sha"] if versions else None
+
+    def restore(self, sha, dest):
+        # Writes the blob to dest (never as a hardlink); raises OSError if it is missing or damaged
+        blob = self._blob(sha)
+        if not os.path.isfile(blob):
+            raise OSError(f"no backup with hash {sha[:12]}")
+        if self._hashes.sha(blob) != sha:
+            raise OSError(f"backup {sha[:12]} is damaged (changed after it was stored)")
+        return place(blob, dest, allow_link=False)
+
+    def release(self, folder, exe):
+        # Forgets an install's backups; blobs no other install uses are deleted
+        with self._lock:
+            refs = self._load()
+            versions = refs.pop(vr_fingerprint.install_key(folder, exe), None)
+            if versions is None:
+                return 0
+            self._save(refs)
+            return self._collect(refs, [v["sha"] for v in versions])
+
+    def _collect(self, refs, candidates):
+        used = {v["sha"] for versions in refs.values() for v in versions}
+        removed = 0
+        for sha in set(candidates) - used:
+            try:
+                os.remove(self._blob(sha))
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def gc(self):
+        # Deletes every blob (and stray temp file) no install refers to; returns bytes freed
+        with self._lock:
+            used = {v["sha"] for versions in self._load().values() for v in versions}
+            freed = 0
+            objects = os.path.join(self.root, "objects")
+            for sub in _scandir(objects):
+                for e in _scandir(sub.path):
+                    if e.name not in used:
+                        try:
+                            size = e.stat().st_size
+                            os.remove(e.path)
+                            freed += size
+                        except OSError:
+                            pass
+            return freed
+
+    def entries(self):
+        # [(install key, version dict, blob ok)]
+        out = []
+        for key, versions in sorted(self._load().items()):
+            for v in versions:
+                blob = self._blob(v["sha"])
+                out.append((key, v, os.path.isfile(blob) and self._hashes.sha(blob) == v["sha"]))
+        return out
+
+
+def _scandir(path):
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except OSError:
+        return []
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = BackupStore()
+        return _default
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Original game EXE backups shared across installs")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="show every backup and whether it is intact")
+    r = sub.add_parser("restore", help="write a backup to a file")
+    r.add_argument("sha", help="hash or unique prefix from 'list'")
+    r.add_argument("dest")
+    sub.add_parser("gc", help="delete blobs no install refers to")
+    opts = ap.parse_args(argv)
+    store = default_store()
+
+    if opts.cmd == "list":
+        rows = store.entries()
+        for key, v, ok in rows:
+            print(f"{v['sha'][:12]}  {v['when']}  {'ok     ' if ok else 'DAMAGED'}  "
+                  f"{os.path.join(v['folder'], v['name'])}")
+        if not rows:
+            print("No backups.")
+        return 0 if all(ok for _, _, ok in rows) else 1
+    if opts.cmd == "gc":
+        print(f"{store.gc() / 1024:.0f} KB freed")
+        return 0
+
+    matches = {v["sha"] for _, v, _ in store.entries() if v["sha"].startswith(opts.sha.lower())}
+    if len(matches) != 1:
+        print(f"error: {'no' if not matches else 'more than one'} backup matches {opts.sha}",
+              file=sys.stderr)
+        return 2
+    sha = matches.pop()
+    try:
+        method = store.restore(sha, opts.dest)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"{sha[:12]} → {opts.dest} ({method})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
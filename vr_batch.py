@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import vr_patch as patch
+import vr_store
+import vr_compilers
+import vr_presets
+
+# Headless batch driver for both tools. Never imports tkinter.
+#
+#   python vr_launcher_maker.py apply --manifest games.json --jobs 8
+#   python vr_wrapper_maker.py  undo  --profiles
+#   python vr_batch.py launcher check --profiles --only SubnauticaZero
+#
+# A manifest is either a profiles file ({"profiles": {name: {...}}}) or a JSON
+# list of {"folder", "exe", "launcher_name"?, "args"?, "mode"?, "timing"?,
+# "priority"?, "affinity"?, "env"?, "presets"?, "name"?} entries. "presets" is a
+# list of vr_presets names composed in front of "args" at load time.
+
+TOOLS = {
+    "launcher": {"actions": ("apply", "remove", "check")},
+    "wrapper":  {"actions": ("apply", "undo", "remove", "check")},
+}
+
+ICONS = {"ok": "✓ ", "warn": "⚠ ", "err": "✗ ", "dim": "  ", "info": "  ", "purple": "★ "}
+
+
+def load_entries(tool, manifest=None):
+    if manifest:
+        path = manifest
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            items = list(data.get("profiles", {}).items())
+        else:
+            items = [(e.get("name", ""), e) for e in data]
+    else:
+        store = vr_store.open_store(tool)
+        path, items = store.path, store.items()
+        store.close()
+
+    return [make_entry(tool, name, p, path) for name, p in items]
+
+
+def make_entry(tool, name, p, source):
+    # One manifest/profile item → the entry run_operation takes; source names it in errors
+    folder = (p.get("folder") or "").strip()
+    exe    = (p.get("exe") or "").strip()
+    if not folder or not exe:
+        raise ValueError(f"{source}: entry '{name or folder}' needs both 'folder' and 'exe'")
+    entry = {
+        "name":   name or os.path.basename(os.path.normpath(folder)),
+        "folder": folder,
+        "exe":    exe,
+        "timing": bool(p.get("timing", False)),
+    }
+    presets = p.get("presets") or []
+    args = p.get("args") or ("" if presets else patch.DEFAULT_ARGS)
+    try:
+        entry["args"], entry["arg_notes"] = vr_presets.compose(presets, args)
+        entry["launch"] = patch.launch_options(p)
+    except ValueError as e:
+        raise ValueError(f"{source}: entry '{name or folder}': {e}")
+    if tool == "launcher":
+        launcher_name = (p.get("launcher_name") or patch.default_launcher_name(exe)).strip()
+        if not launcher_name.lower().endswith(".exe"):
+            launcher_name += ".exe"
+        entry["launcher_name"] = launcher_name
+        entry["mode"] = p.get("mode") or "exe"
+        if entry["mode"] not in patch.LAUNCHER_MODES:
+            raise ValueError(f"{source}: entry '{name or folder}' has unknown mode '{entry['mode']}'")
+    return entry
+
+
+def run_operation(tool, action, entry, log, steam_options=True):
+    folder, exe = entry["folder"], entry["exe"]
+    if action not in TOOLS.get(tool, {}).get("actions", ()):
+        log(f"Unknown {tool} action: {action}", "err"); return False
+    if not os.path.isdir(folder):
+        log(f"Folder not found: {folder}", "err"); return False
+    if action == "apply":
+        for n in entry.get("arg_notes", ()):
+            log(n, "dim")
+    if tool == "launcher":
+        name = entry["launcher_name"]
+        if action == "apply":
+            ok = patch.apply_launcher(folder, exe, name, entry["args"], log,
+                                      mode=entry["mode"], timing=entry["timing"],
+                                      launch=entry["launch"], steam_options=steam_options)
+            if ok:
+                log(f"Steam launch option: {patch.steam_hint(folder, name, entry['mode'])}", "info")
+            return ok
+        if action == "remove":
+            return patch.remove_launcher(folder, name, log, exe, steam_options)
+        return patch.launcher_status(folder, exe, name, log, entry["args"])
+    if action == "apply":
+        return patch.apply_wrapper(folder, exe, entry["args"], log,
+                                   timing=entry["timing"], launch=entry["launch"])
+    if action in ("undo", "remove"):
+        return patch.undo_wrapper(folder, exe, log)
+    return patch.wrapper_status(folder, exe, log, entry["args"])
+
+
+class FolderLocks:
+    # Two entries pointing at the same install must never run concurrently
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get(self, folder):
+        key = os.path.normcase(os.path.abspath(folder))
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+def _run_job(tool, action, entry, locks, steam_options=True):
+    lines = []
+    def log(msg, tag="info"):
+        lines.append((tag, msg))
+    t0 = time.perf_counter()
+    with locks.get(entry["folder"]):
+        try:
+            ok = bool(run_operation(tool, action, entry, log, steam_options))
+        except Exception as e:
+            log(f"{type(e).__name__}: {e}", "err")
+            ok = False
+    return {"entry": entry, "ok": ok, "seconds": time.perf_counter() - t0, "lines": lines}
+
+
+def run_batch(tool, action, entries, jobs=4, on_result=None, steam_options=True):
+    locks = FolderLocks()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [pool.submit(_run_job, tool, action, e, locks, steam_options) for e in entries]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            if on_result:
+                on_result(res)
+    return results
+
+
+def _print_result(res, verbose):
+    e = res["entry"]
+    status = "OK  " if res["ok"] else "FAIL"
+    print(f"[{status}] {e['name']:<32} {res['seconds']:6.2f}s  {e['folder']}")
+    if verbose or not res["ok"]:
+        for tag, msg in res["lines"]:
+            print(f"         {ICONS.get(tag, '')}{msg}")
+
+
+def build_parser(tool, prog=None):
+    ap = argparse.ArgumentParser(prog=prog, description=f"Headless batch mode for the VR {tool} maker")
+    ap.add_argument("action", choices=TOOLS[tool]["actions"])
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--manifest", help="JSON list of folder/exe/args entries, or a profiles file")
+    src.add_argument("--profiles", action="store_true",
+                     help="use every saved profile (default when no manifest is given)")
+    ap.add_argument("--only", nargs="+", metavar="NAME", help="restrict to these entry/profile names")
+    ap.add_argument("-j", "--jobs", type=int, default=min(8, os.cpu_count() or 1),
+                    help="worker pool size (default: %(default)s)")
+    ap.add_argument("--compiler", choices=vr_compilers.ORDER,
+                    help="C# compiler backend (default: $VR_COMPILER, else first available)")
+    ap.add_argument("--trace", action="store_true",
+                    help="append per-stage timings to vr_trace.jsonl and write vr_metrics.prom")
+    ap.add_argument("--profile", action="store_true", help="cProfile each operation into .vr_profiles/")
+    if tool == "launcher":
+        ap.add_argument("--no-steam-options", action="store_true",
+                        help="don't write launch options into Steam's localconfig.vdf")
+    ap.add_argument("-v", "--verbose", action="store_true", help="print the full log for every entry")
+    return ap
+
+
+def main(tool, argv=None, prog=None):
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(errors="replace")
+    opts = build_parser(tool, prog).parse_args(sys.argv[1:] if argv is None else argv)
+
+    try:
+        entries = load_entries(tool, opts.manifest)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if opts.only:
+        wanted = set(opts.only)
+        entries = [e for e in entries if e["name"] in wanted]
+    if not entries:
+        print("error: nothing to do (no matching entries)", file=sys.stderr)
+        return 2
+
+    if opts.compiler:
+        os.environ["VR_COMPILER"] = opts.compiler
+    if opts.trace:
+        os.environ["VR_TRACE"] = "1"
+    if opts.profile:
+        os.environ["VR_PROFILE"] = "1"
+    if opts.action == "apply":
+        # Detect once up front so every job shares one backend and its warm server
+        compiler = patch.find_compiler(lambda msg, tag="info": opts.verbose and print(msg))
+        if not compiler:
+            print(f"error: no C# compiler backend available ({opts.compiler or 'any'})",
+                  file=sys.stderr)
+            return 2
+        print(f"Compiler: {compiler.describe()}")
+
+    # Launch options for every game go into Steam's config in one pass afterwards
+    steam = tool == "launcher" and opts.action in ("apply", "remove") and not opts.no_steam_options
+    t0 = time.perf_counter()
+    results = run_batch(tool, opts.action, entries, opts.jobs,
+                        on_result=lambda r: _print_result(r, opts.verbose), steam_options=False)
+    if steam:
+        done = [r["entry"] for r in results if r["ok"]]
+        if done:
+            patch.set_steam_options(
+                [patch.steam_option(e["folder"], e["launcher_name"], e["mode"], opts.action == "remove")
+                 for e in done],
+                lambda msg, tag="info": print(f"         {ICONS.get(tag, '')}{msg}"))
+    wall = time.perf_counter() - t0
+
+    failed = sum(1 for r in results if not r["ok"])
+    print(f"─── {opts.action}: {len(results) - failed} ok, {failed} failed, "
+          f"{len(results)} total in {wall:.2f}s (jobs={opts.jobs})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in TOOLS:
+        print(f"usage: {os.path.basename(sys.argv[0])} {{{','.join(TOOLS)}}} ACTION [options]",
+              file=sys.stderr)
+        sys.exit(2)
+    sys.exit(main(sys.argv[1], sys.argv[2:], prog=f"vr_batch.py {sys.argv[1]}"))
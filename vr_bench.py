@@ -0,0 +1,304 @@
+import os
+import sys
+import json
+import time
+import shutil
+import struct
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+import vr_patch as patch
+import vr_pe
+import vr_store
+import vr_backup
+import vr_build_cache
+import vr_fingerprint
+import vr_preflight
+import vr_provision
+import vr_steam
+import vr_compilers
+
+# Benchmark and regression run for the patch pipeline. Builds synthetic game
+# folders, swaps csc for a stand-in that writes a stub PE, times each stage and
+# checks the resulting folder state. Runs anywhere Python does (no Windows needed).
+#
+#   python vr_bench.py --out bench.json
+#   python vr_bench.py --baseline bench.json --threshold 0.25
+
+SIZES = {
+    #          _Data files, EXEs in folder, saved profiles
+    "small":  {"data_files": 200,   "exes": 3,   "profiles": 100},
+    "medium": {"data_files": 5000,  "exes": 50,  "profiles": 1000},
+    "large":  {"data_files": 30000, "exes": 300, "profiles": 5000},
+}
+
+# Regressions smaller than this are noise regardless of the relative threshold
+MIN_DELTA = 0.002
+
+
+def stub_pe(size=4096, dotnet=False, gui=True, x64=True):
+    pe = 0x80
+    opt_size = 240 if x64 else 224
+    buf = bytearray(max(size, pe + 24 + opt_size))
+    buf[0:2] = b"MZ"
+    struct.pack_into("<I", buf, 0x3C, pe)
+    buf[pe:pe + 4] = b"PE\0\0"
+    struct.pack_into("<HHIIIHH", buf, pe + 4, 0x8664 if x64 else 0x014c, 0, 0, 0, 0, opt_size, 0x0022)
+    opt = pe + 24
+    struct.pack_into("<H", buf, opt, 0x20b if x64 else 0x10b)
+    struct.pack_into("<H", buf, opt + 68, 2 if gui else 3)
+    dirs_at = opt + (112 if x64 else 96)
+    struct.pack_into("<I", buf, dirs_at - 4, 16)
+    if dotnet:
+        struct.pack_into("<II", buf, dirs_at + 14 * 8, 0x2008, 0x48)
+    return bytes(buf)
+
+
+def write_fake_csc(root):
+    # Parses /out:<path> like csc and writes a small .NET stub PE there
+    stub = stub_pe(4096, dotnet=True).hex()
+    script = os.path.join(root, "fake_csc.py")
+    with open(script, "w", encoding="utf-8") as f:
+        f.write(f"#!{sys.executable}\n"
+                "import sys\n"
+                f"STUB = bytes.fromhex('{stub}')\n"
+                "for a in sys.argv[1:]:\n"
+                "    if a.startswith('/out:'):\n"
+                "        open(a[5:], 'wb').write(STUB)\n")
+    if os.name == "nt":
+        cmd = os.path.join(root, "fake_csc.cmd")
+        with open(cmd, "w", encoding="utf-8") as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\n')
+        return cmd
+    os.chmod(script, 0o755)
+    return script
+
+
+def make_game(root, name, data_files, exes):
+    folder = os.path.join(root, name)
+    data = os.path.join(folder, f"{name}_Data")
+    per_dir = 500
+    for i in range(data_files):
+        sub = os.path.join(data, "StreamingAssets", f"d{i // per_dir:03d}")
+        if i % per_dir == 0:
+            os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"asset{i:05d}.bin"), "wb") as f:
+            f.write(b"\0" * 64)
+    os.makedirs(os.path.join(data, "Plugins"), exist_ok=True)
+    with open(os.path.join(folder, f"{name}.exe"), "wb") as f:
+        f.write(stub_pe(640 * 1024))
+    with open(os.path.join(folder, "UnityPlayer.dll"), "wb") as f:
+        f.write(stub_pe(8192))
+    with open(os.path.join(folder, "UnityCrashHandler64.exe"), "wb") as f:
+        f.write(stub_pe(1024 * 1024, gui=False))
+    for i in range(max(0, exes - 2)):
+        with open(os.path.join(folder, f"redist_{i:03d}.exe"), "wb") as f:
+            f.write(stub_pe(2 * 1024 * 1024 if i % 7 == 0 else 8192, x64=bool(i % 2)))
+    return folder
+
+
+def _stats(samples):
+    return {"runs": len(samples), "min": min(samples), "median": statistics.median(samples),
+            "mean": statistics.fmean(samples), "max": max(samples)}
+
+
+def _time(fn, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples)
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def _expect(cond, what):
+    if not cond:
+        raise CheckFailed(what)
+
+
+def bench_size(label, spec, root, csc, repeat):
+    out = {}
+    game = "BenchGame"
+    folder = make_game(os.path.join(root, label), game, spec["data_files"], spec["exes"])
+    exe = f"{game}.exe"
+    launcher = patch.default_launcher_name(exe)
+    cache_dir = os.path.join(root, label, "_cache")
+    patch.use_compiler(vr_compilers.NetFxCsc(csc))
+
+    # detection
+    out["detect_exe"] = _time(lambda: vr_pe.rank_game_exes(folder), repeat)
+    _expect(vr_pe.rank_game_exes(folder)[0]["name"] == exe, "detect_exe did not rank the game EXE first")
+
+    # profile storage: one-off migration of a legacy JSON file, then SQLite writes
+    profiles = {f"Game {i:05d}": patch.new_profile("launcher", f"D:/Games/G{i:05d}", f"G{i:05d}.exe")
+                for i in range(spec["profiles"])}
+    cfg = {"profiles": profiles, "last_profile": "Game 00000"}
+    json_path = os.path.join(root, label, "profiles.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, indent=2)
+
+    db_path = os.path.join(root, label, "profiles.db")
+    store = vr_store.ProfileStore(db_path, json_path)
+    _expect(len(store) == spec["profiles"], "SQLite migration lost profiles")
+    out["store_put_many"] = _time(lambda: store.put_many(profiles), repeat)
+    out["store_export_json"] = _time(lambda: store.export_json(json_path), repeat)
+    _expect(store.as_config() == cfg, "SQLite profile round-trip changed the data")
+    out["store_open_index"] = _time(
+        lambda: vr_store.ProfileStore(db_path).index_rows(), repeat)
+    counter = iter(range(10 ** 9))
+    out["store_put_one"] = _time(
+        lambda: store.put("Game 00000", dict(profiles["Game 00000"], args=f"-x {next(counter)}")), repeat)
+    out["store_last_profile"] = _time(
+        lambda: store.set_setting("last_profile", f"Game {next(counter) % spec['profiles']:05d}"), repeat)
+    store.close()
+
+    # template rendering
+    out["render_templates"] = _time(lambda: (
+        patch.render_launcher(exe, "-vrmode openvr"),
+        patch.render_wrapper(f"{game}Real.exe", "-vrmode openvr")), repeat)
+
+    # launcher: cold (csc runs) and warm (cache hit)
+    def fresh_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        vr_build_cache._default = vr_build_cache.BuildCache(cache_dir)
+    apply = lambda: patch.apply_launcher(folder, exe, launcher, "-vrmode openvr", steam_options=False)
+    out["apply_launcher_miss"] = _time(apply, repeat, fresh_cache)
+    out["apply_launcher_hit"] = _time(apply, repeat)
+    _expect(os.path.exists(os.path.join(folder, launcher)), "apply_launcher produced no launcher")
+    out["launcher_status"] = _time(lambda: patch.launcher_status(folder, exe, launcher), repeat)
+    _expect(patch.launcher_status(folder, exe, launcher), "launcher_status not OK after apply")
+    out["remove_launcher"] = _time(
+        lambda: patch.remove_launcher(folder, launcher, exe=exe, steam_options=False), repeat, apply)
+    _expect(not os.path.exists(os.path.join(folder, launcher)), "remove_launcher left the launcher")
+
+    # wrapper: apply/undo cycle (renames the whole _Data tree)
+    with open(os.path.join(folder, exe), "rb") as f:
+        original = f.read()
+    out["apply_wrapper"] = _time(
+        lambda: _expect(patch.apply_wrapper(folder, exe, "-vrmode openvr"), "apply_wrapper failed"),
+        repeat, lambda: patch.undo_wrapper(folder, exe))
+    out["wrapper_status"] = _time(lambda: patch.wrapper_status(folder, exe), repeat)
+    _expect(patch.wrapper_status(folder, exe), "wrapper_status not OK after apply")
+    out["undo_wrapper"] = _time(
+        lambda: _expect(patch.undo_wrapper(folder, exe), "undo_wrapper failed"),
+        repeat, lambda: patch.apply_wrapper(folder, exe, "-vrmode openvr"))
+    with open(os.path.join(folder, exe), "rb") as f:
+        _expect(f.read() == original, "undo_wrapper did not restore the original EXE")
+    _expect(os.path.isdir(os.path.join(folder, f"{game}_Data")), "undo_wrapper did not restore _Data")
+    return out
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for case, cur in results.items():
+        old = baseline.get(case)
+        if not old:
+            continue
+        delta = cur["median"] - old["median"]
+        if delta > MIN_DELTA and cur["median"] > old["median"] * (1 + threshold):
+            regressions.append((case, old["median"], cur["median"]))
+    return regressions
+
+
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=patch.HERE,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark and regression-check the VR patch pipeline")
+    ap.add_argument("--sizes", default="small,medium,large",
+                    help=f"comma-separated subset of {', '.join(SIZES)} (default: all)")
+    ap.add_argument("--repeat", type=int, default=5, help="samples per case (default: %(default)s)")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="results JSON from an earlier revision to compare against")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="allowed median slowdown vs baseline, as a fraction (default: %(default)s)")
+    ap.add_argument("--keep", action="store_true", help="keep the generated game folders")
+    opts = ap.parse_args(argv)
+
+    sizes = [s.strip() for s in opts.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        ap.error(f"unknown size(s): {', '.join(unknown)}")
+
+    root = tempfile.mkdtemp(prefix="vr_bench_")
+    saved_csc, saved_cache = patch._compiler, vr_build_cache._default
+    saved_fp, saved_backup = vr_fingerprint._default, vr_backup._default
+    saved_index = (vr_preflight.INDEX_FILE, vr_provision.INDEX_FILE, vr_steam.INDEX_FILE,
+                   vr_store.LAUNCHER_DB, vr_store.WRAPPER_DB)
+    vr_preflight.INDEX_FILE = os.path.join(root, "preflight.json")
+    vr_provision.INDEX_FILE = os.path.join(root, "provisioned.json")
+    vr_steam.INDEX_FILE = os.path.join(root, "steam_index.json")
+    vr_store.LAUNCHER_DB = os.path.join(root, "launcher.db")
+    vr_store.WRAPPER_DB = os.path.join(root, "wrapper.db")
+    vr_fingerprint._default = vr_fingerprint.HashCache(os.path.join(root, "fingerprints.json"))
+    vr_backup._default = vr_backup.BackupStore(os.path.join(root, "backups"))
+    results, failed = {}, []
+    try:
+        csc = write_fake_csc(root)
+        for size in sizes:
+            t0 = time.perf_counter()
+            try:
+                cases = bench_size(size, SIZES[size], root, csc, opts.repeat)
+            except CheckFailed as e:
+                failed.append(f"{size}: {e}")
+                print(f"[FAIL] {size}: {e}")
+                continue
+            for case, st in cases.items():
+                results[f"{case}/{size}"] = st
+                print(f"  {case + '/' + size:<32} median {st['median'] * 1000:9.3f} ms"
+                      f"   min {st['min'] * 1000:9.3f} ms")
+            print(f"[OK  ] {size} ({time.perf_counter() - t0:.1f}s incl. setup)")
+    finally:
+        patch.use_compiler(saved_csc)
+        vr_build_cache._default = saved_cache
+        vr_fingerprint._default, vr_backup._default = saved_fp, saved_backup
+        (vr_preflight.INDEX_FILE, vr_provision.INDEX_FILE, vr_steam.INDEX_FILE,
+         vr_store.LAUNCHER_DB, vr_store.WRAPPER_DB) = saved_index
+        if opts.keep:
+            print(f"Game folders kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {"meta": {"revision": _revision(), "python": platform.python_version(),
+                       "platform": platform.platform(), "repeat": opts.repeat,
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+              "results": results}
+    if opts.out:
+        with open(opts.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {opts.out}")
+
+    if opts.baseline:
+        with open(opts.baseline, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        regressions = compare(results, base.get("results", {}), opts.threshold)
+        rev = base.get("meta", {}).get("revision") or os.path.basename(opts.baseline)
+        for case, old, new in regressions:
+            print(f"[REGRESSION] {case}: {old * 1000:.3f} ms → {new * 1000:.3f} ms "
+                  f"(+{(new / old - 1) * 100:.0f}% vs {rev})")
+        if regressions:
+            failed.append(f"{len(regressions)} regression(s) beyond {opts.threshold:.0%}")
+        else:
+            print(f"No regressions beyond {opts.threshold:.0%} vs {rev}")
+
+    for f in failed:
+        print(f"FAILED: {f}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import threading
+
+# Post-launch check from BepInEx's <game>/BepInEx/LogOutput.log: did the game
+# get our arguments, and did the mods load? The log can grow to hundreds of MB
+# when a mod spams it, so it is never read whole. On first sight of a session
+# the start of the file (header, command line, plugin loading) is read, then
+# only the last TAIL_BYTES; afterwards each check reads just the bytes added
+# since the saved offset. BepInEx rewrites the file on every launch; a changed
+# first line means a new session and the log is looked at afresh.
+
+LOG_REL       = os.path.join("BepInEx", "LogOutput.log")
+INDEX_FILE    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vr_bepinex_index.json")
+INDEX_VERSION = 1
+HEAD_BYTES    = 256 * 1024    # a session's start: header, command line, plugin loading
+TAIL_BYTES    = 1024 * 1024   # how far back a first look at a big log reaches
+CHUNK         = 1024 * 1024
+SIG_BYTES     = 256           # the header line, which carries the launch time
+KEEP_ERRORS   = 5
+KEY_MODS      = ("Nautilus",)
+
+_HEADER   = re.compile(r"\]\s*BepInEx (\d[\w.]*) - (.+?)(?: \((.+)\))?\s*$")
+_CMDLINE  = re.compile(r"(?i)\bcommand[ -]?line(?: arguments)?\s*:\s*(.+)")
+_UNITY    = re.compile(r"Running under Unity v?(\S+)")
+_LOADING  = re.compile(r"\] Loading \[(.+?)(?: (\d[\w.]*))?\]")
+_SKIPPED  = re.compile(r"\] Skipping \[(.+?)(?: (\d[\w.]*))?\]")
+_FAILED   = re.compile(r"\] (?:Error loading|Could not load) \[(.+?)(?: (\d[\w.]*))?\]")
+_LEVEL    = re.compile(r"^\[(Error|Fatal)\s*:")
+_DONE     = "Chainloader startup complete"
+_VRMODE   = re.compile(r"(?i)(?:^|\s)-vrmode\s+\"?([A-Za-z]+)")
+
+_lock = threading.Lock()
+
+
+def new_session():
+    return {"bepinex": None, "game": None, "started": None, "unity": None, "command_line": None,
+            "plugins": {}, "chainloader_done": False, "errors": []}
+
+
+def parse_line(s, line):
+    # Folds one log line into session s; a header line starts a new session
+    m = _HEADER.search(line)
+    if m and line.startswith("[") and " - " in line:
+        s.clear()
+        s.update(new_session(), bepinex=m.group(1), game=m.group(2), started=m.group(3))
+        return
+    if s["command_line"] is None:
+        m = _CMDLINE.search(line)
+        if m:
+            s["command_line"] = m.group(1).strip(); return
+    if s["unity"] is None:
+        m = _UNITY.search(line)
+        if m:
+            s["unity"] = m.group(1); return
+    for pattern, state in ((_LOADING, "loaded"), (_FAILED, "failed"), (_SKIPPED, "skipped")):
+        m = pattern.search(line)
+        if m:
+            if not (state == "loaded" and s["plugins"].get(m.group(1)) == "failed"):
+                s["plugins"][m.group(1)] = state
+            break
+    if _DONE in line:
+        s["chainloader_done"] = True
+    if _LEVEL.match(line) or "Exception:" in line:
+        s["errors"] = (s["errors"] + [line.strip()[:200]])[-KEEP_ERRORS:]
+
+
+def _scan(f, s, start, end, aligned=True):
+    # Parses [start, end) in CHUNK pieces; returns the offset after the last full line
+    f.seek(start)
+    pos, carry = start, b""
+    while pos < end:
+        data = f.read(min(CHUNK, end - pos))
+        if not data:
+            break
+        pos += len(data)
+        lines = (carry + data).split(b"\n")
+        carry = lines.pop()
+        if not aligned:
+            lines, aligned = lines[1:], True      # landed mid-line
+        for raw in lines:
+            parse_line(s, raw.decode("utf-8", errors="replace").rstrip("\r"))
+    return pos - len(carry)
+
+
+def _read(path, entry):
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        sig = hashlib.sha1(f.read(SIG_BYTES)).hexdigest()
+        if (st.st_size < entry.get("offset", 0) or st.st_ino != entry.get("ino")
+                or sig != entry.get("sig")):
+            entry.update(ino=st.st_ino, sig=sig, session=new_session())
+            entry["offset"] = _scan(f, entry["session"], 0, min(st.st_size, HEAD_BYTES))
+            if st.st_size - TAIL_BYTES > entry["offset"]:
+                entry["offset"] = _scan(f, entry["session"], st.st_size - TAIL_BYTES, st.st_size,
+                                        aligned=False)
+        elif st.st_size > entry["offset"]:
+            entry["offset"] = _scan(f, entry["session"], entry["offset"], st.st_size)
+    entry["mtime"] = st.st_mtime
+
+
+def load_index(path=None):
+    try:
+        with open(path or INDEX_FILE, "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "logs": {}}
+
+
+def save_index(idx, path=None):
+    path = path or INDEX_FILE
+    tmp = path + f".{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(idx, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def session(folder, index_path=None):
+    # (latest session, log mtime) for a game folder, or None without a BepInEx log
+    path = os.path.join(folder, LOG_REL)
+    if not os.path.isfile(path):
+        return None
+    key = os.path.normcase(os.path.abspath(path))
+    with _lock:
+        idx = load_index(index_path)
+        entry = idx["logs"].setdefault(key, {})
+        before = (entry.get("offset"), entry.get("sig"))
+        _read(path, entry)
+        if (entry["offset"], entry["sig"]) != before:
+            try:
+                save_index(idx, index_path)
+            except OSError:
+                pass
+        return entry["session"], entry["mtime"]
+
+
+def verify(s, args):
+    # [(tag, message)] comparing a session with the args the profile applies
+    out = []
+    cmd = s["command_line"]
+    if cmd is None:
+        out.append(("dim", f"BepInEx {s['bepinex'] or '?'} did not log the command line"))
+    else:
+        out.append(("info", f"Command line: {cmd[:200]}"))
+        modes = [m.lower() for m in _VRMODE.findall(cmd)]
+        want = [m.lower() for m in _VRMODE.findall(args or "")]
+        if want and modes and modes[0] != want[-1]:
+            # Unity honours the first -vrmode; Steam's -vrmode none must not come first
+            out.append(("err", f"-vrmode {modes[0]} reached the game first — launched without the patch?"))
+        elif want and not modes:
+            out.append(("err", f"-vrmode {want[-1]} is not on the command line"))
+        else:
+            low = f" {cmd.lower()} "
+            missing = [t for t in (args or "").split() if t.startswith("-") and f" {t.lower()} " not in low]
+            if missing:
+                out.append(("warn", f"Not on the command line: {' '.join(missing)}"))
+            elif args:
+                out.append(("ok", "Launch arguments took effect"))
+
+    plugins = s["plugins"]
+    count = {state: sorted(n for n, st in plugins.items() if st == state)
+             for state in ("loaded", "failed", "skipped")}
+    parts = [f"{len(count['loaded'])} loaded"]
+    if count["failed"]:
+        parts.append(f"{len(count['failed'])} failed ({', '.join(count['failed'][:5])})")
+    if count["skipped"]:
+        parts.append(f"{len(count['skipped'])} skipped ({', '.join(count['skipped'][:5])})")
+    tag = "warn" if count["failed"] or count["skipped"] else "ok"
+    out.append((tag, f"BepInEx plugins: {', '.join(parts)}"))
+    if count["skipped"]:
+        out.append(("dim", "Skipped plugins are filtered by process name — the wrapper's renamed EXE "
+                           "does that; use the launcher instead"))
+    if plugins and not s["chainloader_done"]:
+        out.append(("warn", "Plugin loading never finished (crashed or still starting)"))
+    for mod in KEY_MODS:
+        states = {plugins[n] for n in plugins if mod.lower() in n.lower()}
+        if states:
+            state = "loaded" if states == {"loaded"} else "/".join(sorted(states))
+            out.append(("ok" if state == "loaded" else "warn", f"{mod}: {state}"))
+    for e in s["errors"][-3:]:
+        out.append(("dim", f"  {e}"))
+    return out
+
+
+def log_summary(folder, args, log, since=None):
+    # Status lines for check_status; silent when the game has no BepInEx log.
+    # since: mtime of the patch, to tell a launch before it from one after.
+    try:
+        found = session(folder)
+    except OSError as e:
+        log(f"BepInEx log unreadable: {e}", "warn"); return
+    if not found:
+        return
+    s, mtime = found
+    if since and mtime < since:
+        log("BepInEx log is from before the patch — launch the game once to verify it", "dim")
+        return
+    log(f"Last launch (BepInEx log{', ' + s['started'] if s['started'] else ''}):", "dim")
+    for tag, msg in verify(s, args):
+        log(msg, tag)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check the last launch from BepInEx's LogOutput.log")
+    ap.add_argument("folder", help="game folder (the one containing BepInEx/)")
+    ap.add_argument("--args", default="", help="arguments the launch should have had")
+    ap.add_argument("--json", action="store_true", help="print the parsed session")
+    opts = ap.parse_args(argv)
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(errors="replace")
+    try:
+        found = session(opts.folder)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not found:
+        print(f"No {LOG_REL} in {opts.folder}")
+        return 2
+    if opts.json:
+        print(json.dumps(found[0], indent=2, ensure_ascii=False))
+        return 0
+    results = verify(found[0], opts.args)
+    for tag, msg in results:
+        print(msg)
+    return 1 if any(tag == "err" for tag, _ in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+import threading
+
+import vr_backup
+from vr_fingerprint import hash_file
+from vr_worker import Cancelled
+
+# Compiled launcher/wrapper EXEs, keyed by sha256(compiler + flags + C# source).
+# A hit is a reflink (or plain copy) into the game folder instead of a csc run,
+# never a hardlink: an updater writing the game's copy in place must not change
+# the entry. Each entry has a .sha256 of its contents, checked on fetch. Last
+# use is kept in index.json for LRU eviction, not in the entries' mtimes.
+CACHE_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".vr_build_cache")
+CACHE_LIMIT = 64 * 1024 * 1024
+
+
+class BuildCache:
+    def __init__(self, root=CACHE_DIR, limit=CACHE_LIMIT):
+        self.root   = root
+        self.limit  = limit
+        self.hits   = 0
+        self.misses = 0
+        self._lock  = threading.Lock()
+
+    def key(self, compiler, flags, source):
+        # compiler: path of the csc/mcs/csc.dll that produces the output
+        h = hashlib.sha256()
+        try:
+            st = os.stat(compiler)
+            stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            stamp = ""
+        # Compiler size/mtime are folded in so a .NET update invalidates old builds
+        for part in (compiler, stamp, "\0".join(flags), source):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key[:2], key + ".exe")
+
+    def _intact(self, src):
+        try:
+            with open(src[:-4] + ".sha256", "r", encoding="ascii") as f:
+                return f.read().strip() == hash_file(src)
+        except OSError:
+            return False
+
+    def _drop(self, src):
+        for path in (src, src[:-4] + ".sha256"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def fetch(self, key, dest):
+        src = self._entry(key)
+        with self._lock:
+            if not os.path.isfile(src):
+                self.misses += 1
+                return False
+            if not self._intact(src):
+                self._drop(src)
+                self.misses += 1
+                return False
+            try:
+                place_file(src, dest)
+            except OSError:
+                self.misses += 1
+                return False
+            self._touch(key)
+            self.hits += 1
+            return True
+
+    def store(self, key, built):
+        dst = self._entry(key)
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                tmp = dst + f".{os.getpid()}.tmp"
+                shutil.copyfile(built, tmp)
+                with open(dst[:-4] + ".sha256", "w", encoding="ascii") as f:
+                    f.write(hash_file(tmp))
+                os.replace(tmp, dst)
+            except OSError:
+                return
+            self._touch(key)
+            self._evict()
+
+    # ── LRU index ───────────────────────────────────────────────────────────
+
+    def _index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, used):
+        tmp = self._index_path() + f".{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(used, f)
+            os.replace(tmp, self._index_path())
+        except OSError:
+            pass
+
+    def _touch(self, key):
+        used = self._load_index()
+        used[key] = time.time()
+        self._save_index(used)
+
+    def _evict(self):
+        # Least recently used first; entries the index doesn't know go by their mtime
+        used = self._load_index()
+        entries, total = [], 0
+        for sub in _scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for e in _scandir(sub.path):
+                if e.name.endswith(".exe"):
+                    st = e.stat()
+                    key = e.name[:-4]
+                    entries.append((used.get(key, st.st_mtime), st.st_size, e.path, key))
+                    total += st.st_size
+        entries.sort()
+        dropped = False
+        for _, size, path, key in entries:
+            if total <= self.limit:
+                break
+            self._drop(path)
+            dropped |= used.pop(key, None) is not None
+            total -= size
+        if dropped:
+            self._save_index(used)
+
+    def stats(self):
+        return f"{self.hits} hit(s) / {self.misses} miss(es)"
+
+
+def _scandir(path):
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except OSError:
+        return []
+
+
+def place_file(src, dest):
+    # Reflink where possible, copy otherwise; always atomic over an existing dest
+    vr_backup.place(src, dest, allow_link=False)
+
+
+_default = None
+
+def default_cache():
+    global _default
+    if _default is None:
+        _default = BuildCache()
+    return _default
+
+
+def build_exe(compiler, target, optimize, cs_code, out_path, cs_path, cache=None, cancel=None):
+    # compiler is a vr_compilers backend. Returns (from_cache, diagnostics).
+    # Success is judged by out_path existing, as before.
+    # Setting the optional cancel Event kills the compiler and raises Cancelled.
+    cache = cache or default_cache()
+    key = cache.key(compiler.path, compiler.flags(target, optimize), cs_code)
+    if cache.fetch(key, out_path):
+        return True, ""
+    # out_path may be a hardlink into the cache made by an older version; never
+    # let csc write through it
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    with open(cs_path, "w", encoding="utf-8") as f:
+        f.write(cs_code)
+    stdout = stderr = ""
+    try:
+        with subprocess.Popen(compiler.command(out_path, target, optimize, cs_path),
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as proc:
+            while True:
+                try:
+                    stdout, stderr = proc.communicate(timeout=0.1)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel is not None and cancel.is_set():
+                        proc.kill()
+                        proc.wait()
+                        break
+        if cancel is not None and cancel.is_set() and proc.returncode != 0:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+            raise Cancelled()
+    finally:
+        if os.path.exists(cs_path):
+            os.remove(cs_path)
+    if os.path.exists(out_path):
+        cache.store(key, out_path)
+    # csc prints its diagnostics on stdout
+    return False, stderr or stdout
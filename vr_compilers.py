@@ -0,0 +1,208 @@
+import os
+import sys
+import glob
+import shutil
+import argparse
+import subprocess
+
+# C# compiler backends. Each knows how to turn (target, optimize, source, out)
+# into a command line; flags() returns only the options that affect the output,
+# which is what the build cache keys on. Roslyn backends whose VBCSCompiler
+# server is known to be there run with -shared, so a batch of builds reuses one
+# warm server instead of cold-starting.
+
+KEEPALIVE = 600   # seconds an idle compiler server stays up
+
+NETFX_PATHS = [
+    r"C:\Windows\Microsoft.NET\Framework64\v4.0.30319\csc.exe",
+    r"C:\Windows\Microsoft.NET\Framework\v4.0.30319\csc.exe",
+]
+
+ROSLYN_GLOBS = [
+    r"C:\Program Files*\Microsoft Visual Studio\*\*\MSBuild\Current\Bin\Roslyn\csc.exe",
+]
+
+REFASM_GLOBS = [
+    r"C:\Program Files*\Reference Assemblies\Microsoft\Framework\.NETFramework\v4.8*",
+    r"C:\Program Files*\Reference Assemblies\Microsoft\Framework\.NETFramework\v4.7*",
+    "/usr/lib/mono/4.8-api",
+    "/usr/lib/mono/4.7.2-api",
+    "/usr/lib/mono/4.5-api",
+    "/Library/Frameworks/Mono.framework/Versions/Current/lib/mono/4.8-api",
+    "~/.nuget/packages/microsoft.netframework.referenceassemblies.net48/*/build/.NETFramework/v4.8",
+    "~/.nuget/packages/microsoft.netframework.referenceassemblies.net472/*/build/.NETFramework/v4.7.2",
+]
+
+REF_NAMES = ("mscorlib.dll", "System.dll", "System.Core.dll", "netstandard.dll")
+
+ORDER = ("roslyn-csc", "netfx-csc", "mono-mcs", "dotnet-csc")
+
+
+class Compiler:
+    kind   = ""
+    server = False
+
+    def __init__(self, path):
+        self.path = path
+
+    def describe(self):
+        return f"{self.kind}{' [server]' if self.server else ''} ({self.path})"
+
+    def flags(self, target, optimize):
+        return [f"/target:{target}"] + (["/optimize+"] if optimize else [])
+
+    def command(self, out_path, target, optimize, src):
+        return [self.path, f"/out:{out_path}", *self.flags(target, optimize), src]
+
+    def shutdown(self):
+        pass
+
+
+class NetFxCsc(Compiler):
+    # csc.exe shipped with .NET Framework 4.x (C# 5, no server mode)
+    kind = "netfx-csc"
+
+
+class RoslynCsc(Compiler):
+    # Visual Studio / Build Tools or Mono's Roslyn csc. /shared only when the
+    # VBCSCompiler server sits next to csc; a wrapper script on PATH (Mono's
+    # /usr/bin/csc) gives no such guarantee and compiles without it.
+    kind = "roslyn-csc"
+
+    def __init__(self, path):
+        super().__init__(path)
+        home = os.path.dirname(os.path.realpath(path))
+        self.server = any(os.path.isfile(os.path.join(home, n))
+                          for n in ("VBCSCompiler.exe", "VBCSCompiler.dll", "VBCSCompiler"))
+
+    def command(self, out_path, target, optimize, src):
+        shared = ["/shared", f"/keepalive:{KEEPALIVE}"] if self.server else []
+        return [self.path, "/nologo", *shared, f"/out:{out_path}", *self.flags(target, optimize), src]
+
+
+class MonoMcs(Compiler):
+    kind = "mono-mcs"
+
+    def flags(self, target, optimize):
+        return [f"-target:{target}"] + (["-optimize+"] if optimize else [])
+
+    def command(self, out_path, target, optimize, src):
+        return [self.path, f"-out:{out_path}", *self.flags(target, optimize), src]
+
+
+class DotnetCsc(Compiler):
+    # Roslyn from a .NET SDK, run through the dotnet host against reference assemblies
+    kind   = "dotnet-csc"
+    server = True
+
+    def __init__(self, dotnet, csc_dll, refs):
+        super().__init__(csc_dll)
+        self.dotnet = dotnet
+        self.refs   = refs
+
+    def flags(self, target, optimize):
+        return (["-noconfig", "-nostdlib"] + [f"-r:{r}" for r in self.refs] +
+                [f"-target:{target}"] + (["-optimize+"] if optimize else []))
+
+    def command(self, out_path, target, optimize, src):
+        return [self.dotnet, self.path, "-nologo", "-shared", f"-keepalive:{KEEPALIVE}",
+                f"-out:{out_path}", *self.flags(target, optimize), src]
+
+    def shutdown(self):
+        try:
+            subprocess.run([self.dotnet, "build-server", "shutdown", "--vbcscompiler"],
+                           capture_output=True, timeout=30)
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+
+# ── detection ───────────────────────────────────────────────────────────────
+
+def _first(paths):
+    return next((p for p in paths if p and os.path.isfile(p)), None)
+
+
+def _globbed(patterns):
+    found = []
+    for pat in patterns:
+        found += sorted(glob.glob(os.path.expanduser(pat)), reverse=True)
+    return found
+
+
+def find_reference_assemblies():
+    # Returns (list of .dll to reference, None) or (None, reason)
+    explicit = os.environ.get("VR_CSC_REFS")
+    dirs = [explicit] if explicit else _globbed(REFASM_GLOBS)
+    for d in dirs:
+        has = lambda n: os.path.isfile(os.path.join(d, n))
+        if has("mscorlib.dll") or (explicit and has("netstandard.dll")):
+            # netstandard ref packs ship mscorlib as a facade over netstandard.dll
+            return [os.path.join(d, n) for n in REF_NAMES if has(n)], None
+    if explicit:
+        return None, f"VR_CSC_REFS has no mscorlib.dll or netstandard.dll: {explicit}"
+    return None, ".NET Framework reference assemblies not found (set VR_CSC_REFS)"
+
+
+def _detect_dotnet():
+    dotnet = shutil.which("dotnet") or _first([os.path.expanduser("~/.dotnet/dotnet"),
+                                               r"C:\Program Files\dotnet\dotnet.exe"])
+    if not dotnet:
+        return None, "dotnet not found"
+    root = os.path.dirname(os.path.realpath(dotnet))
+    cscs = sorted(glob.glob(os.path.join(root, "sdk", "*", "Roslyn", "bincore", "csc.dll")),
+                  key=lambda p: [int(x) if x.isdigit() else 0
+                                 for x in os.path.basename(p.split(os.sep + "Roslyn")[0]).split(".")],
+                  reverse=True)
+    if not cscs:
+        return None, f"no SDK with Roslyn under {root}"
+    refs, reason = find_reference_assemblies()
+    if not refs:
+        return None, reason
+    return DotnetCsc(dotnet, cscs[0], refs), ""
+
+
+def detect(netfx_paths=NETFX_PATHS):
+    # [(kind, compiler or None, reason)] for every backend, in preference order
+    found = {}
+    p = _first(netfx_paths)
+    found["netfx-csc"] = (NetFxCsc(p), "") if p else (None, "csc.exe not found (.NET Framework 4.x)")
+
+    candidates = _globbed(ROSLYN_GLOBS)
+    if sys.platform != "win32":
+        candidates.append(shutil.which("csc"))
+    p = _first(candidates)
+    found["roslyn-csc"] = (RoslynCsc(p), "") if p else (None, "no Visual Studio/Mono Roslyn csc")
+
+    p = shutil.which("mcs") or _first([r"C:\Program Files\Mono\bin\mcs.bat"])
+    found["mono-mcs"] = (MonoMcs(p), "") if p else (None, "mcs not found (Mono)")
+
+    found["dotnet-csc"] = _detect_dotnet()
+    return [(k, *found[k]) for k in ORDER]
+
+
+def choose(results, prefer=None):
+    # prefer: a backend kind, or None for the first available in ORDER
+    prefer = prefer or os.environ.get("VR_COMPILER") or None
+    for kind, comp, _ in results:
+        if comp and (prefer is None or kind == prefer):
+            return comp
+    return None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="List C# compiler backends")
+    ap.add_argument("--shutdown", action="store_true",
+                    help="stop any idle compiler servers started by server-mode backends")
+    opts = ap.parse_args(argv)
+    results = detect()
+    chosen = choose(results)
+    for kind, comp, reason in results:
+        mark = "*" if comp is chosen and comp else " "
+        print(f"{mark} {kind:<11} {comp.describe() if comp else '— ' + reason}")
+        if comp and opts.shutdown:
+            comp.shutdown()
+    return 0 if chosen else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+import os
+import sys
+import json
+import time
+import socket
+import secrets
+import argparse
+import threading
+import socketserver
+
+import vr_batch
+import vr_patch as patch
+import vr_store
+import vr_compilers
+import vr_trace
+
+# Long-running local service for provisioning scripts: the batch operations and
+# profile CRUD as JSON-RPC 2.0, one JSON object per line. It listens on a Unix
+# socket (mode 0600) where the platform has them, else on 127.0.0.1 with a
+# random token every request must carry as "auth". Where to connect is written
+# to vr_daemon.json. The profile stores, compiler detection (and its warm
+# compiler server), presets and hash caches stay loaded between calls.
+#
+#   python vr_daemon.py serve
+#   python vr_daemon.py call apply '{"tool": "wrapper", "profile": "SubnauticaZero"}'
+#
+# Each log line of a running operation is sent as a notification before the
+# response:
+#
+#   → {"jsonrpc": "2.0", "id": 7, "method": "apply", "params": {"tool": "launcher", "profile": "BZ"}}
+#   ← {"jsonrpc": "2.0", "method": "progress", "params": {"id": 7, "tag": "info", "message": "..."}}
+#   ← {"jsonrpc": "2.0", "id": 7, "result": {"ok": true, "seconds": 1.42}}
+#
+# Requests on one connection run concurrently and may be answered out of order.
+# Operations on the same game folder wait for each other; other folders run in
+# parallel, up to --jobs at a time.
+
+ENDPOINT_FILE = os.path.join(patch.HERE, "vr_daemon.json")
+SOCKET_PATH   = os.path.join(patch.HERE, "vr_daemon.sock")
+PORT          = 47631
+MAX_LINE      = 1 << 20
+
+PARSE_ERROR      = -32700
+INVALID_REQUEST  = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS   = -32602
+INTERNAL_ERROR   = -32603
+NOT_FOUND        = -32001
+UNAUTHORIZED     = -32002
+
+OPERATIONS = {"apply": "apply", "remove": "remove", "undo": "undo", "status": "check"}
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def _param(params, key, kind=str, required=True):
+    value = params.get(key)
+    if value is None and not required:
+        return None
+    if not isinstance(value, kind):
+        raise RpcError(INVALID_PARAMS, f"'{key}' must be a {kind.__name__}")
+    return value
+
+
+class Service:
+    # The methods; transport-independent so it can be driven in-process too
+    def __init__(self, jobs=4):
+        self.started   = time.time()
+        self.locks     = vr_batch.FolderLocks()
+        self.slots     = threading.BoundedSemaphore(max(1, jobs))
+        self.stop      = threading.Event()
+        self._stores   = {}
+        self._backends = None
+        self._guard    = threading.Lock()
+
+    def store(self, tool):
+        with self._guard:
+            if tool not in self._stores:
+                self._stores[tool] = vr_store.open_store(tool)
+            return self._stores[tool]
+
+    def warm(self, log=patch._null_log):
+        for tool in vr_batch.TOOLS:
+            self.store(tool)
+        return patch.find_compiler(log)
+
+    def close(self):
+        with self._guard:
+            for store in self._stores.values():
+                store.close()
+            self._stores.clear()
+
+    def _tool(self, params):
+        tool = _param(params, "tool")
+        if tool not in vr_batch.TOOLS:
+            raise RpcError(INVALID_PARAMS, f"unknown tool '{tool}' (launcher or wrapper)")
+        return tool
+
+    def _entry(self, tool, params):
+        # {"profile": name} or {"entry": {...manifest entry...}}
+        name = _param(params, "profile", required=False)
+        item = _param(params, "entry", dict, required=False)
+        if (name is None) == (item is None):
+            raise RpcError(INVALID_PARAMS, "give exactly one of 'profile' or 'entry'")
+        if name is not None:
+            item = self.store(tool).get(name)
+            if item is None:
+                raise RpcError(NOT_FOUND, f"no {tool} profile named '{name}'")
+        try:
+            return vr_batch.make_entry(tool, name or item.get("name", ""), item, "request")
+        except ValueError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+
+    # ── methods ─────────────────────────────────────────────────────────────
+
+    def call(self, method, params, progress):
+        if method in OPERATIONS:
+            return self.operate(OPERATIONS[method], params, progress)
+        fn = {"ping": self.ping, "compilers": self.compilers, "shutdown": self.shutdown,
+              "metrics": self.metrics,
+              "profiles.list": self.profiles_list, "profiles.get": self.profiles_get,
+              "profiles.put": self.profiles_put, "profiles.delete": self.profiles_delete}.get(method)
+        if fn is None:
+            raise RpcError(METHOD_NOT_FOUND, f"unknown method '{method}'")
+        return fn(params)
+
+    def operate(self, action, params, progress):
+        tool = self._tool(params)
+        if action not in vr_batch.TOOLS[tool]["actions"]:
+            raise RpcError(INVALID_PARAMS, f"the {tool} tool has no '{action}' action")
+        entry = self._entry(tool, params)
+        if action == "apply" and not patch.find_compiler():
+            raise RpcError(INTERNAL_ERROR, "no C# compiler backend available")
+        t0 = time.perf_counter()
+        # Folder lock first: a request queued behind its folder must not hold a job slot
+        lock = self.locks.get(entry["folder"])
+        if not lock.acquire(blocking=False):
+            progress("Waiting for another operation on this folder…", "dim")
+            lock.acquire()
+        try:
+            with self.slots:
+                ok = bool(vr_batch.run_operation(tool, action, entry, progress))
+        except Exception as e:
+            progress(f"{type(e).__name__}: {e}", "err")
+            ok = False
+        finally:
+            lock.release()
+        return {"ok": ok, "seconds": round(time.perf_counter() - t0, 3)}
+
+    def ping(self, params):
+        return {"pid": os.getpid(), "uptime": round(time.time() - self.started, 1)}
+
+    def compilers(self, params):
+        comp = patch.find_compiler()
+        if self._backends is None:
+            self._backends = [{"kind": kind, "path": c.path if c else None, "reason": reason}
+                              for kind, c, reason in vr_compilers.detect(patch.CSC_PATHS)]
+        return {"active": comp.describe() if comp else None, "backends": self._backends}
+
+    def metrics(self, params):
+        # Prometheus text for every operation this daemon has run
+        return vr_trace.prometheus()
+
+    def shutdown(self, params):
+        self.stop.set()
+        return True
+
+    def profiles_list(self, params):
+        return dict(self.store(self._tool(params)).items())
+
+    def profiles_get(self, params):
+        tool, name = self._tool(params), _param(params, "name")
+        profile = self.store(tool).get(name)
+        if profile is None:
+            raise RpcError(NOT_FOUND, f"no {tool} profile named '{name}'")
+        return profile
+
+    def profiles_put(self, params):
+        tool, name = self._tool(params), _param(params, "name")
+        profile = _param(params, "profile", dict)
+        try:
+            vr_batch.make_entry(tool, name, profile, "profile")
+        except ValueError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        return {"changed": self.store(tool).put(name, profile)}
+
+    def profiles_delete(self, params):
+        tool, name = self._tool(params), _param(params, "name")
+        return {"deleted": self.store(tool).delete(name)}
+
+
+# ── transport ───────────────────────────────────────────────────────────────
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self._write_lock = threading.Lock()
+
+    def send(self, msg):
+        data = (json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                pass          # client went away; the operation still finishes
+
+    def handle(self):
+        workers = []
+        while not self.server.service.stop.is_set():
+            line = self.rfile.readline(MAX_LINE)
+            if not line:
+                break
+            if not line.lstrip().startswith(b"{"):
+                if line.strip():
+                    break     # not JSON-RPC (e.g. an HTTP request); drop the connection
+                continue
+            t = threading.Thread(target=self.dispatch, args=(line,), daemon=True)
+            t.start()
+            workers.append(t)
+        for t in workers:
+            t.join()
+
+    def dispatch(self, line):
+        try:
+            req = json.loads(line)
+        except ValueError as e:
+            self.send({"jsonrpc": "2.0", "id": None,
+                       "error": {"code": PARSE_ERROR, "message": f"parse error: {e}"}})
+            return
+        rid = req.get("id")
+        try:
+            if req.get("jsonrpc") != "2.0" or not isinstance(req.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "expected a JSON-RPC 2.0 request")
+            if self.server.token and not secrets.compare_digest(str(req.get("auth")), self.server.token):
+                raise RpcError(UNAUTHORIZED, "missing or wrong 'auth' token")
+            params = req.get("params") or {}
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            progress = (lambda msg, tag="info": self.send(
+                {"jsonrpc": "2.0", "method": "progress",
+                 "params": {"id": rid, "tag": tag, "message": msg}}))
+            reply = {"result": self.server.service.call(req["method"], params, progress)}
+        except RpcError as e:
+            reply = {"error": {"code": e.code, "message": str(e)}}
+        except Exception as e:
+            reply = {"error": {"code": INTERNAL_ERROR, "message": f"{type(e).__name__}: {e}"}}
+        if "id" in req:
+            self.send(dict(jsonrpc="2.0", id=rid, **reply))
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TcpServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = os.name != "nt"     # on Windows it would let a second server steal the port
+
+
+def _socket_alive(path):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        s.close()
+
+
+def make_server(service, path=None, port=None):
+    # Unix socket unless a port is given or the platform has none
+    if port is None and hasattr(socket, "AF_UNIX"):
+        path = path or SOCKET_PATH
+        if os.path.exists(path):
+            if _socket_alive(path):
+                raise OSError(f"a daemon is already listening on {path}")
+            os.remove(path)
+        old = os.umask(0o177)
+        try:
+            server = _UnixServer(path, _Handler)
+        finally:
+            os.umask(old)
+        server.token, endpoint = None, {"unix": path}
+    else:
+        server = _TcpServer(("127.0.0.1", PORT if port is None else port), _Handler)
+        server.token = secrets.token_hex(16)
+        endpoint = {"port": server.server_address[1], "token": server.token}
+    server.service = service
+    server.endpoint = dict(endpoint, pid=os.getpid())
+    return server
+
+
+def _write_endpoint(endpoint):
+    tmp = ENDPOINT_FILE + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(endpoint, f)
+    os.replace(tmp, ENDPOINT_FILE)
+
+
+def serve(path=None, port=None, jobs=4, out=print):
+    service = Service(jobs)
+    server = make_server(service, path, port)
+    _write_endpoint(server.endpoint)
+    where = server.endpoint.get("unix") or f"127.0.0.1:{server.endpoint['port']}"
+    out(f"Listening on {where} (pid {os.getpid()}, jobs={jobs})")
+    comp = service.warm(lambda msg, tag="info": None)
+    out(f"Compiler: {comp.describe() if comp else 'none available'}")
+    threading.Thread(target=server.serve_forever, args=(0.5,), daemon=True).start()
+    try:
+        while not service.stop.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+        if "unix" in server.endpoint:
+            try:
+                os.remove(server.endpoint["unix"])
+            except OSError:
+                pass
+        try:
+            os.remove(ENDPOINT_FILE)
+        except OSError:
+            pass
+    return 0
+
+
+# ── client ──────────────────────────────────────────────────────────────────
+
+def call(method, params=None, on_progress=None, endpoint=None):
+    # Sends one request and returns its result; raises RpcError for an error reply
+    if endpoint is None:
+        with open(ENDPOINT_FILE, "r", encoding="utf-8") as f:
+            endpoint = json.load(f)
+    if "unix" in endpoint:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(endpoint["unix"])
+    else:
+        sock = socket.create_connection(("127.0.0.1", endpoint["port"]))
+    req = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}
+    if endpoint.get("token"):
+        req["auth"] = endpoint["token"]
+    with sock, sock.makefile("rwb") as f:
+        f.write((json.dumps(req) + "\n").encode("utf-8"))
+        f.flush()
+        for line in f:
+            msg = json.loads(line)
+            if msg.get("method") == "progress":
+                if on_progress:
+                    on_progress(msg["params"]["message"], msg["params"]["tag"])
+            elif msg.get("id") == 1:
+                if "error" in msg:
+                    raise RpcError(msg["error"]["code"], msg["error"]["message"])
+                return msg["result"]
+    raise OSError("connection closed before a reply")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="JSON-RPC service for the VR launcher and wrapper makers")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="run the daemon in the foreground")
+    s.add_argument("--socket", help=f"Unix socket path (default: {os.path.basename(SOCKET_PATH)})")
+    s.add_argument("--port", type=int, help=f"listen on 127.0.0.1 instead (e.g. {PORT})")
+    s.add_argument("-j", "--jobs", type=int, default=min(8, os.cpu_count() or 1),
+                   help="operations run at once (default: %(default)s)")
+    s.add_argument("--compiler", choices=vr_compilers.ORDER, help="C# compiler backend to use")
+    c = sub.add_parser("call", help="send one request to a running daemon")
+    c.add_argument("method")
+    c.add_argument("params", nargs="?", default="{}", help="JSON object")
+    opts = ap.parse_args(argv)
+
+    if opts.cmd == "serve":
+        if opts.compiler:
+            os.environ["VR_COMPILER"] = opts.compiler
+        try:
+            return serve(opts.socket, opts.port, opts.jobs)
+        except OSError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(errors="replace")
+    try:
+        params = json.loads(opts.params)
+        result = call(opts.method, params,
+                      lambda msg, tag: print(f"{vr_batch.ICONS.get(tag, '')}{msg}", file=sys.stderr))
+    except ValueError as e:
+        print(f"error: bad params: {e}", file=sys.stderr)
+        return 2
+    except RpcError as e:
+        print(f"error {e.code}: {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"error: can't reach the daemon: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0 if not isinstance(result, dict) or result.get("ok", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import time
+import atexit
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# SHA-256 fingerprints of game EXEs and key _Data files. Hashes are cached by
+# (path, size, mtime_ns, inode), so an unchanged file is only stat()ed; files
+# are hashed in 1 MiB chunks on a few threads (hashlib drops the GIL while it
+# works). Patch operations record what they left behind per install:
+#
+#   installs[<folder>|<exe>] = {"original": sha, "wrapper": sha?, "data": {rel: sha}, "when": ...}
+#
+# plus the set of wrapper hashes ever built, which is how a wrapper is told
+# apart from a game EXE without guessing from its size. The index is written
+# once per batch, install record and at exit, never per hash; a save drops
+# hashes of files that no longer exist.
+
+INDEX_FILE    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vr_fingerprints.json")
+INDEX_VERSION = 1
+CHUNK         = 1 << 20
+WORKERS       = 4
+
+# Relative to the game folder; {data} is the live <game>_Data (or <game>Real_Data) folder
+KEY_FILES = ("UnityPlayer.dll", "GameAssembly.dll",
+             "{data}/Managed/Assembly-CSharp.dll", "{data}/globalgamemanagers")
+
+
+def hash_file(path):
+    h = hashlib.sha256()
+    buf = bytearray(CHUNK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+
+def _stat_key(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _norm(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def install_key(folder, exe):
+    return f"{_norm(folder)}|{exe.lower()}"
+
+
+class HashCache:
+    def __init__(self, path=INDEX_FILE):
+        self.path    = path
+        self.hashed  = 0        # files actually read since start-up
+        self._lock   = threading.RLock()
+        self._mtime  = None
+        self._dirty  = False
+        self._data   = self._empty()
+        self._installs = {}     # unsaved install changes: key -> record, or None once forgotten
+
+    @staticmethod
+    def _empty():
+        return {"version": INDEX_VERSION, "files": {}, "installs": {}, "wrappers": []}
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return self._empty()
+
+    def _refresh(self):
+        # Picks up writes from another process (GUI, batch, watcher)
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            disk = self._read()
+            if self._dirty:
+                # Only what changed here is replayed; everything else in memory may be stale
+                disk["files"].update(self._data["files"])
+                for key, rec in self._installs.items():
+                    if rec is None:
+                        disk["installs"].pop(key, None)
+                    else:
+                        disk["installs"][key] = rec
+                disk["wrappers"] = sorted(set(disk["wrappers"]) | set(self._data["wrappers"]))
+            self._data, self._mtime = disk, mtime
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._refresh()
+            self._prune()
+            tmp = self.path + f".{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+                self._mtime = os.stat(self.path).st_mtime_ns
+                self._dirty = False
+                self._installs.clear()
+            except OSError:
+                pass
+
+    def _prune(self):
+        files = self._data["files"]
+        for p in [p for p in files if not os.path.exists(p)]:
+            del files[p]
+
+    # ── hashes ──────────────────────────────────────────────────────────────
+
+    def _lookup(self, path):
+        # (cached sha or None, stat key); the stat key is None for a missing file
+        try:
+            key = _stat_key(os.stat(path))
+        except OSError:
+            return None, None
+        with self._lock:
+            self._refresh()
+            hit = self._data["files"].get(_norm(path))
+        if hit and hit[:3] == key:
+            return hit[3], key
+        return None, key
+
+    def _store(self, path, key, sha):
+        with self._lock:
+            self._data["files"][_norm(path)] = key + [sha]
+            self._dirty = True
+            self.hashed += 1
+
+    def sha(self, path):
+        # Hex digest, or None if the file doesn't exist; saved with the next batch or at exit
+        sha, key = self._lookup(path)
+        if sha or key is None:
+            return sha
+        sha = hash_file(path)
+        self._store(path, key, sha)
+        return sha
+
+    def sha_many(self, paths):
+        # {path: sha or None}; only new or changed files are read, in parallel
+        out, todo = {}, []
+        for p in paths:
+            sha, key = self._lookup(p)
+            out[p] = sha
+            if not sha and key is not None:
+                todo.append((p, key))
+        if todo:
+            def work(item):
+                p, key = item
+                try:
+                    return p, key, hash_file(p)
+                except OSError:
+                    return p, key, None
+            with ThreadPoolExecutor(min(WORKERS, len(todo))) as pool:
+                for p, key, sha in pool.map(work, todo):
+                    out[p] = sha
+                    if sha:
+                        self._store(p, key, sha)
+            self.save()
+        return out
+
+    # ── installs ────────────────────────────────────────────────────────────
+
+    def is_wrapper(self, sha):
+        with self._lock:
+            self._refresh()
+            return sha in self._data["wrappers"]
+
+    def install(self, folder, exe):
+        with self._lock:
+            self._refresh()
+            return self._data["installs"].get(install_key(folder, exe))
+
+    def key_files(self, folder, data_dir):
+        data = os.path.relpath(data_dir, folder) if data_dir else None
+        out = {}
+        for rel in KEY_FILES:
+            if "{data}" in rel:
+                if not data:
+                    continue
+                path = os.path.join(folder, rel.format(data=data))
+            else:
+                path = os.path.join(folder, rel)
+            out[rel] = path
+        return out
+
+    def record_install(self, folder, exe, original, wrapper=None, data_dir=None):
+        # original/wrapper: paths of the game EXE as set aside and of our wrapper
+        files = self.key_files(folder, data_dir)
+        paths = [original] + ([wrapper] if wrapper else []) + list(files.values())
+        shas = self.sha_many(paths)
+        rec = {"original": shas[original],
+               "data": {rel: shas[p] for rel, p in files.items() if shas[p]},
+               "when": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with self._lock:
+            if wrapper and shas[wrapper]:
+                rec["wrapper"] = shas[wrapper]
+                if shas[wrapper] not in self._data["wrappers"]:
+                    self._data["wrappers"].append(shas[wrapper])
+            key = install_key(folder, exe)
+            self._data["installs"][key] = self._installs[key] = rec
+            self._dirty = True
+        self.save()
+        return rec
+
+    def forget_install(self, folder, exe):
+        with self._lock:
+            self._refresh()
+            key = install_key(folder, exe)
+            if self._data["installs"].pop(key, None) is not None:
+                self._installs[key] = None
+                self._dirty = True
+        self.save()
+
+    def changed_key_files(self, folder, data_dir, rec):
+        # Key files whose hash differs from the one recorded at patch time
+        files = self.key_files(folder, data_dir)
+        recorded = (rec or {}).get("data", {})
+        current = self.sha_many([files[r] for r in recorded if r in files])
+        return [r for r in recorded if r in files and current.get(files[r]) != recorded[r]]
+
+    def classify(self, path, expected=None):
+        # ("missing" | "wrapper" | "original" | "modified since patch" | "unknown binary", sha)
+        sha = self.sha(path)
+        if sha is None:
+            return "missing", None
+        if self.is_wrapper(sha):
+            return "wrapper", sha
+        if expected is None:
+            return "unknown binary", sha
+        return ("original" if sha == expected else "modified since patch"), sha
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HashCache()
+            atexit.register(_default.save)
+        return _default
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Print cached SHA-256 fingerprints of files")
+    ap.add_argument("paths", nargs="+")
+    opts = ap.parse_args(argv)
+    cache = default_cache()
+    t0 = time.perf_counter()
+    shas = cache.sha_many(opts.paths)
+    for p in opts.paths:
+        print(f"{shas[p] or '(missing)':<64}  {p}")
+    print(f"{len(opts.paths)} file(s), {cache.hashed} hashed, "
+          f"{(time.perf_counter() - t0) * 1000:.1f} ms", file=sys.stderr)
+    return 0 if all(shas.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,27 @@
+import sys
+import time
+
+_T0 = time.perf_counter()
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1:] != ["--startup-timing"]:
+    # Headless batch mode - never touches tkinter
+    from vr_batch import main
+    sys.exit(main("launcher"))
+
 import tkinter as tk
-from tkinter import filedialog, font, messagebox
+from tkinter import filedialog, font, messagebox, ttk
 import os
-import subprocess
-import json
-from datetime import datetime
+import threading
+
+import vr_patch as patch
+import vr_pe
+from vr_picker import PresetMenu, ProfilePicker
+import vr_presets
+import vr_steam
+import vr_store
+from vr_log import LogSink, MAX_LINES as LOG_MAX_LINES
+import vr_startup
+from vr_worker import TaskRunner
 
 BG         = "#0a0a0f"
 PANEL      = "#12121a"
@@ -17,70 +35,28 @@ YELLOW     = "#e0b83c"
 BLUE       = "#6090e0"
 PURPLE     = "#a080e0"
 
-CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vr_launcher_profiles.json")
-
-CSC_PATHS = [
-    r"C:\Windows\Microsoft.NET\Framework64\v4.0.30319\csc.exe",
-    r"C:\Windows\Microsoft.NET\Framework\v4.0.30319\csc.exe",
-]
-
-# Launcher template - launches the real game EXE directly (no rename needed)
-LAUNCHER_TEMPLATE = r'''
-using System;
-using System.Diagnostics;
-using System.IO;
-
-class VRLauncher {{
-    static void Main(string[] args) {{
-        // Steam passes its own args (including -vrmode none) via %command%.
-        // We ignore them entirely and launch with our own forced arguments.
-        string dir = AppDomain.CurrentDomain.BaseDirectory;
-        string realExe = Path.Combine(dir, "{game_exe}");
-        if (!File.Exists(realExe)) {{
-            Console.WriteLine("[VRLauncher] ERROR: " + realExe + " not found!");
-            Console.ReadLine();
-            return;
-        }}
-        ProcessStartInfo psi = new ProcessStartInfo();
-        psi.FileName = realExe;
-        psi.Arguments = "{vr_args}";
-        psi.UseShellExecute = false;
-        psi.WorkingDirectory = dir;
-        Process.Start(psi);
-    }}
-}}
-'''
-
-
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {"profiles": {}, "last_profile": ""}
-
-
-def save_config(cfg):
-    try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Config save error: {e}")
-
 
 class App(tk.Tk):
-    def __init__(self):
+    # The window is built and painted first; the profile store, presets and the
+    # last profile are loaded on the worker afterwards, so a slow disk or an
+    # unreachable network share can't keep the window from appearing.
+    def __init__(self, timer=None, report_timing=False):
+        self.timer = timer or vr_startup.StartupTimer()
+        self.report_timing = report_timing
+        self.timer.mark("imports")
         super().__init__()
         self.title("VR Launcher Maker")
-        self.geometry("700x760")
+        self.geometry("700x910")
         self.resizable(False, False)
         self.configure(bg=BG)
-        self.cfg = load_config()
+        self.store = None
+        self._loading = False
         self.setup_fonts()
         self.build_ui()
-        self.load_last_profile()
+        self.runner = TaskRunner(self, self.log, on_state=self._on_task_state)
+        self.timer.mark("UI build")
+        self.bind("<Expose>", self._on_expose, add="+")
+        self.after(1000, self._start_loading)    # in case no Expose ever arrives
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_fonts(self):
@@ -88,8 +64,8 @@ class App(tk.Tk):
         self.f_label  = font.Font(family="Consolas", size=8)
         self.f_input  = font.Font(family="Consolas", size=9)
         self.f_btn    = font.Font(family="Consolas", size=9, weight="bold")
-        self.f_log    = font.Font(family="Consolas", size=8)
-        self.f_sub    = font.Font(family="Consolas", size=9)
+        self.f_log    = self.f_label     # same face and size; one font object
+        self.f_sub    = self.f_input
 
     def build_ui(self):
         pad = 24
@@ -107,19 +83,12 @@ class App(tk.Tk):
         prof_row = tk.Frame(self, bg=BG)
         prof_row.pack(fill="x", padx=pad, pady=(4, 0))
 
-        self.var_profile = tk.StringVar()
-        self.combo_profiles = tk.OptionMenu(prof_row, self.var_profile, "")
-        self.combo_profiles.config(
-            font=self.f_input, bg=PANEL, fg=TEXT,
-            activebackground=BORDER, activeforeground=ACCENT,
-            highlightthickness=1, highlightbackground=BORDER,
-            relief="flat", bd=0, width=28
-        )
-        self.combo_profiles["menu"].config(
-            bg=PANEL, fg=TEXT, activebackground=ACCENT_DIM,
-            activeforeground=ACCENT, font=self.f_input
-        )
-        self.combo_profiles.pack(side="left", ipady=4)
+        self.picker = ProfilePicker(prof_row, self.f_input, {
+            "bg": BG, "panel": PANEL, "border": BORDER, "text": TEXT,
+            "accent": ACCENT, "accent_dim": ACCENT_DIM,
+        })
+        self.picker.pack(side="left")
+        self.var_profile = self.picker.var
 
         tk.Frame(prof_row, bg=BG, width=8).pack(side="left")
         self._btn(prof_row, "Load",   self.load_profile,   ACCENT,  side="left", w=70)
@@ -127,6 +96,8 @@ class App(tk.Tk):
         self._btn(prof_row, "Save",   self.save_profile,   PURPLE,  side="left", w=70)
         tk.Frame(prof_row, bg=BG, width=6).pack(side="left")
         self._btn(prof_row, "Delete", self.delete_profile, RED,     side="left", w=70)
+        tk.Frame(prof_row, bg=BG, width=6).pack(side="left")
+        self._btn(prof_row, "Scan",   self.scan_steam,     BLUE,    side="left", w=70)
 
         self._sep(pad, top=14)
 
@@ -145,9 +116,51 @@ class App(tk.Tk):
         self.var_launcher_name = tk.StringVar()
         self._entry(self, self.var_launcher_name, fill="x", padx=pad, fg=YELLOW)
 
-        self._label("FORCED LAUNCH ARGUMENTS", pad, top=14)
+        self._label("FORCED LAUNCH ARGUMENTS  (added after the ticked presets; later flags win)", pad, top=14)
         self.var_args = tk.StringVar(value="-vrmode openvr")
         self._entry(self, self.var_args, fill="x", padx=pad, fg=ACCENT)
+        preset_row = tk.Frame(self, bg=BG)
+        preset_row.pack(fill="x", padx=pad, pady=(4, 0))
+        self.var_final = tk.StringVar()
+        self.presets = PresetMenu(preset_row, self.f_input, {
+            "panel": PANEL, "border": BORDER, "text": TEXT,
+            "accent": ACCENT, "accent_dim": ACCENT_DIM,
+        }, on_change=self._update_final)
+        self.presets.pack(side="left", ipady=3, ipadx=6)
+        tk.Label(preset_row, textvariable=self.var_final, font=self.f_label, bg=BG, fg=DIM,
+                 anchor="w").pack(side="left", fill="x", expand=True, padx=(8, 0))
+        self.var_args.trace_add("write", lambda *_: self._update_final())
+
+        self._label("PROCESS  (priority · CPU affinity 0-3,6 or 0xF0 · env KEY=VALUE; KEY2=VALUE)", pad, top=14)
+        proc_row = tk.Frame(self, bg=BG)
+        proc_row.pack(fill="x", padx=pad, pady=(4, 0))
+        self.var_priority = tk.StringVar(value="")
+        ttk.Combobox(proc_row, textvariable=self.var_priority, values=("",) + patch.PRIORITIES,
+                     state="readonly", width=12, font=self.f_input).pack(side="left", ipady=3)
+        tk.Frame(proc_row, bg=BG, width=8).pack(side="left")
+        self.var_affinity = tk.StringVar()
+        self._entry(proc_row, self.var_affinity, side="left").config(width=12)
+        tk.Frame(proc_row, bg=BG, width=8).pack(side="left")
+        self.var_env = tk.StringVar()
+        self._entry(proc_row, self.var_env, side="left", fill="x", expand=True)
+
+        self._label("LAUNCHER TYPE", pad, top=14)
+        mode_row = tk.Frame(self, bg=BG)
+        mode_row.pack(fill="x", padx=pad, pady=(4, 0))
+        self.var_mode = tk.StringVar(value="exe")
+        for value, text in (("exe", "Compiled EXE"),
+                            ("sidecar", "Universal EXE + .vrargs"),
+                            ("proton", "Proton/Linux shell script")):
+            tk.Radiobutton(mode_row, text=text, value=value, variable=self.var_mode,
+                           font=self.f_label, bg=BG, fg=TEXT, selectcolor=PANEL,
+                           activebackground=BG, activeforeground=ACCENT,
+                           highlightthickness=0, cursor="hand2").pack(side="left", padx=(0, 12))
+        self.var_mode.trace_add("write", lambda *_: self._update_hint())
+        self.var_timing = tk.BooleanVar(value=False)
+        tk.Checkbutton(self, text="Record launch timing (vr_launch_timing.log, see vr_timing.py)",
+                       variable=self.var_timing, font=self.f_label, bg=BG, fg=TEXT,
+                       selectcolor=PANEL, activebackground=BG, activeforeground=ACCENT,
+                       highlightthickness=0, cursor="hand2").pack(anchor="w", padx=pad, pady=(6, 0))
 
         # Steam hint box
         self._sep(pad, top=14)
@@ -179,6 +192,21 @@ class App(tk.Tk):
         tk.Frame(btns, bg=BG, width=8).pack(side="left")
         self._btn(btns, "?  STATUS",  self.check_status,    DIM,    side="left", w=120)
 
+        prog = tk.Frame(self, bg=BG)
+        prog.pack(fill="x", padx=pad, pady=(10, 0))
+        style = ttk.Style(self)
+        style.theme_use("clam")
+        style.configure("VR.Horizontal.TProgressbar", troughcolor=PANEL, background=ACCENT,
+                        bordercolor=BORDER, lightcolor=ACCENT, darkcolor=ACCENT)
+        self.progress = ttk.Progressbar(prog, mode="indeterminate", length=160,
+                                        style="VR.Horizontal.TProgressbar")
+        self.progress.pack(side="left")
+        self.var_task = tk.StringVar(value="Idle")
+        tk.Label(prog, textvariable=self.var_task, font=self.f_label,
+                 bg=BG, fg=DIM).pack(side="left", padx=10)
+        self.btn_cancel = self._btn(prog, "Cancel", self.cancel_tasks, RED, side="right", w=70)
+        self.btn_cancel.config(state="disabled")
+
         self._sep(pad, top=16)
 
         self._label("LOG", pad)
@@ -199,8 +227,7 @@ class App(tk.Tk):
         for tag, color in [("ok", ACCENT), ("warn", YELLOW), ("err", RED),
                            ("dim", DIM), ("info", BLUE), ("time", DIM), ("purple", PURPLE)]:
             self.txt_log.tag_config(tag, foreground=color)
-
-        self._refresh_profile_menu()
+        self.log_sink = LogSink(self.txt_log)
         self.log("Welcome! Select a profile or configure a new game.", "dim")
 
     def _sep(self, pad, top=14):
@@ -237,15 +264,7 @@ class App(tk.Tk):
         return b
 
     def log(self, msg, tag="info"):
-        self.txt_log.configure(state="normal")
-        ts = datetime.now().strftime("%H:%M:%S")
-        self.txt_log.insert("end", f"[{ts}] ", "time")
-        icon = {"ok": "✓ ", "warn": "⚠ ", "err": "✗ ", "dim": "  ",
-                "info": "  ", "purple": "★ "}.get(tag, "")
-        self.txt_log.insert("end", icon + msg + "\n", tag)
-        self.txt_log.configure(state="disabled")
-        self.txt_log.see("end")
-        self.update_idletasks()
+        self.log_sink.write(msg, tag)
 
     def log_ok    (self, m): self.log(m, "ok")
     def log_warn  (self, m): self.log(m, "warn")
@@ -253,6 +272,21 @@ class App(tk.Tk):
     def log_dim   (self, m): self.log(m, "dim")
     def log_purple(self, m): self.log(m, "purple")
 
+    def _on_task_state(self, label, queued):
+        more = f"  (+{queued} queued)" if queued else ""
+        if label:
+            self.progress.start(12)
+            self.var_task.set(f"Running: {label}{more}")
+            self.btn_cancel.config(state="normal")
+        else:
+            self.progress.stop()
+            self.var_task.set(f"Waiting{more}" if queued else "Idle")
+            self.btn_cancel.config(state="normal" if queued else "disabled")
+
+    def cancel_tasks(self):
+        if self.runner.cancel_all():
+            self.log_warn("Cancelling...")
+
     def _copy_hint(self, _event=None):
         hint = self.var_hint.get()
         if "Apply" in hint:
@@ -268,196 +302,275 @@ class App(tk.Tk):
         self._auto_detect_exe(d)
 
     def _auto_detect_exe(self, folder):
-        skip = {"crashhandler", "uninstall", "helper", "launcher",
-                "unitycrash", "subnautica32"}
-        exes = []
-        try:
-            for f in os.listdir(folder):
-                if f.lower().endswith(".exe") and not any(s in f.lower() for s in skip):
-                    exes.append((os.path.getsize(os.path.join(folder, f)), f))
-        except Exception:
-            return
-        if exes:
-            exes.sort(reverse=True)
-            game_exe = exes[0][1]
+        self.runner.submit("Detect game EXE", lambda t: vr_pe.rank_game_exes(folder),
+                           on_done=self._show_detected)
+
+    def _show_detected(self, ranked):
+        if ranked:
+            best = ranked[0]
+            game_exe = best["name"]
             self.var_exe.set(game_exe)
-            base = os.path.splitext(game_exe)[0]
-            self.var_launcher_name.set(f"{base}Launcher.exe")
-            self.log_dim(f"Auto-detected: {game_exe}")
-            self.log_dim(f"Launcher will be: {base}Launcher.exe")
-
-    def _refresh_profile_menu(self):
-        menu = self.combo_profiles["menu"]
-        menu.delete(0, "end")
-        profiles = list(self.cfg["profiles"].keys())
-        if not profiles:
-            menu.add_command(label="(no profiles)", command=lambda: None)
-            self.var_profile.set("(no profiles)")
-        else:
-            for name in profiles:
-                menu.add_command(label=name, command=lambda n=name: self.var_profile.set(n))
-            last = self.cfg.get("last_profile", "")
-            self.var_profile.set(last if last in profiles else profiles[0])
-
-    def load_last_profile(self):
-        last = self.cfg.get("last_profile", "")
-        if last and last in self.cfg["profiles"]:
-            self._apply_profile(last)
-            self.log_purple(f"Auto-loaded profile: {last}")
+            launcher_name = patch.default_launcher_name(game_exe)
+            self.var_launcher_name.set(launcher_name)
+            self.log_dim(f"Auto-detected: {vr_pe.describe(best)}")
+            for c in ranked[1:3]:
+                self.log_dim(f"  runner-up: {vr_pe.describe(c)}")
+            if best["confidence"] < 0.5:
+                self.log_warn("Low confidence — check the game EXE name.")
+            self.log_dim(f"Launcher will be: {launcher_name}")
+
+    # ── deferred start-up ───────────────────────────────────────────────────
+
+    def _on_expose(self, event):
+        if event.widget is self:
+            self.after_idle(self._start_loading)
+
+    def _start_loading(self):
+        if self._loading:
+            return
+        self._loading = True
+        self.timer.mark("first paint")
+        self.runner.submit("Loading profiles", self._load_state, on_done=self._on_loaded,
+                           on_error=self._on_load_failed)
+
+    def _load_state(self, task):
+        # Worker thread: everything that reads the disk, nothing that touches widgets
+        store = vr_store.open_store("launcher")
+        last = store.get_setting("last_profile", "")
+        try:
+            catalog, preset_error = vr_presets.load_catalog()[0], None
+        except (OSError, ValueError) as e:
+            catalog, preset_error = vr_presets.BUILTIN, e
+        return {"store": store, "rows": store.index_rows(),
+                "last": last if last and last in store else "",
+                "catalog": catalog, "preset_error": preset_error,
+                "log_max_lines": store.get_setting("log_max_lines", LOG_MAX_LINES),
+                "log_file": store.get_setting("log_file") or None}
+
+    def _on_loaded(self, state):
+        self.store = state["store"]
+        self.log_sink.max_lines = state["log_max_lines"]
+        if state["log_file"]:
+            self.log_sink.mirror_to(state["log_file"])
+        if self.store.migrated:
+            self.log_purple(f"Migrated {self.store.migrated} profile(s) to {os.path.basename(self.store.path)}")
+        if self.store.migration_error:
+            self.log_warn(self.store.migration_error)
+        self.picker.set_profiles(state["rows"], state["last"])
+        if state["preset_error"]:
+            self.log_warn(f"{os.path.basename(vr_presets.USER_FILE)} ignored: {state['preset_error']}")
+        self.presets.set_catalog(state["catalog"])
+        self._update_final()
+        if state["last"]:
+            self._apply_profile(state["last"])
+            self.log_purple(f"Auto-loaded profile: {state['last']}")
             self._update_hint()
+            self._probe_folder(self.var_folder.get())
+        self.timer.mark("profiles")
+        if self.report_timing:
+            print(self.timer.report(), flush=True)
+            self.log_dim(self.timer.report())
+
+    def _on_load_failed(self, error):
+        # Keep the window usable: an empty in-memory store, nothing saved this session
+        self.store = vr_store.ProfileStore(":memory:")
+        self.picker.set_profiles([], "")
+        self.presets.set_catalog(vr_presets.BUILTIN)
+        self._update_final()
+        self.log_err(f"Profiles unavailable ({error}) — changes won't be saved until restart")
+        self.timer.mark("profiles")
+
+    def _probe_folder(self, folder):
+        # A sleeping disk or dead network share may take seconds to answer;
+        # ask on a throwaway thread so neither the window nor the worker waits
+        def probe():
+            if folder and not os.path.isdir(folder):
+                self.runner.call_ui(self.log_warn, f"Game folder not reachable: {folder}")
+        threading.Thread(target=probe, name="vr-probe", daemon=True).start()
+
+    def _ready(self):
+        if self.store is None:
+            self.log_warn("Still loading profiles...")
+        return self.store is not None
 
     def load_profile(self):
+        if not self._ready(): return
         name = self.var_profile.get()
-        if name not in self.cfg["profiles"]:
+        if name not in self.store:
             self.log_warn("No valid profile selected."); return
         self._apply_profile(name)
-        self.cfg["last_profile"] = name
-        save_config(self.cfg)
+        self.store.set_setting("last_profile", name)
         self._update_hint()
         self.log_purple(f"Profile loaded: {name}")
 
+    def scan_steam(self):
+        if not self._ready(): return
+        self.log_dim("─── Scanning Steam Libraries ─────────")
+        args = self.var_args.get().strip() or patch.DEFAULT_ARGS
+        self.runner.submit("Scan Steam libraries", lambda t: vr_steam.scan(log=t.log),
+                           on_done=lambda games: self._add_scanned(games, args))
+
+    def _add_scanned(self, games, args):
+        added = vr_steam.add_profiles(self.store, games, "launcher", args)
+        if not added:
+            self.log_dim("No new Unity games to add.")
+            return
+        folders = {g["name"]: g["folder"] for g in games}
+        for name in added:
+            self.picker.add(name, folders[name])
+        self.log_purple(f"{len(added)} profile(s) added: {', '.join(added)}")
+
     def _apply_profile(self, name):
-        p = self.cfg["profiles"][name]
+        p = self.store.get(name)
         self.var_folder.set(p.get("folder", ""))
         self.var_exe.set(p.get("exe", ""))
         self.var_launcher_name.set(p.get("launcher_name", ""))
         self.var_args.set(p.get("args", "-vrmode openvr"))
+        self.presets.set(p.get("presets", []))
+        self.var_mode.set(p.get("mode", "exe"))
+        self.var_timing.set(bool(p.get("timing", False)))
+        self.var_priority.set(p.get("priority", ""))
+        self.var_affinity.set(p.get("affinity", ""))
+        env = p.get("env", "")
+        self.var_env.set(patch.format_env(env) if isinstance(env, dict) else env)
+
+    def _profile(self, folder, exe, launcher_name, args):
+        return {"folder": folder, "exe": exe, "launcher_name": launcher_name,
+                "args": args, "mode": self.var_mode.get(), "timing": self.var_timing.get(),
+                "priority": self.var_priority.get(), "affinity": self.var_affinity.get().strip(),
+                "env": self._env_field(), "presets": self.presets.get()}
+
+    def _launch(self):
+        # Validated launch options, or None after logging the problem
+        try:
+            return patch.launch_options({"priority": self.var_priority.get(),
+                                         "affinity": self.var_affinity.get(),
+                                         "env": self.var_env.get()})
+        except ValueError as e:
+            self.log_err(str(e))
+            return None
+
+    def _update_final(self):
+        try:
+            line, notes = vr_presets.compose(self.presets.get(), self.var_args.get())
+        except (OSError, ValueError) as e:
+            self.var_final.set(f"FINAL: {e}"); return
+        self.var_final.set(f"FINAL: {line}" + (f"   ({len(notes)} overridden)" if notes else ""))
+
+    def _compose(self, args):
+        # Final command line from presets + free-text args, or None after logging the problem
+        try:
+            line, notes = vr_presets.compose(self.presets.get(), args)
+        except (OSError, ValueError) as e:
+            self.log_err(str(e))
+            return None
+        if self.presets.get():
+            self.log_dim(f"Arguments: {line}")
+        for n in notes:
+            self.log_dim(f"  {n}")
+        return line
+
+    def _env_field(self):
+        text = self.var_env.get().strip()
+        try:
+            return patch.parse_env(text)
+        except ValueError:
+            return text    # kept as typed; apply reports the error
 
     def save_profile(self):
+        if not self._ready(): return
         folder, exe, launcher_name, args = self._get_inputs()
         if not folder: return
         dlg = _InputDialog(self, "Save Profile", "Profile name:",
                            suggestion=os.path.basename(folder))
         name = dlg.result
         if not name: return
-        self.cfg["profiles"][name] = {
-            "folder": folder, "exe": exe,
-            "launcher_name": launcher_name, "args": args
-        }
-        self.cfg["last_profile"] = name
-        save_config(self.cfg)
-        self._refresh_profile_menu()
+        self.store.put(name, self._profile(folder, exe, launcher_name, args))
+        self.store.set_setting("last_profile", name)
+        self.picker.add(name, folder)
         self.var_profile.set(name)
         self.log_purple(f"Profile saved: '{name}'")
 
     def delete_profile(self):
+        if not self._ready(): return
         name = self.var_profile.get()
-        if name not in self.cfg["profiles"]:
+        if name not in self.store:
             self.log_warn("No valid profile selected."); return
         if not messagebox.askyesno("Delete Profile", f"Delete '{name}'?"):
             return
-        del self.cfg["profiles"][name]
-        if self.cfg.get("last_profile") == name:
-            self.cfg["last_profile"] = ""
-        save_config(self.cfg)
-        self._refresh_profile_menu()
+        self.store.delete(name)
+        if self.store.get_setting("last_profile") == name:
+            self.store.set_setting("last_profile", "")
+        self.picker.remove(name)
         self.log_warn(f"Profile deleted: '{name}'")
 
     def _update_hint(self):
         folder = self.var_folder.get().strip()
         launcher = self.var_launcher_name.get().strip()
         if folder and launcher:
-            path = os.path.join(folder, launcher)
-            self.var_hint.set(f'"{path}" %command%')
+            self.var_hint.set(patch.steam_hint(folder, launcher, self.var_mode.get()))
 
     def check_status(self):
-        folder, exe, launcher_name, _ = self._get_inputs()
+        folder, exe, launcher_name, args = self._get_inputs()
         if not folder: return
-        self.log_dim("─── Status Check ─────────────────────")
-        launcher_path = os.path.join(folder, launcher_name)
-        game_path     = os.path.join(folder, exe)
-
-        if os.path.exists(launcher_path):
-            size = os.path.getsize(launcher_path)
-            self.log_ok(f"Launcher active: {launcher_name} ({size // 1024} KB)")
-        else:
-            self.log_warn(f"Launcher not found: {launcher_name}")
+        hint = self.var_hint.get()
+        final = self._compose(args)   # what the last launch should have had
 
-        if os.path.exists(game_path):
-            self.log_ok(f"Game EXE intact: {exe}")
-        else:
-            self.log_err(f"Game EXE missing: {exe}")
+        def done(_ok):
+            if hint and "Apply" not in hint:
+                self.log_dim(f"Steam option: {hint}")
 
-        hint = self.var_hint.get()
-        if hint and "Apply" not in hint:
-            self.log_dim(f"Steam option: {hint}")
+        self.runner.submit("Status check",
+                           lambda t: patch.launcher_status(folder, exe, launcher_name, t.log, final),
+                           on_done=done)
 
     def apply_launcher(self):
         folder, exe, launcher_name, args = self._get_inputs()
         if not folder: return
-
-        game_path     = os.path.join(folder, exe)
-        launcher_path = os.path.join(folder, launcher_name)
-
-        self.log_dim("─── Creating Launcher ────────────────")
-
-        if not os.path.exists(game_path):
-            self.log_err(f"Game EXE not found: {exe}"); return
-        self.log_ok(f"Game EXE found: {exe} (will NOT be renamed)")
-
-        csc = next((p for p in CSC_PATHS if os.path.exists(p)), None)
-        if not csc:
-            self.log_err("csc.exe not found! Is .NET Framework 4.x installed?"); return
-        self.log_ok(f"Compiler: {os.path.basename(csc)}")
-
-        cs_code = LAUNCHER_TEMPLATE.format(
-            game_exe=exe,
-            vr_args=args.replace('"', '\\"')
-        )
-        cs_path = os.path.join(folder, "_vrlauncher_temp.cs")
-
-        with open(cs_path, "w", encoding="utf-8") as f:
-            f.write(cs_code)
-
-        self.log_dim(f"Compiling {launcher_name}...")
-        try:
-            result = subprocess.run(
-                [csc, f"/out:{launcher_path}", "/target:exe", "/optimize+", cs_path],
-                capture_output=True, text=True
-            )
-            if os.path.exists(launcher_path):
-                size = os.path.getsize(launcher_path)
-                self.log_ok(f"Launcher created: {launcher_name} ({size // 1024} KB)")
-                self._update_hint()
-                hint = self.var_hint.get()
-                self.log_ok("─── Steam Launch Options ─────────────")
-                self.log("  " + hint, "warn")
-                self.log_ok("Paste the above into Steam → Right-click game → Properties → Launch Options")
-                self.log_ok("Click the yellow box above to copy automatically.")
-                self._auto_save_profile(folder, exe, launcher_name, args)
-            else:
-                self.log_err("Compilation failed!")
-                if result.stderr:
-                    self.log_warn(result.stderr[:400])
-        except Exception as e:
-            self.log_err(f"Compilation error: {e}")
-        finally:
-            if os.path.exists(cs_path):
-                os.remove(cs_path)
+        mode, timing = self.var_mode.get(), self.var_timing.get()
+        launch = self._launch()
+        if launch is None: return
+        final = self._compose(args)
+        if final is None: return
+
+        def done(ok):
+            if not ok:
+                return
+            self._update_hint()
+            hint = self.var_hint.get()
+            self.log_ok("─── Steam Launch Options ─────────────")
+            self.log("  " + hint, "warn")
+            self.log_ok("Steam picks it up after a restart; if it wasn't set above, paste it into")
+            self.log_ok("Steam → Right-click game → Properties → Launch Options")
+            self.log_ok("Click the yellow box above to copy automatically.")
+            self._auto_save_profile(folder, exe, launcher_name, args)
+
+        self.runner.submit(f"Create {launcher_name}",
+                           lambda t: patch.apply_launcher(folder, exe, launcher_name, final,
+                                                          t.log, t.cancel_event, mode, timing,
+                                                          launch),
+                           on_done=done)
 
     def _auto_save_profile(self, folder, exe, launcher_name, args):
+        if not self._ready(): return
         name = os.path.basename(folder)
-        self.cfg["profiles"][name] = {
-            "folder": folder, "exe": exe,
-            "launcher_name": launcher_name, "args": args
-        }
-        self.cfg["last_profile"] = name
-        save_config(self.cfg)
-        self._refresh_profile_menu()
+        self.store.put(name, self._profile(folder, exe, launcher_name, args))
+        self.store.set_setting("last_profile", name)
+        self.picker.add(name, folder)
         self.var_profile.set(name)
         self.log_purple(f"Profile auto-saved: '{name}'")
 
     def remove_launcher(self):
         folder, exe, launcher_name, _ = self._get_inputs()
         if not folder: return
-        launcher_path = os.path.join(folder, launcher_name)
-        self.log_dim("─── Removing Launcher ────────────────")
-        if not os.path.exists(launcher_path):
-            self.log_warn(f"Launcher not found: {launcher_name}"); return
-        os.remove(launcher_path)
-        self.log_ok(f"Deleted: {launcher_name}")
-        self.log_ok("Game EXE is untouched.")
-        self.var_hint.set("← Apply launcher first to see the Steam launch option")
+
+        def done(ok):
+            if ok:
+                self.var_hint.set("← Apply launcher first to see the Steam launch option")
+
+        self.runner.submit(f"Remove {launcher_name}",
+                           lambda t: patch.remove_launcher(folder, launcher_name, t.log, exe),
+                           on_done=done)
 
     def _get_inputs(self):
         folder        = self.var_folder.get().strip()
@@ -480,7 +593,7 @@ class App(tk.Tk):
             launcher_name += ".exe"
             self.var_launcher_name.set(launcher_name)
 
-        if ok and not args:
+        if ok and not args and not self.presets.get():
             self.log_err("Arguments cannot be empty!"); ok = False
 
         if not ok:
@@ -488,17 +601,21 @@ class App(tk.Tk):
         return folder, exe, launcher_name, args
 
     def on_close(self):
-        folder        = self.var_folder.get().strip()
-        exe           = self.var_exe.get().strip()
-        launcher_name = self.var_launcher_name.get().strip()
-        args          = self.var_args.get().strip()
-        last          = self.cfg.get("last_profile", "")
-        if last and last in self.cfg["profiles"]:
-            self.cfg["profiles"][last] = {
-                "folder": folder, "exe": exe,
-                "launcher_name": launcher_name, "args": args
-            }
-            save_config(self.cfg)
+        if self.runner.busy:
+            if not messagebox.askyesno("Quit", "An operation is still running. Cancel it and quit?"):
+                return
+        self.runner.shutdown()
+        if self.store is not None:
+            folder        = self.var_folder.get().strip()
+            exe           = self.var_exe.get().strip()
+            launcher_name = self.var_launcher_name.get().strip()
+            args          = self.var_args.get().strip()
+            last          = self.store.get_setting("last_profile", "")
+            if last and last in self.store:
+                # Only rewrites the row when a field actually changed
+                self.store.put(last, self._profile(folder, exe, launcher_name, args))
+            self.store.close()
+        self.log_sink.close()
         self.destroy()
 
 
@@ -553,5 +670,5 @@ class _InputDialog(tk.Toplevel):
 
 
 if __name__ == "__main__":
-    app = App()
+    app = App(vr_startup.StartupTimer(_T0), report_timing=vr_startup.requested())
     app.mainloop()
@@ -0,0 +1,308 @@
+import os
+import re
+import sys
+import mmap
+import argparse
+
+import vr_backup
+
+# Sets Steam's per-game launch options (Properties → Launch Options) in every
+# Steam user's userdata/<id>/config/localconfig.vdf. The file is often several
+# MB of text KeyValues, so it is never parsed into a tree: a token regex runs
+# over an mmap of it, noting the byte span of each wanted
+#
+#   UserLocalConfigStore / Software / Valve / Steam / apps / <appid> / LaunchOptions
+#
+# and the output is streamed from the original with only those spans replaced
+# (or a line inserted where the key doesn't exist yet). Every other byte stays
+# as Steam wrote it. The new file is written beside the old one and swapped
+# in; the previous version is kept as localconfig.vdf.vrbak. All games go
+# through one pass over each file.
+#
+# Steam rewrites localconfig.vdf from memory when it exits, so changes made
+# while it runs may be lost; that is warned about, not prevented.
+
+BACKUP_EXT = ".vrbak"
+CHUNK      = 1024 * 1024
+APPS_PATH  = ("userlocalconfigstore", "software", "valve", "steam", "apps")
+KEY        = "LaunchOptions"
+NEST       = 4           # block depth _skip swallows in one regex match
+
+_TOKEN = re.compile(rb'"((?:[^"\\]|\\.)*)"|([{}])|//[^\n]*|\[[^\]\n]*\]|([^\s{}"]+)', re.S)
+_BRACE = re.compile(rb'[^{}"]*(?:"(?:[^"\\]|\\.)*"[^{}"]*)*([{}])', re.S)   # up to the next brace
+
+
+def _nested(levels):
+    # Regex for the rest of a block (braces balanced up to levels deep) and its closing brace
+    string, body = rb'"(?:[^"\\]|\\.)*"', rb'[^{}"]*(?:"(?:[^"\\]|\\.)*"[^{}"]*)*'
+    for _ in range(levels):
+        body = rb'[^{}"]*(?:(?:' + string + rb'|\{' + body + rb'\})[^{}"]*)*'
+    return re.compile(body + rb'\}', re.S)
+
+
+_BLOCK = _nested(NEST)
+
+
+def quote(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def unquote(raw):
+    return re.sub(r'\\(.)', lambda m: {"n": "\n", "t": "\t"}.get(m.group(1), m.group(1)),
+                  raw.decode("utf-8", "replace"))
+
+
+# ── Scanning ────────────────────────────────────────────────────────────────
+
+def _skip(buf, pos):
+    # Offset just past the brace that closes the block open at pos: one regex
+    # match, or one per brace for blocks nested deeper than NEST
+    m = _BLOCK.match(buf, pos)
+    if m:
+        return m.end()
+    depth = 1
+    while depth:
+        m = _BRACE.match(buf, pos)
+        if not m:
+            return len(buf)
+        depth += 1 if m.group(1) == b"{" else -1
+        pos = m.end()
+    return pos
+
+
+def scan(buf, appids):
+    # Where the launch options of appids live in buf (bytes or mmap): the apps
+    # block's closing brace offset (or None) and {appid: {"span", "value", "end"}},
+    # span/value being the quoted LaunchOptions token, end the app's closing brace.
+    apps, apps_end = {}, None
+    stack, key, depth, pos = [], None, len(APPS_PATH), 0
+    while True:
+        m = _TOKEN.search(buf, pos)
+        if not m:
+            break
+        pos = m.end()
+        brace = m.group(2)
+        if brace == b"{":
+            name = key.lower() if key is not None else ""
+            key = None
+            path = tuple(stack) + (name,)
+            if len(path) <= depth and path == APPS_PATH[:len(path)]:
+                stack.append(name)
+            elif len(path) == depth + 1 and name in appids and path[:depth] == APPS_PATH:
+                stack.append(name)
+                apps[name] = {"span": None, "value": None, "end": None}
+            else:
+                pos = _skip(buf, pos)
+        elif brace == b"}":
+            if len(stack) == depth + 1:
+                apps[stack[-1]]["end"] = m.start()
+            elif tuple(stack) == APPS_PATH:
+                apps_end = m.start()
+            if stack:
+                stack.pop()
+            key = None
+        elif m.group(1) is not None or m.group(3) is not None:
+            if key is None:
+                key = unquote(m.group(1) if m.group(1) is not None else m.group(3))
+                continue
+            if m.group(1) is not None and len(stack) == depth + 1 and key.lower() == KEY.lower():
+                apps[stack[-1]].update(span=m.span(), value=unquote(m.group(1)))
+            key = None
+    return apps_end, apps
+
+
+def _indent(buf, pos):
+    # The whitespace a line-leading brace at pos is indented with, and that line's start
+    start = buf.rfind(b"\n", 0, pos) + 1
+    lead = bytes(buf[start:pos])
+    return (lead, start) if not lead.strip() else (None, pos)
+
+
+def plan(buf, changes):
+    # [(start, end, bytes)] edits for {appid: (value, keep)}; value None clears the
+    # options when keep(old) is false. Also returns {appid: (old, new)} of what changes.
+    apps_end, apps = scan(buf, set(changes))
+    nl = b"\r\n" if b"\r\n" in bytes(buf[:4096]) else b"\n"
+    edits, summary = [], {}
+    for appid, (value, keep) in changes.items():
+        app = apps.get(appid)
+        old = app["value"] if app else None
+        if value is None:
+            if not old or keep(old):
+                continue
+            value = ""
+        if old == value:
+            continue
+        if app and app["span"]:
+            edits.append((app["span"][0], app["span"][1], quote(value).encode("utf-8")))
+        elif app and app["end"] is not None:
+            lead, at = _indent(buf, app["end"])
+            line = (lead or b"") + b"\t" + f'"{KEY}"\t\t{quote(value)}'.encode("utf-8") + nl
+            edits.append((at, at, line if lead is not None else nl + line))
+        elif apps_end is not None:
+            lead, at = _indent(buf, apps_end)
+            i = (lead or b"") + b"\t"
+            block = (i + quote(appid).encode() + nl + i + b"{" + nl
+                     + i + b"\t" + f'"{KEY}"\t\t{quote(value)}'.encode("utf-8") + nl + i + b"}" + nl)
+            edits.append((at, at, block if lead is not None else nl + block))
+        else:
+            continue
+        summary[appid] = (old, value)
+    edits.sort()
+    return edits, summary
+
+
+# ── Writing ─────────────────────────────────────────────────────────────────
+
+def rewrite(path, changes):
+    # Applies {appid: (value, keep)} to one localconfig.vdf; returns {appid: (old, new)}
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not st.st_size:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            edits, summary = plan(mm, changes)
+            if not edits:
+                return {}
+            tmp = path + f".{os.getpid()}.tmp"
+            try:
+                with open(tmp, "wb") as out:
+                    pos = 0
+                    for start, end, data in edits + [(st.st_size, st.st_size, b"")]:
+                        while pos < start:
+                            n = min(CHUNK, start - pos)
+                            out.write(mm[pos:pos + n])
+                            pos += n
+                        out.write(data)
+                        pos = end
+                    out.flush()
+                    os.fsync(out.fileno())
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+    now = os.stat(path)
+    if (now.st_mtime_ns, now.st_size) != (st.st_mtime_ns, st.st_size):
+        os.remove(tmp)
+        raise OSError(f"{path} changed while it was being edited (Steam running?)")
+    vr_backup.place(path, path + BACKUP_EXT)
+    os.replace(tmp, path)
+    return summary
+
+
+# ── Steam lookup ────────────────────────────────────────────────────────────
+
+def config_files(steam_root):
+    # localconfig.vdf of every Steam user that has one
+    userdata = os.path.join(steam_root, "userdata")
+    try:
+        ids = sorted(e.name for e in os.scandir(userdata) if e.is_dir() and e.name.isdigit())
+    except OSError:
+        return []
+    paths = [os.path.join(userdata, i, "config", "localconfig.vdf") for i in ids if i != "0"]
+    return [p for p in paths if os.path.isfile(p)]
+
+
+def appid_for(folder):
+    # Steam appid of the game installed in folder, or None. Imported here
+    # because vr_steam imports vr_patch, which imports us.
+    import vr_steam
+    key = os.path.normcase(os.path.abspath(folder))
+    for lib in vr_steam.load_index(vr_steam.INDEX_FILE)["libraries"].values():
+        for m in lib.get("manifests", {}).values():
+            g = m.get("game")
+            if g and g.get("appid") and os.path.normcase(os.path.abspath(g["folder"])) == key:
+                return g["appid"]
+    common = os.path.dirname(os.path.abspath(folder))
+    if os.path.basename(common).lower() != "common":
+        return None
+    steamapps = os.path.dirname(common)
+    install = os.path.basename(os.path.abspath(folder)).lower()
+    try:
+        names = [n for n in os.listdir(steamapps) if n.startswith("appmanifest_") and n.endswith(".acf")]
+    except OSError:
+        return None
+    for n in names:
+        try:
+            state = vr_steam.vdf_get(vr_steam._read_vdf(os.path.join(steamapps, n)), "AppState", {})
+        except OSError:
+            continue
+        if vr_steam.vdf_get(state, "installdir", "").lower() == install:
+            return vr_steam.vdf_get(state, "appid") or n[len("appmanifest_"):-4]
+    return None
+
+
+def steam_running(steam_root):
+    if sys.platform == "win32":
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam\ActiveProcess") as k:
+                return bool(winreg.QueryValueEx(k, "pid")[0])
+        except OSError:
+            return False
+    for pidfile in (os.path.join(steam_root, "steam.pid"), os.path.expanduser("~/.steam/steam.pid")):
+        try:
+            with open(pidfile) as f:
+                os.kill(int(f.read().strip()), 0)
+            return True
+        except (OSError, ValueError):
+            continue
+    return False
+
+
+def update(games, log, steam_root=None):
+    # games: [(folder, value, keep)]; value None clears the launch options unless
+    # keep(old) says they aren't ours. One pass per user file; returns False on an error.
+    import vr_steam
+    steam_root = steam_root or vr_steam.find_steam_root()
+    if not steam_root:
+        log("Steam not found — set the launch option by hand", "dim"); return True
+    changes = {}
+    for folder, value, keep in games:
+        appid = appid_for(folder)
+        if appid:
+            changes[appid] = (value, keep)
+        elif value is not None:
+            log(f"No Steam appid for {os.path.basename(os.path.normpath(folder))} — "
+                f"set the launch option by hand", "dim")
+    files = config_files(steam_root)
+    if not changes or not files:
+        if changes:
+            log("No Steam user config found — set the launch option by hand", "dim")
+        return True
+    ok, touched = True, 0
+    for path in files:
+        user = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        try:
+            summary = rewrite(path, changes)
+        except OSError as e:
+            log(f"Steam launch options not written for user {user}: {e}", "err"); ok = False
+            continue
+        touched += bool(summary)
+        for appid, (old, new) in sorted(summary.items()):
+            if new:
+                was = f" (was: {old})" if old else ""
+                log(f"Steam launch option set for app {appid}, user {user}{was}", "ok")
+            else:
+                log(f"Steam launch option cleared for app {appid}, user {user}", "ok")
+    if touched and steam_running(steam_root):
+        log("Steam is running and may overwrite this on exit — restart Steam to pick it up", "warn")
+    return ok
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Set or clear a game's Steam launch options in localconfig.vdf")
+    ap.add_argument("folder", help="game folder")
+    ap.add_argument("value", nargs="?", help="launch options; omit with --clear")
+    ap.add_argument("--clear", action="store_true", help="clear the launch options")
+    ap.add_argument("--steam", help="Steam install directory (default: auto-detect)")
+    opts = ap.parse_args(argv)
+    if (opts.value is None) != opts.clear:
+        ap.error("give a value or --clear")
+    log = lambda msg, tag="info": print(msg, file=sys.stderr if tag == "err" else sys.stdout)
+    ok = update([(opts.folder, opts.value, lambda old: False)], log, opts.steam)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
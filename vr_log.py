@@ -0,0 +1,99 @@
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import vr_trace
+
+# Batched log sink for the Tk log pane. Messages land in a bounded ring and are
+# flushed to the Text widget in one insert per tick; the widget is trimmed to
+# max_lines. Optionally the full stream is mirrored to a rotating file.
+
+ICONS = {"ok": "✓ ", "warn": "⚠ ", "err": "✗ ", "dim": "  ", "info": "  ", "purple": "★ "}
+LEVELS = {"err": logging.ERROR, "warn": logging.WARNING}
+
+MAX_LINES   = 5000
+RING_SIZE   = 10000
+FLUSH_MS    = 100
+FILE_BYTES  = 1024 * 1024
+FILE_BACKUPS = 3
+
+
+class LogSink:
+    def __init__(self, text, max_lines=MAX_LINES, ring_size=RING_SIZE, flush_ms=FLUSH_MS,
+                 file_path=None, file_bytes=FILE_BYTES, file_backups=FILE_BACKUPS):
+        self.text      = text
+        self.max_lines = max_lines
+        self.flush_ms  = flush_ms
+        self.dropped   = 0
+        self._ring     = deque(maxlen=ring_size)
+        self._lock     = threading.Lock()
+        self._file     = None
+        if file_path:
+            self.mirror_to(file_path, file_bytes, file_backups)
+        self._after_id = text.after(flush_ms, self._tick)
+
+    def mirror_to(self, path, max_bytes=FILE_BYTES, backups=FILE_BACKUPS):
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                      encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(message)s"))
+        logger = logging.getLogger(f"vr_log.{id(self)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        self._file = logger
+
+    def write(self, msg, tag="info"):
+        # Safe from any thread; the widget is only touched on the Tk timer
+        ts = datetime.now().strftime("%H:%M:%S")
+        with self._lock:
+            if len(self._ring) == self._ring.maxlen:
+                self.dropped += 1
+            self._ring.append((ts, tag, msg))
+        if self._file:
+            self._file.log(LEVELS.get(tag, logging.INFO), msg)
+
+    def _tick(self):
+        self.flush()
+        self._after_id = self.text.after(self.flush_ms, self._tick)
+
+    def flush(self):
+        with self._lock:
+            if not self._ring:
+                return
+            batch = list(self._ring)
+            self._ring.clear()
+            dropped, self.dropped = self.dropped, 0
+
+        t0 = time.perf_counter()
+        chunks = []
+        if dropped:
+            chunks += [f"… {dropped} line(s) dropped …\n", "dim"]
+        for ts, tag, msg in batch:
+            chunks += [f"[{ts}] ", "time", ICONS.get(tag, "") + msg + "\n", tag]
+
+        t = self.text
+        follow = t.yview()[1] >= 0.999
+        t.configure(state="normal")
+        t.insert("end", *chunks)
+        # Every message ends in "\n", so "end-1c" sits on the empty line after the last one
+        excess = int(t.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            t.delete("1.0", f"{excess + 1}.0")
+        t.configure(state="disabled")
+        if follow:
+            t.see("end")
+        vr_trace.observe("ui.log_flush", time.perf_counter() - t0)
+
+    def close(self):
+        try:
+            self.text.after_cancel(self._after_id)
+        except Exception:
+            pass
+        if self._file:
+            for h in list(self._file.handlers):
+                h.close()
+                self._file.removeHandler(h)
+            self._file = None
@@ -0,0 +1,1042 @@
+import os
+import re
+import time
+import shlex
+import sqlite3
+import threading
+
+import vr_backup
+import vr_bepinex
+import vr_compilers
+import vr_fingerprint
+import vr_localconfig
+import vr_preflight
+import vr_provision
+import vr_timing
+import vr_trace
+from vr_build_cache import build_exe, default_cache
+from vr_worker import Cancelled
+
+# GUI-free patch operations shared by both Tk apps and the batch CLI.
+# Every operation takes a log(msg, tag) callback with the same tags as App.log
+# and returns True on success. The optional cancel Event is honoured at points
+# where stopping leaves the game folder consistent (raises vr_worker.Cancelled).
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAUNCHER_CONFIG = os.path.join(HERE, "vr_launcher_profiles.json")
+WRAPPER_CONFIG  = os.path.join(HERE, "vr_wrapper_profiles.json")
+
+DEFAULT_ARGS = "-vrmode openvr"
+
+CSC_PATHS = vr_compilers.NETFX_PATHS
+
+# Launcher template - launches the real game EXE directly (no rename needed)
+LAUNCHER_TEMPLATE = r'''
+using System;
+using System.Diagnostics;
+using System.IO;
+
+class VRLauncher {{
+    static void Main(string[] args) {{
+{timing_head}        // Steam passes its own args (including -vrmode none) via %command%.
+        // We ignore them entirely and launch with our own forced arguments.
+        string dir = AppDomain.CurrentDomain.BaseDirectory;
+        string realExe = Path.Combine(dir, "{game_exe}");
+        if (!File.Exists(realExe)) {{
+            Console.WriteLine("[VRLauncher] ERROR: " + realExe + " not found!");
+            Console.ReadLine();
+            return;
+        }}
+        ProcessStartInfo psi = new ProcessStartInfo();
+        psi.FileName = realExe;
+        psi.Arguments = "{vr_args}";
+        psi.UseShellExecute = false;
+        psi.WorkingDirectory = dir;
+{start}    }}
+{helpers}}}
+'''
+
+# Proton/Linux launch wrapper - no .NET at all. Steam runs it with the full
+# %command% line (Proton and the game EXE); it drops Steam's -vrmode and its
+# value, appends the profile arguments and execs the rest unchanged.
+PROTON_SCRIPT = """#!/bin/sh
+# {marker}
+# Steam launch option: {hint}
+{setup}skip=0
+for a in "$@"; do
+    shift
+    if [ "$skip" = 1 ]; then skip=0; continue; fi
+    case "$a" in
+        -vrmode) skip=1; continue ;;
+        -vrmode=*) continue ;;
+    esac
+    set -- "$@" "$a"
+done
+exec "$@" {vr_args}
+"""
+PROTON_MARKER = "VR launch wrapper generated by vr_launcher_maker"
+
+LAUNCHER_MODES  = ("exe", "sidecar", "proton")
+SIDECAR_EXT     = ".vrargs"
+SIDECAR_VERSION = 1
+
+WRAPPER_TEMPLATE = r'''
+using System;
+using System.Diagnostics;
+using System.IO;
+
+class VRWrapper {{
+    static void Main(string[] args) {{
+{timing_head}        string dir = AppDomain.CurrentDomain.BaseDirectory;
+        string realExe = Path.Combine(dir, "{real_exe}");
+        ProcessStartInfo psi = new ProcessStartInfo();
+        psi.FileName = realExe;
+        psi.Arguments = "{vr_args}";
+        psi.UseShellExecute = false;
+        psi.WorkingDirectory = dir;
+{start}    }}
+{helpers}}}
+'''
+
+# Launch timing (opt-in): appended to <game folder>/vr_launch_timing.log, see
+# vr_timing.py for the record format. Plain C#, inserted via format arguments.
+TIMING_HEAD = '''        DateTime vrWhen = DateTime.UtcNow;
+        double vrBoot = -1;
+        try { vrBoot = (DateTime.Now - Process.GetCurrentProcess().StartTime).TotalMilliseconds; } catch { }
+        Stopwatch vrClock = Stopwatch.StartNew();
+'''
+
+TIMING_CALL   = "        double vrCall = vrClock.Elapsed.TotalMilliseconds;\n"
+TIMING_RET    = "        double vrRet = vrClock.Elapsed.TotalMilliseconds;\n"
+TIMING_RECORD = "RecordLaunch(dir, vrWhen, vrBoot, vrCall, vrRet, child, args);\n"
+
+TIMING_HELPER = r'''
+    static void RecordLaunch(string dir, DateTime when, double boot, double call, double ret,
+                             Process child, string[] args) {
+        try {
+            System.Globalization.CultureInfo inv = System.Globalization.CultureInfo.InvariantCulture;
+            string dropped = string.Join(" ", args).Replace('\t', ' ').Replace('\r', ' ').Replace('\n', ' ');
+            string line = "v1\t" + when.ToString("o") + "\t" + AppDomain.CurrentDomain.FriendlyName +
+                "\t" + boot.ToString("F1", inv) + "\t" + call.ToString("F1", inv) +
+                "\t" + ret.ToString("F1", inv) + "\t" + (child != null ? child.Id : -1) +
+                "\t" + dropped + "\n";
+            File.AppendAllText(Path.Combine(dir, "vr_launch_timing.log"), line);
+        } catch {
+            // timing must never keep the game from launching
+        }
+    }
+'''
+
+# Universal launcher - built once, reads its target and arguments at launch
+# from <own name>.vrargs next to itself. Not a format string; timing, priority,
+# affinity and environment support is always compiled in and driven by the sidecar.
+_UNIVERSAL_SOURCE = r'''
+using System;
+using System.Diagnostics;
+using System.IO;
+using System.Reflection;
+using System.Text;
+
+class VRLauncher {
+    static void Main(string[] args) {
+        //TIMING_HEAD
+        // Steam's own args are ignored; target and arguments come from the sidecar
+        string self = Assembly.GetEntryAssembly().Location;
+        string dir = Path.GetDirectoryName(self);
+        string cfg = Path.Combine(dir, Path.GetFileNameWithoutExtension(self) + ".vrargs");
+        if (!File.Exists(cfg)) {
+            Fail(cfg + " not found!");
+            return;
+        }
+        ProcessStartInfo psi = new ProcessStartInfo();
+        string exe = null, vrArgs = "", priority = null, affinity = null;
+        bool timing = false;
+        foreach (string raw in File.ReadAllLines(cfg, Encoding.UTF8)) {
+            string line = raw.Trim();
+            if (line.Length == 0 || line[0] == '#') continue;
+            int eq = line.IndexOf('=');
+            if (eq < 0) continue;
+            string key = line.Substring(0, eq).Trim(), val = line.Substring(eq + 1).Trim();
+            if (key == "exe") exe = val;
+            else if (key == "args") vrArgs = val;
+            else if (key == "timing") timing = val == "1";
+            else if (key == "priority") priority = val;
+            else if (key == "affinity") affinity = val;
+            else if (key.StartsWith("env.")) psi.EnvironmentVariables[key.Substring(4)] = val;
+        }
+        if (string.IsNullOrEmpty(exe)) {
+            Fail("no exe= line in " + cfg);
+            return;
+        }
+        string realExe = Path.Combine(dir, exe);
+        if (!File.Exists(realExe)) {
+            Fail(realExe + " not found!");
+            return;
+        }
+        psi.FileName = realExe;
+        psi.Arguments = vrArgs;
+        psi.UseShellExecute = false;
+        psi.WorkingDirectory = dir;
+        //TIMING_CALL
+        Process child = Process.Start(psi);
+        //TIMING_RET
+        if (priority != null) {
+            try { child.PriorityClass = (ProcessPriorityClass)Enum.Parse(typeof(ProcessPriorityClass), priority, true); } catch { }
+        }
+        if (affinity != null) {
+            try { child.ProcessorAffinity = (IntPtr)Convert.ToInt64(affinity, 16); } catch { }
+        }
+        if (timing) //TIMING_RECORD
+    }
+    //HELPERS
+
+    static void Fail(string msg) {
+        Console.WriteLine("[VRLauncher] ERROR: " + msg);
+        Console.ReadLine();
+    }
+}
+'''
+
+UNIVERSAL_LAUNCHER = (_UNIVERSAL_SOURCE
+                      .replace("        //TIMING_HEAD\n", TIMING_HEAD)
+                      .replace("        //TIMING_CALL\n", TIMING_CALL)
+                      .replace("        //TIMING_RET\n", TIMING_RET)
+                      .replace("//TIMING_RECORD\n", TIMING_RECORD)
+                      .replace("    //HELPERS\n", TIMING_HELPER))
+
+PRIORITIES = ("Idle", "BelowNormal", "Normal", "AboveNormal", "High", "RealTime")
+NICE       = {"Idle": 19, "BelowNormal": 10, "Normal": 0, "AboveNormal": -5, "High": -10, "RealTime": -20}
+_ENV_NAME  = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+
+
+# ── Launch options (priority / affinity / environment) ──────────────────────
+
+def parse_affinity(text):
+    # "" → None; "0xF0" is a mask, anything else a CPU list such as "0-3,6"
+    text = str(text or "").strip()
+    if not text:
+        return None
+    try:
+        if text.lower().startswith("0x"):
+            mask = int(text, 16)
+        else:
+            mask = 0
+            for part in text.split(","):
+                lo, _, hi = part.strip().partition("-")
+                lo = int(lo)
+                hi = int(hi) if hi else lo
+                if lo < 0 or hi < lo or hi > 62:
+                    raise ValueError
+                mask |= ((1 << (hi - lo + 1)) - 1) << lo
+    except ValueError:
+        raise ValueError(f"CPU affinity must be a mask (0xF0) or a CPU list (0-3,6): {text!r}")
+    if not 0 < mask < 1 << 63:
+        raise ValueError(f"CPU affinity mask out of range: {text!r}")
+    return mask
+
+
+def parse_env(value):
+    # dict, or "KEY=VALUE; KEY2=VALUE" text → dict
+    if isinstance(value, dict):
+        items = list(value.items())
+    else:
+        items = []
+        for part in re.split(r"[;\n]", value or ""):
+            if part.strip():
+                key, eq, val = part.partition("=")
+                if not eq:
+                    raise ValueError(f"environment entry needs KEY=VALUE: {part.strip()!r}")
+                items.append((key, val))
+    env = {}
+    for key, val in items:
+        key, val = str(key).strip(), str(val).strip()
+        if not _ENV_NAME.match(key):
+            raise ValueError(f"bad environment variable name: {key!r}")
+        if "\n" in val or "\r" in val:
+            raise ValueError(f"environment value for {key} must be a single line")
+        env[key] = val
+    return env
+
+
+def format_env(env):
+    return "; ".join(f"{k}={v}" for k, v in (env or {}).items())
+
+
+def launch_options(profile=None):
+    # Normalises the profile's priority/affinity/env fields; raises ValueError
+    p = profile or {}
+    priority = str(p.get("priority") or "").strip()
+    if priority:
+        match = [x for x in PRIORITIES if x.lower() == priority.lower()]
+        if not match:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}: {priority!r}")
+        priority = match[0]
+    return {"priority": priority, "affinity": parse_affinity(p.get("affinity")),
+            "env": parse_env(p.get("env"))}
+
+
+def describe_launch(launch):
+    parts = []
+    if launch.get("priority"):
+        parts.append(f"priority {launch['priority']}")
+    if launch.get("affinity"):
+        parts.append(f"affinity {launch['affinity']:#x}")
+    if launch.get("env"):
+        parts.append(f"{len(launch['env'])} env var(s)")
+    return ", ".join(parts)
+
+
+# ── Rendering ───────────────────────────────────────────────────────────────
+
+def cs_string(text):
+    # C# regular string literal, quotes included
+    out = text.replace("\\", "\\\\").replace('"', '\\"')
+    return '"' + out.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t") + '"'
+
+
+def _launch_parts(timing, launch=None):
+    launch = launch or launch_options()
+    start = "".join(f"        psi.EnvironmentVariables[{cs_string(k)}] = {cs_string(v)};\n"
+                    for k, v in sorted(launch["env"].items()))
+    after = ""
+    if launch["priority"]:
+        after += (f"        try {{ child.PriorityClass = ProcessPriorityClass.{launch['priority']}; }}"
+                  f" catch {{ }}\n")
+    if launch["affinity"]:
+        after += f"        try {{ child.ProcessorAffinity = (IntPtr){launch['affinity']:#x}L; }} catch {{ }}\n"
+    if not timing and not after:
+        start += "        Process.Start(psi);\n"
+    else:
+        start += ((TIMING_CALL if timing else "") + "        Process child = Process.Start(psi);\n" +
+                  (TIMING_RET if timing else "") + after +
+                  ("        " + TIMING_RECORD if timing else ""))
+    return {"timing_head": TIMING_HEAD if timing else "",
+            "helpers": TIMING_HELPER if timing else "", "start": start}
+
+
+def render_launcher(exe, args, timing=False, launch=None):
+    return LAUNCHER_TEMPLATE.format(game_exe=cs_string(exe)[1:-1], vr_args=cs_string(args)[1:-1],
+                                    **_launch_parts(timing, launch))
+
+
+def render_wrapper(real_exe, args, timing=False, launch=None):
+    return WRAPPER_TEMPLATE.format(real_exe=cs_string(real_exe)[1:-1], vr_args=cs_string(args)[1:-1],
+                                   **_launch_parts(timing, launch))
+
+
+def _null_log(msg, tag="info"):
+    pass
+
+
+_compiler      = None
+_compiler_lock = threading.Lock()
+
+
+def use_compiler(compiler):
+    # Pin a backend (or None to re-detect); batch --compiler and vr_bench use this
+    global _compiler
+    with _compiler_lock:
+        _compiler = compiler
+
+
+def find_compiler(log=_null_log):
+    # Detected once per process; later builds reuse the backend and its server
+    global _compiler
+    with _compiler_lock, vr_trace.span("find_compiler"):
+        if _compiler is None:
+            results = vr_compilers.detect(CSC_PATHS)
+            log("Compiler backends:", "dim")
+            for kind, comp, reason in results:
+                log(f"  {kind:<11} {comp.path if comp else reason}", "dim")
+            _compiler = vr_compilers.choose(results)
+        return _compiler
+
+
+def _no_compiler(log):
+    want = os.environ.get("VR_COMPILER")
+    if want:
+        log(f"Compiler backend '{want}' (VR_COMPILER) is not available.", "err")
+    else:
+        log("No C# compiler found! Install .NET Framework 4.x, Mono or the .NET SDK.", "err")
+    return False
+
+
+def default_launcher_name(exe):
+    return f"{os.path.splitext(exe)[0]}Launcher.exe"
+
+
+def new_profile(tool, folder, exe, args=DEFAULT_ARGS, launcher_name=None):
+    if tool == "launcher":
+        return {"folder": folder, "exe": exe,
+                "launcher_name": launcher_name or default_launcher_name(exe), "args": args}
+    return {"folder": folder, "exe": exe, "args": args}
+
+
+def script_name(launcher_name):
+    return os.path.splitext(launcher_name)[0] + ".sh"
+
+
+def steam_hint(folder, launcher_name, mode="exe"):
+    # Steam hands a Proton game's launch options to sh, so the script path is single-quoted for it
+    if mode == "proton":
+        path = os.path.join(folder, script_name(launcher_name))
+        return "'" + path.replace("'", "'\"'\"'") + "' %command%"
+    return f'"{os.path.join(folder, launcher_name)}" %command%'
+
+
+def steam_option(folder, launcher_name, mode="exe", clear=False):
+    # A (folder, value, keep) item for vr_localconfig.update; clearing leaves
+    # launch options alone unless they run this launcher or its script
+    if not clear:
+        return folder, steam_hint(folder, launcher_name, mode), None
+    names = (launcher_name.lower(), script_name(launcher_name).lower())
+    return folder, None, lambda old: not any(n in old.lower() for n in names)
+
+
+def set_steam_options(items, log=_null_log):
+    # Advisory: the launcher works either way, the user can still paste steam_hint()
+    with vr_trace.span("steam_options"):
+        try:
+            return vr_localconfig.update(items, log)
+        except OSError as e:
+            log(f"Steam launch options not written: {e}", "warn"); return False
+
+
+# ── Sidecar config (universal launcher) ─────────────────────────────────────
+#
+#   # VR launcher config, read by SubnauticaZeroLauncher.exe on every launch
+#   version=1
+#   exe=SubnauticaZero.exe
+#   args=-vrmode openvr
+
+def sidecar_path(folder, launcher_name):
+    return os.path.join(folder, os.path.splitext(launcher_name)[0] + SIDECAR_EXT)
+
+
+def validate_sidecar(exe, args):
+    # Raises ValueError; keeps what the C# side can parse unambiguously
+    if not exe or "/" in exe or "\\" in exe:
+        raise ValueError(f"sidecar exe must be a plain file name: {exe!r}")
+    if not exe.lower().endswith(".exe"):
+        raise ValueError(f"sidecar exe must end in .exe: {exe!r}")
+    for field, value in (("exe", exe), ("args", args)):
+        if "\n" in value or "\r" in value:
+            raise ValueError(f"sidecar {field} must be a single line")
+        if value != value.strip():
+            raise ValueError(f"sidecar {field} has leading/trailing whitespace")
+
+
+def write_sidecar(path, exe, args, launcher_name=None, timing=False, launch=None):
+    validate_sidecar(exe, args)
+    launch = launch or launch_options()
+    owner = launcher_name or os.path.splitext(os.path.basename(path))[0] + ".exe"
+    text = (f"# VR launcher config, read by {owner} on every launch\n"
+            f"version={SIDECAR_VERSION}\nexe={exe}\nargs={args}\n")
+    if timing:
+        text += "timing=1\n"
+    if launch["priority"]:
+        text += f"priority={launch['priority']}\n"
+    if launch["affinity"]:
+        text += f"affinity={launch['affinity']:#x}\n"
+    for key, val in sorted(launch["env"].items()):
+        text += f"env.{key}={val}\n"
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def read_sidecar(path):
+    # Returns {"version", "exe", "args", "timing", "launch"}; raises OSError or ValueError
+    data = {}
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for n, raw in enumerate(f, 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, eq, value = line.partition("=")
+            if not eq:
+                raise ValueError(f"{os.path.basename(path)}:{n}: expected key=value")
+            data[key.strip()] = value.strip()
+    try:
+        version = int(data.get("version", SIDECAR_VERSION))
+    except ValueError:
+        raise ValueError(f"{os.path.basename(path)}: bad version {data['version']!r}")
+    if version > SIDECAR_VERSION:
+        raise ValueError(f"{os.path.basename(path)}: unsupported version {version}")
+    exe, args = data.get("exe", ""), data.get("args", "")
+    validate_sidecar(exe, args)
+    launch = launch_options({"priority": data.get("priority"), "affinity": data.get("affinity"),
+                             "env": {k[4:]: v for k, v in data.items() if k.startswith("env.")}})
+    return {"version": version, "exe": exe, "args": args, "timing": data.get("timing") == "1",
+            "launch": launch}
+
+
+def _check(cancel):
+    if cancel is not None and cancel.is_set():
+        raise Cancelled()
+
+
+def _compile(compiler, target, optimize, cs_code, out_path, cs_path, log, cancel=None):
+    cache = default_cache()
+    t0 = time.perf_counter()
+    with vr_trace.span("compile", backend=compiler.kind) as s:
+        cached, stderr = build_exe(compiler, target, optimize, cs_code, out_path, cs_path,
+                                   cache, cancel)
+        s.attrs["cached"] = cached
+    if cached:
+        log(f"Build cache hit — compiler skipped ({cache.stats()})", "dim")
+    else:
+        log(f"Built with {compiler.kind} in {time.perf_counter() - t0:.2f}s "
+            f"(cache miss, {cache.stats()})", "dim")
+    return stderr
+
+
+# ── Fingerprints ────────────────────────────────────────────────────────────
+
+def exe_kind(path, expected=None):
+    # "missing", "wrapper", "original", "modified since patch" or "unknown binary"
+    with vr_trace.span("classify"):
+        kind, sha = vr_fingerprint.default_cache().classify(path, expected)
+    if kind in ("unknown binary", "modified since patch") and is_wrapper_exe(path):
+        kind = "wrapper"     # built before fingerprints were recorded
+    return kind, sha
+
+
+def _record(folder, exe, original, wrapper, log):
+    data_dir = os.path.join(folder, os.path.splitext(os.path.basename(original))[0] + "_Data")
+    try:
+        with vr_trace.span("fingerprint"):
+            rec = vr_fingerprint.default_cache().record_install(folder, exe, original, wrapper, data_dir)
+    except OSError as e:
+        log(f"Fingerprints not recorded: {e}", "warn"); return
+    if rec["original"]:
+        log(f"Fingerprint: {os.path.basename(original)} {rec['original'][:12]}"
+            f" (+{len(rec['data'])} key file(s))", "dim")
+
+
+def _log_key_files(folder, data_dir, rec, log):
+    with vr_trace.span("key_files"):
+        changed = vr_fingerprint.default_cache().changed_key_files(folder, data_dir, rec)
+    if changed:
+        log(f"Modified since patch: {', '.join(os.path.basename(c) for c in changed)} (game updated?)", "warn")
+
+
+def _preflight(folder, exe, args, log, game_exe=None, data_dir=None):
+    # Advisory only: a mod or a runtime installed system-wide may still supply the DLL.
+    # A runtime DLL that is simply absent is borrowed from another install.
+    game_exe = game_exe or exe
+    data_dir = data_dir or os.path.join(folder, os.path.splitext(game_exe)[0] + "_Data")
+    try:
+        with vr_trace.span("preflight"):
+            if vr_preflight.check(folder, game_exe, args, log, data_dir):
+                return True
+            want = vr_preflight.requested_runtime(args)
+            facts = vr_preflight.scan(os.path.join(folder, game_exe), data_dir)
+            if vr_preflight.assess(facts).get(want, ("missing",))[0] != "missing":
+                return False
+        with vr_trace.span("provision"):
+            return vr_provision.provision(folder, exe, data_dir, want, facts["arch"], log)
+    except OSError as e:
+        log(f"VR preflight failed: {e}", "dim"); return True
+
+
+def _last_launch(folder, args, log, patched_path):
+    # What the last launch actually got, from BepInEx's log (silent without BepInEx)
+    try:
+        since = os.path.getmtime(patched_path)
+    except OSError:
+        since = None
+    with vr_trace.span("bepinex_log"):
+        vr_bepinex.log_summary(folder, args, log, since)
+
+
+def _mark(tool, folder, item, patched, log):
+    # Whether the patch is meant to be in place, so vr_watch can tell a launcher
+    # removed here from one that vanished. Imported here because vr_store imports us.
+    import vr_store
+    try:
+        vr_store.mark_patched(tool, folder, item, patched)
+    except (OSError, sqlite3.Error) as e:
+        log(f"Patch state not recorded: {e}", "dim")
+
+
+def _unprovision(folder, exe, log):
+    base = os.path.splitext(exe)[0]
+    try:
+        vr_provision.remove(folder, exe, [os.path.join(folder, f"{base}_Data"),
+                                          os.path.join(folder, f"{base}Real_Data")], log)
+    except OSError as e:
+        log(f"Provisioned files not removed: {e}", "warn")
+
+
+def _backup(path, folder, exe, log):
+    # Safety copy in the shared backup store; returns its hash, or None after a warning
+    try:
+        with vr_trace.span("backup"):
+            sha, method = vr_backup.default_store().add(path, folder, exe)
+    except OSError as e:
+        log(f"Backup of {os.path.basename(path)} failed: {e}", "warn"); return None
+    how = "already in the backup store" if method == "stored" else f"backed up ({method})"
+    log(f"{os.path.basename(path)} {how}: {sha[:12]}", "dim")
+    return sha
+
+
+def _restore_backup(folder, exe, dest, log):
+    store = vr_backup.default_store()
+    sha = store.latest(folder, exe)
+    if not sha:
+        return False
+    try:
+        with vr_trace.span("restore_backup"):
+            store.restore(sha, dest)
+    except OSError as e:
+        log(f"Restore from backup failed: {e}", "err"); return False
+    log(f"{os.path.basename(dest)} restored from backup ({sha[:12]})", "ok")
+    return True
+
+
+def _release_backup(folder, exe, log):
+    try:
+        with vr_trace.span("release_backup"):
+            freed = vr_backup.default_store().release(folder, exe)
+    except OSError:
+        return
+    if freed:
+        log(f"Backup released; {freed} unused copy deleted", "dim")
+
+
+# ── Launcher ────────────────────────────────────────────────────────────────
+
+def _launcher_artifacts(folder, launcher_name):
+    return {"exe":     os.path.join(folder, launcher_name),
+            "sidecar": sidecar_path(folder, launcher_name),
+            "proton":  os.path.join(folder, script_name(launcher_name))}
+
+
+def _is_our_script(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return PROTON_MARKER in f.read(512)
+    except OSError:
+        return False
+
+
+def _remove_artifacts(folder, launcher_name, keep, log):
+    # Deletes launcher files other than those in keep; never a foreign .sh
+    removed = []
+    with vr_trace.span("cleanup"):
+        for kind, path in _launcher_artifacts(folder, launcher_name).items():
+            if kind in keep or not os.path.exists(path):
+                continue
+            if kind == "proton" and not _is_our_script(path):
+                log(f"Left {os.path.basename(path)} alone (not generated by this tool)", "warn")
+                continue
+            os.remove(path)
+            removed.append(os.path.basename(path))
+    return removed
+
+
+def _proton_setup(launch):
+    # Exported env, then renice/taskset on the shell itself; exec keeps both.
+    # Raising priority needs privileges, so failures are silently ignored.
+    lines = [f"export {k}={shlex.quote(v)}" for k, v in sorted(launch["env"].items())]
+    if launch["priority"]:
+        lines.append(f"renice -n {NICE[launch['priority']]} -p $$ >/dev/null 2>&1")
+    if launch["affinity"]:
+        lines.append(f"taskset -p {launch['affinity']:#x} $$ >/dev/null 2>&1")
+    return "".join(line + "\n" for line in lines)
+
+
+def apply_proton_script(folder, exe, launcher_name, args, log=_null_log, launch=None):
+    script = os.path.join(folder, script_name(launcher_name))
+    try:
+        tokens = shlex.split(args)
+    except ValueError as e:
+        log(f"Arguments can't be split for the shell: {e}", "err"); return False
+    if os.path.exists(script) and not _is_our_script(script):
+        log(f"{os.path.basename(script)} exists and was not generated by this tool", "err"); return False
+    text = PROTON_SCRIPT.format(marker=PROTON_MARKER, hint=steam_hint(folder, launcher_name, "proton"),
+                                setup=_proton_setup(launch or launch_options()),
+                                vr_args=" ".join(shlex.quote(t) for t in tokens))
+    tmp = script + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    os.chmod(tmp, 0o755)
+    os.replace(tmp, script)
+    log(f"Launch script created: {os.path.basename(script)} (no .NET start-up under Proton)", "ok")
+    for name in _remove_artifacts(folder, launcher_name, ("proton",), log):
+        log(f"Removed unused: {name}", "dim")
+    _record(folder, exe, os.path.join(folder, exe), None, log)
+    return True
+
+
+def read_proton_args(path):
+    # The argument list baked into a generated script, or None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith('exec "$@"'):
+                return line[len('exec "$@"'):].strip()
+    return None
+
+
+@vr_trace.traced()
+def apply_launcher(folder, exe, launcher_name, args, log=_null_log, cancel=None, mode="exe",
+                   timing=False, launch=None, steam_options=True):
+    # mode "exe" bakes exe/args into the build; "sidecar" deploys the universal
+    # launcher (one cached build for every game) plus a .vrargs file; "proton"
+    # writes a shell wrapper for Steam Play instead of compiling anything.
+    # timing makes the launcher append a record to vr_launch_timing.log;
+    # launch is a launch_options() dict applied to the game process.
+    # steam_options writes steam_hint() into Steam's localconfig.vdf (batch
+    # mode does that itself, for all games at once).
+    game_path     = os.path.join(folder, exe)
+    launcher_path = os.path.join(folder, launcher_name)
+    sidecar       = sidecar_path(folder, launcher_name)
+
+    log("─── Creating Launcher ────────────────", "dim")
+
+    if mode not in LAUNCHER_MODES:
+        log(f"Unknown launcher mode: {mode}", "err"); return False
+    if not os.path.exists(game_path):
+        log(f"Game EXE not found: {exe}", "err"); return False
+    log(f"Game EXE found: {exe} (will NOT be renamed)", "ok")
+    if launch and describe_launch(launch):
+        log(f"Launch options: {describe_launch(launch)}", "dim")
+    if mode == "proton":
+        if timing:
+            log("Launch timing is not recorded by the Proton script", "dim")
+        ok = apply_proton_script(folder, exe, launcher_name, args, log, launch)
+        if ok:
+            _backup(game_path, folder, exe, log)
+            _preflight(folder, exe, args, log)
+            _mark("launcher", folder, launcher_name, True, log)
+        if ok and steam_options:
+            set_steam_options([steam_option(folder, launcher_name, mode)], log)
+        return ok
+    if mode == "sidecar":
+        try:
+            validate_sidecar(exe, args)
+        except ValueError as e:
+            log(str(e), "err"); return False
+
+    compiler = find_compiler(log)
+    if not compiler:
+        return _no_compiler(log)
+    log(f"Compiler: {compiler.describe()}", "ok")
+
+    if mode == "sidecar":
+        cs_code = UNIVERSAL_LAUNCHER
+    else:
+        cs_code = render_launcher(exe, args, timing, launch)
+    cs_path = os.path.join(folder, "_vrlauncher_temp.cs")
+
+    _check(cancel)
+    log(f"Compiling {launcher_name}{' (universal)' if mode == 'sidecar' else ''}...", "dim")
+    try:
+        stderr = _compile(compiler, "exe", True,
+                          cs_code, launcher_path, cs_path, log, cancel)
+    except Cancelled:
+        raise
+    except Exception as e:
+        log(f"Compilation error: {e}", "err"); return False
+    if not os.path.exists(launcher_path):
+        log("Compilation failed!", "err")
+        if stderr:
+            log(stderr[:400], "warn")
+        return False
+    size = os.path.getsize(launcher_path)
+    log(f"Launcher created: {launcher_name} ({size // 1024} KB)", "ok")
+    if timing:
+        log(f"Launch timing on: records go to {vr_timing.LOG_NAME}", "dim")
+
+    if mode == "sidecar":
+        with vr_trace.span("sidecar"):
+            write_sidecar(sidecar, exe, args, launcher_name, timing, launch)
+        log(f"Sidecar written: {os.path.basename(sidecar)} — edit args there, no rebuild needed", "ok")
+        keep = ("exe", "sidecar")
+    else:
+        keep = ("exe",)
+    # A baked launcher ignores the sidecar; don't leave misleading files behind
+    for name in _remove_artifacts(folder, launcher_name, keep, log):
+        log(f"Removed unused: {name}", "dim")
+    # Only now that the launcher is in place, so a failed build leaves no backup or borrowed DLLs
+    _backup(game_path, folder, exe, log)
+    _preflight(folder, exe, args, log)
+    _record(folder, exe, game_path, None, log)
+    _mark("launcher", folder, launcher_name, True, log)
+    if steam_options:
+        set_steam_options([steam_option(folder, launcher_name, mode)], log)
+    return True
+
+
+@vr_trace.traced()
+def remove_launcher(folder, launcher_name, log=_null_log, exe=None, steam_options=True):
+    # exe (the game EXE) lets the backup taken at apply time be released
+    log("─── Removing Launcher ────────────────", "dim")
+    removed = _remove_artifacts(folder, launcher_name, (), log)
+    if not removed:
+        log(f"Launcher not found: {launcher_name}", "warn"); return False
+    _mark("launcher", folder, launcher_name, False, log)
+    for name in removed:
+        log(f"Deleted: {name}", "ok")
+    log("Game EXE is untouched.", "ok")
+    if exe:
+        _release_backup(folder, exe, log)
+        _unprovision(folder, exe, log)
+    if steam_options:
+        set_steam_options([steam_option(folder, launcher_name, clear=True)], log)
+    return True
+
+
+@vr_trace.traced()
+def launcher_status(folder, exe, launcher_name, log=_null_log, args=None):
+    log("─── Status Check ─────────────────────", "dim")
+    launcher_path = os.path.join(folder, launcher_name)
+    game_path     = os.path.join(folder, exe)
+    sidecar       = sidecar_path(folder, launcher_name)
+    script        = os.path.join(folder, script_name(launcher_name))
+    ok = True
+    patched = launcher_path
+
+    if os.path.exists(launcher_path):
+        size = os.path.getsize(launcher_path)
+        log(f"Launcher active: {launcher_name} ({size // 1024} KB)", "ok")
+    elif os.path.exists(script) and _is_our_script(script):
+        patched = script
+        script_args = read_proton_args(script)
+        args = args if args is not None else script_args
+        log(f"Launch script active: {os.path.basename(script)} "
+            f"(args: {script_args or '—'})", "ok")
+        if not os.access(script, os.X_OK) and os.name != "nt":
+            log(f"{os.path.basename(script)} is not executable (chmod +x)", "warn"); ok = False
+    else:
+        log(f"Launcher not found: {launcher_name}", "warn"); ok = False
+
+    if os.path.exists(sidecar):
+        try:
+            cfg = read_sidecar(sidecar)
+        except (OSError, ValueError) as e:
+            log(f"Sidecar unreadable: {e}", "err"); ok = False
+        else:
+            extra = describe_launch(cfg["launch"])
+            args = args if args is not None else cfg["args"]
+            log(f"Sidecar: exe={cfg['exe']}  args={cfg['args']}"
+                f"{'  timing=on' if cfg['timing'] else ''}{'  ' + extra if extra else ''}", "ok")
+            if cfg["exe"].lower() != exe.lower():
+                log(f"Sidecar targets {cfg['exe']}, profile says {exe}", "warn"); ok = False
+            elif not os.path.exists(os.path.join(folder, cfg["exe"])):
+                log(f"Sidecar target missing: {cfg['exe']}", "err"); ok = False
+
+    fp  = vr_fingerprint.default_cache()
+    rec = fp.install(folder, exe) or {}
+    kind, sha = exe_kind(game_path, rec.get("original"))
+    if kind == "missing":
+        log(f"Game EXE missing: {exe}", "err"); ok = False
+    elif kind == "wrapper":
+        log(f"{exe} is a wrapper, not the game — point the launcher at {os.path.splitext(exe)[0]}Real.exe", "err")
+        ok = False
+    elif kind == "modified since patch":
+        log(f"Game EXE updated since the launcher was made: {exe} ({sha[:12]}) — the launcher still applies", "info")
+    else:
+        log(f"Game EXE intact: {exe} ({kind}, {sha[:12]})", "ok")
+    _log_key_files(folder, os.path.join(folder, f"{os.path.splitext(exe)[0]}_Data"), rec, log)
+    _preflight(folder, exe, None, log)
+    with vr_trace.span("timing_summary"):
+        vr_timing.log_summary(folder, log)
+    _last_launch(folder, args, log, patched)
+    return ok
+
+
+# ── Wrapper ─────────────────────────────────────────────────────────────────
+
+WRAPPER_MAX_SIZE = 100_000
+
+
+def wrapper_paths(folder, exe):
+    base = os.path.splitext(exe)[0]
+    return (base,
+            os.path.join(folder, exe),
+            os.path.join(folder, f"{base}Real.exe"),
+            os.path.join(folder, f"{base}_Data"),
+            os.path.join(folder, f"{base}Real_Data"))
+
+
+def is_wrapper_exe(path):
+    # Our wrappers are a few KB; any Unity player EXE is far larger
+    try:
+        return os.path.getsize(path) < WRAPPER_MAX_SIZE
+    except OSError:
+        return False
+
+
+@vr_trace.traced()
+def apply_wrapper(folder, exe, args, log=_null_log, cancel=None, timing=False, launch=None):
+    base, orig_exe, real_exe, orig_data, real_data = wrapper_paths(folder, exe)
+
+    log("─── Applying Wrapper ─────────────────", "dim")
+
+    if not os.path.exists(real_exe) and not os.path.exists(orig_exe):
+        log(f"EXE not found: {exe}", "err"); return False
+    if launch and describe_launch(launch):
+        log(f"Launch options: {describe_launch(launch)}", "dim")
+
+    compiler = find_compiler(log)
+    if not compiler:
+        return _no_compiler(log)
+    log(f"Compiler: {compiler.describe()}", "ok")
+
+    # Build first: nothing is renamed until a wrapper is ready to drop in
+    cs_code  = render_wrapper(f"{base}Real.exe", args, timing, launch)
+    cs_path  = os.path.join(folder, "_wrapper_temp.cs")
+    tmp_exe  = os.path.join(folder, "_wrapper_temp.exe")
+
+    log("Compiling...", "dim")
+    try:
+        stderr = _compile(compiler, "winexe", False, cs_code, tmp_exe, cs_path, log, cancel)
+        _check(cancel)
+    except Cancelled:
+        if os.path.exists(tmp_exe):
+            os.remove(tmp_exe)
+        raise
+    except Exception as e:
+        log(f"Compilation error: {e}", "err"); return False
+    if not os.path.exists(tmp_exe):
+        log("Compilation failed!", "err")
+        if stderr: log(stderr[:300], "warn")
+        return False
+
+    # Never set a wrapper aside as the "real" game, and say so if Real.exe changed under us
+    rec = vr_fingerprint.default_cache().install(folder, exe) or {}
+    if not os.path.exists(real_exe):
+        if exe_kind(orig_exe)[0] == "wrapper":
+            os.remove(tmp_exe)
+            log(f"{exe} is a wrapper but {base}Real.exe is missing — restore the game EXE "
+                f"(Undo, or Steam: Verify integrity of game files) and apply again", "err")
+            return False
+        if not _backup(orig_exe, folder, exe, log):
+            os.remove(tmp_exe)
+            log(f"{exe} was not renamed: no backup could be made", "err")
+            return False
+        with vr_trace.span("rename_exe"):
+            os.rename(orig_exe, real_exe)
+        log(f"{exe} → {base}Real.exe", "ok")
+    else:
+        log(f"{base}Real.exe already exists, skipped", "dim")
+        real_kind = exe_kind(real_exe, rec.get("original"))[0]
+        if real_kind == "modified since patch":
+            log(f"{base}Real.exe changed since it was patched", "warn")
+        if real_kind != "wrapper":
+            _backup(real_exe, folder, exe, log)
+
+    if os.path.exists(orig_data) and not os.path.exists(real_data):
+        with vr_trace.span("rename_data"):
+            os.rename(orig_data, real_data)
+        log(f"{base}_Data → {base}Real_Data", "ok")
+    elif os.path.exists(real_data):
+        log(f"{base}Real_Data already exists, skipped", "dim")
+
+    with vr_trace.span("swap_in"):
+        os.replace(tmp_exe, orig_exe)
+    log(f"Wrapper EXE created: {exe}", "ok")
+    if timing:
+        log(f"Launch timing on: records go to {vr_timing.LOG_NAME}", "dim")
+    # Only now that the wrapper is in place, so a failed build leaves no borrowed DLLs
+    if os.path.isdir(real_data):
+        _preflight(folder, exe, args, log, os.path.basename(real_exe), real_data)
+    else:
+        _preflight(folder, exe, args, log)
+    _record(folder, exe, real_exe, orig_exe, log)
+    _mark("wrapper", folder, exe, True, log)
+    return True
+
+
+@vr_trace.traced()
+def undo_wrapper(folder, exe, log=_null_log):
+    base, wrap_exe, real_exe, orig_data, real_data = wrapper_paths(folder, exe)
+
+    log("─── Undoing Wrapper ──────────────────", "dim")
+    rec = vr_fingerprint.default_cache().install(folder, exe) or {}
+    real_kind, sha = exe_kind(real_exe, rec.get("original"))
+    if real_kind in ("missing", "wrapper"):
+        # Nothing to rename back; the backup store may still have the original
+        if exe_kind(wrap_exe)[0] not in ("wrapper", "missing") or \
+                not _restore_backup(folder, exe, wrap_exe, log):
+            if real_kind == "missing":
+                log("Real EXE not found — wrapper already removed?", "warn")
+            else:
+                log(f"{base}Real.exe is a wrapper, not the game — nothing to restore", "err")
+            return False
+        if real_kind == "wrapper":
+            os.remove(real_exe)
+    else:
+        if os.path.exists(wrap_exe):
+            kind, _ = exe_kind(wrap_exe, rec.get("original"))
+            if kind not in ("wrapper", "original"):
+                # Most likely a Steam update put a newer game EXE here; don't delete it
+                log(f"{exe} is not a wrapper ({kind}) — left alone; {base}Real.exe is probably "
+                    f"outdated, delete it yourself", "err")
+                return False
+            os.remove(wrap_exe)
+            log(f"Wrapper deleted: {exe}", "ok")
+        with vr_trace.span("rename_exe"):
+            os.rename(real_exe, wrap_exe)
+        if real_kind == "original":
+            log(f"{base}Real.exe → {exe} (verified original, {sha[:12]})", "ok")
+        elif real_kind == "modified since patch":
+            log(f"{base}Real.exe → {exe} (differs from the EXE set aside at patch time)", "warn")
+        else:
+            log(f"{base}Real.exe → {exe}", "ok")
+    # Only disarmed once the game EXE is back; a failed undo stays watched
+    _mark("wrapper", folder, exe, False, log)
+    vr_fingerprint.default_cache().forget_install(folder, exe)
+    _release_backup(folder, exe, log)
+    if os.path.exists(real_data) and not os.path.exists(orig_data):
+        with vr_trace.span("rename_data"):
+            os.rename(real_data, orig_data)
+        log(f"{base}Real_Data → {base}_Data", "ok")
+    _unprovision(folder, exe, log)
+    log("Undo complete.", "ok")
+    return True
+
+
+@vr_trace.traced()
+def wrapper_status(folder, exe, log=_null_log, args=None):
+    base, wrap_exe, real_exe, orig_data, real_data = wrapper_paths(folder, exe)
+    log("─── Status Check ─────────────────────", "dim")
+    ok = True
+    rec = vr_fingerprint.default_cache().install(folder, exe) or {}
+    real_kind, sha = exe_kind(real_exe, rec.get("original"))
+    if real_kind == "missing":
+        log("Real EXE not found — wrapper not applied", "warn"); ok = False
+    elif real_kind == "wrapper":
+        log(f"{base}Real.exe is a wrapper, not the game", "err"); ok = False
+    elif real_kind == "modified since patch":
+        log(f"Real EXE found: {base}Real.exe — modified since patch ({sha[:12]})", "warn")
+    else:
+        log(f"Real EXE found: {base}Real.exe ({real_kind}, {sha[:12]})", "ok")
+    if os.path.exists(real_data):
+        log("Real Data folder found", "ok")
+    else:
+        log("Real Data folder missing", "warn"); ok = False
+    kind, sha = exe_kind(wrap_exe, rec.get("original"))
+    if kind == "wrapper":
+        log(f"Wrapper is active ({sha[:12]})", "ok")
+    elif kind == "original":
+        log(f"Wrapper not applied ({exe} is the original game)", "dim"); ok = False
+    elif kind == "modified since patch":
+        log(f"Wrapper replaced: {exe} was modified since patch (Steam update?) — apply again", "err")
+        ok = False
+    elif kind == "unknown binary":
+        log(f"Wrapper not applied ({exe} is an unknown binary, {sha[:12]})", "dim"); ok = False
+    else:
+        ok = False
+    _log_key_files(folder, real_data if os.path.isdir(real_data) else orig_data, rec, log)
+    if os.path.isdir(real_data):
+        _preflight(folder, exe, None, log, os.path.basename(real_exe), real_data)
+    else:
+        _preflight(folder, exe, None, log)
+    with vr_trace.span("timing_summary"):
+        vr_timing.log_summary(folder, log)
+    _last_launch(folder, args, log, wrap_exe)
+    return ok
@@ -0,0 +1,120 @@
+import os
+import struct
+
+import vr_trace
+
+# Minimal PE header reader and game-EXE ranking. Only the first few KB of each
+# candidate are read; sizes come from the DirEntry stat cached by os.scandir.
+
+HEAD_BYTES = 4096
+
+MACHINES = {0x014c: "x86", 0x8664: "x64", 0xaa64: "arm64", 0x01c4: "arm"}
+SUBSYSTEMS = {2: "gui", 3: "console"}
+
+IMAGE_FILE_DLL = 0x2000
+CLR_DIRECTORY = 14
+
+# Names that are never the game itself (crash reporters, redists, our own launchers)
+SKIP_WORDS = ("crashhandler", "unitycrash", "uninstall", "unins0", "helper", "launcher",
+              "vcredist", "vc_redist", "dxsetup", "dotnetfx", "directx", "oalinst",
+              "physx", "easyanticheat", "setup", "subnautica32")
+
+
+def read_pe_info(path):
+    # Returns None for anything that isn't a PE image
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEAD_BYTES)
+            if len(head) < 0x40 or head[:2] != b"MZ":
+                return None
+            pe = struct.unpack_from("<I", head, 0x3C)[0]
+            if pe + 264 > len(head):
+                # Header sits past the first read; fetch just that window
+                f.seek(pe)
+                head, pe = f.read(264), 0
+    except (OSError, ValueError):
+        return None
+
+    if head[pe:pe + 4] != b"PE\0\0" or len(head) < pe + 24 + 72:
+        return None
+    machine, _, _, _, _, opt_size, chars = struct.unpack_from("<HHIIIHH", head, pe + 4)
+    opt = pe + 24
+    magic = struct.unpack_from("<H", head, opt)[0]
+    if magic == 0x10b:
+        pe32_plus, dirs_at = False, opt + 96
+    elif magic == 0x20b:
+        pe32_plus, dirs_at = True, opt + 112
+    else:
+        return None
+    if len(head) < dirs_at:
+        return None
+    subsystem = struct.unpack_from("<H", head, opt + 68)[0]
+    n_dirs = struct.unpack_from("<I", head, dirs_at - 4)[0]
+
+    dotnet = False
+    clr = dirs_at + CLR_DIRECTORY * 8
+    if n_dirs > CLR_DIRECTORY and clr + 8 <= len(head) and clr + 8 <= opt + opt_size:
+        rva, size = struct.unpack_from("<II", head, clr)
+        dotnet = bool(rva and size)
+
+    return {
+        "arch": MACHINES.get(machine, hex(machine)),
+        "pe32_plus": pe32_plus,
+        "subsystem": SUBSYSTEMS.get(subsystem, str(subsystem)),
+        "dll": bool(chars & IMAGE_FILE_DLL),
+        "dotnet": dotnet,
+    }
+
+
+def _score(name, info, has_data):
+    low = name.lower()
+    score = 30
+    if has_data:
+        score += 50
+    if any(w in low for w in SKIP_WORDS):
+        score -= 40
+    if info["dotnet"]:
+        score -= 30        # Unity players are native; csc launchers/wrappers are .NET
+    if info["subsystem"] == "gui":
+        score += 10
+    elif info["subsystem"] == "console":
+        score -= 10
+    if info["arch"] in ("x64", "arm64"):
+        score += 5
+    return max(0, min(100, score))
+
+
+@vr_trace.traced("auto_detect_exe")
+def rank_game_exes(folder):
+    exes, dirs = [], set()
+    has_unity_player = False
+    with os.scandir(folder) as it:
+        for e in it:
+            low = e.name.lower()
+            try:
+                if e.is_dir():
+                    dirs.add(low)
+                elif low.endswith(".exe"):
+                    exes.append((e.name, e.path, e.stat().st_size))
+                elif low == "unityplayer.dll":
+                    has_unity_player = True
+            except OSError:
+                continue
+
+    ranked = []
+    for name, path, size in exes:
+        info = read_pe_info(path)
+        if not info or info["dll"]:
+            continue
+        has_data = os.path.splitext(name)[0].lower() + "_data" in dirs
+        ranked.append(dict(info, name=name, size=size, has_data=has_data,
+                           unity=has_data and has_unity_player,
+                           confidence=_score(name, info, has_data) / 100))
+    ranked.sort(key=lambda c: (-c["confidence"], -c["size"], c["name"].lower()))
+    return ranked
+
+
+def describe(c):
+    kind = ".NET" if c["dotnet"] else "native"
+    data = ", _Data" if c["has_data"] else ""
+    return f"{c['name']} ({c['arch']} {c['subsystem']} {kind}{data}, {c['confidence']:.0%})"
@@ -0,0 +1,282 @@
+import os
+import bisect
+import tkinter as tk
+
+# Type-to-filter profile picker. ProfileIndex answers prefix queries with a
+# sorted name list and substring queries (names and folders) with a trigram
+# index; both are maintained incrementally on add/remove. ProfilePicker shows
+# results in a dropdown Listbox that is filled a page at a time as it scrolls.
+# PresetMenu is a checkbutton dropdown that remembers the order presets were
+# ticked in, since later presets override earlier ones.
+
+PAGE = 50
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ProfileIndex:
+    def __init__(self, rows=()):
+        self._sorted = []      # (lower name, name)
+        self._folder = {}      # name -> lower folder
+        self._tri    = {}      # trigram -> {names}
+        for name, folder in rows:
+            self.add(name, folder, _bulk=True)
+        self._sorted.sort()
+
+    def __len__(self):
+        return len(self._folder)
+
+    def __contains__(self, name):
+        return name in self._folder
+
+    def _haystacks(self, name):
+        return name.lower(), self._folder[name]
+
+    def add(self, name, folder="", _bulk=False):
+        if name in self._folder:
+            self.remove(name)
+        self._folder[name] = os.path.normcase(folder or "").lower()
+        if _bulk:
+            self._sorted.append((name.lower(), name))
+        else:
+            bisect.insort(self._sorted, (name.lower(), name))
+        for hay in self._haystacks(name):
+            for t in _trigrams(hay):
+                self._tri.setdefault(t, set()).add(name)
+
+    def remove(self, name):
+        if name not in self._folder:
+            return
+        for hay in self._haystacks(name):
+            for t in _trigrams(hay):
+                bucket = self._tri.get(t)
+                if bucket:
+                    bucket.discard(name)
+                    if not bucket:
+                        del self._tri[t]
+        i = bisect.bisect_left(self._sorted, (name.lower(), name))
+        if i < len(self._sorted) and self._sorted[i][1] == name:
+            del self._sorted[i]
+        del self._folder[name]
+
+    def names(self):
+        return [n for _, n in self._sorted]
+
+    def search(self, query):
+        # Prefix matches on the name first (alphabetical), then other substring hits
+        q = query.strip().lower()
+        if not q:
+            return self.names()
+        i = bisect.bisect_left(self._sorted, (q,))
+        prefix = []
+        while i < len(self._sorted) and self._sorted[i][0].startswith(q):
+            prefix.append(self._sorted[i][1])
+            i += 1
+
+        if len(q) >= 3:
+            grams = sorted(_trigrams(q), key=lambda t: len(self._tri.get(t, ())))
+            pool = set(self._tri.get(grams[0], ()))
+            for t in grams[1:]:
+                if not pool:
+                    break
+                pool &= self._tri.get(t, set())
+        else:
+            pool = self._folder.keys()
+        seen = set(prefix)
+        rest = [n for n in pool if n not in seen and any(q in h for h in self._haystacks(n))]
+        rest.sort(key=str.lower)
+        return prefix + rest
+
+
+class ProfilePicker(tk.Frame):
+    def __init__(self, parent, font, colors, width=28, placeholder="(no profiles)"):
+        super().__init__(parent, bg=colors["bg"])
+        self.colors = colors
+        self.font = font
+        self.placeholder = placeholder
+        self.index = ProfileIndex()
+        self.var = tk.StringVar()
+        self._results = []
+        self._shown = 0
+        self._popup = None
+        self._listbox = None
+
+        self.entry = tk.Entry(self, textvariable=self.var, font=font, width=width,
+                              bg=colors["panel"], fg=colors["text"],
+                              insertbackground=colors["accent"], relief="flat",
+                              highlightthickness=1, highlightbackground=colors["border"],
+                              highlightcolor=colors["accent"])
+        self.entry.pack(side="left", ipady=5)
+        tk.Button(self, text="▾", command=self.toggle, font=font,
+                  bg=colors["panel"], fg=colors["text"], activebackground=colors["border"],
+                  activeforeground=colors["accent"], relief="flat", bd=0, cursor="hand2",
+                  highlightthickness=1, highlightbackground=colors["border"]
+                  ).pack(side="left", ipady=3, ipadx=4)
+
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Down>", lambda _: self._move(1))
+        self.entry.bind("<Up>", lambda _: self._move(-1))
+        self.entry.bind("<Return>", lambda _: self._choose())
+        self.entry.bind("<Escape>", lambda _: self.close())
+        self.entry.bind("<FocusOut>", lambda _: self.after(150, self._maybe_close))
+
+    # ── data ────────────────────────────────────────────────────────────────
+
+    def set_profiles(self, rows, selected=""):
+        self.index = ProfileIndex(rows)
+        self.var.set(selected if selected in self.index else
+                     (self.index.names()[0] if len(self.index) else self.placeholder))
+        self._refilter()
+
+    def add(self, name, folder=""):
+        self.index.add(name, folder)
+        self._refilter()
+
+    def remove(self, name):
+        self.index.remove(name)
+        if self.var.get() == name:
+            self.var.set(self.placeholder if not len(self.index) else "")
+        self._refilter()
+
+    # ── dropdown ────────────────────────────────────────────────────────────
+
+    def toggle(self):
+        if self._popup:
+            self.close()
+        else:
+            self.open(filtered=False)
+
+    def open(self, filtered=True):
+        if not self._popup:
+            c = self.colors
+            self._popup = tk.Toplevel(self)
+            self._popup.overrideredirect(True)
+            self._popup.configure(bg=c["border"])
+            self._listbox = tk.Listbox(self._popup, font=self.font, height=12,
+                                       bg=c["panel"], fg=c["text"], relief="flat", bd=0,
+                                       selectbackground=c["accent_dim"],
+                                       selectforeground=c["accent"],
+                                       highlightthickness=0, activestyle="none",
+                                       yscrollcommand=self._on_scroll)
+            self._listbox.pack(fill="both", expand=True, padx=1, pady=1)
+            self._listbox.bind("<ButtonRelease-1>", lambda _: self._choose())
+            self._listbox.bind("<Return>", lambda _: self._choose())
+            self._listbox.bind("<Escape>", lambda _: self.close())
+        self.update_idletasks()
+        x, y = self.winfo_rootx(), self.winfo_rooty() + self.winfo_height()
+        self._popup.geometry(f"{self.winfo_width()}x220+{x}+{y}")
+        self._popup.lift()
+        self._refilter("" if not filtered else None)
+
+    def close(self):
+        if self._popup:
+            self._popup.destroy()
+        self._popup = self._listbox = None
+
+    def _maybe_close(self):
+        focus = self.focus_get()
+        if self._popup and focus not in (self.entry, self._listbox):
+            self.close()
+
+    def _on_key(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        if not self._popup:
+            self.open()
+        else:
+            self._refilter()
+
+    def _refilter(self, query=None):
+        if not self._listbox:
+            return
+        q = self.var.get() if query is None else query
+        if q == self.placeholder:
+            q = ""
+        self._results = self.index.search(q)
+        self._listbox.delete(0, "end")
+        self._shown = 0
+        self._render_page()
+
+    def _render_page(self):
+        # Only materialise rows as they scroll into view
+        chunk = self._results[self._shown:self._shown + PAGE]
+        if chunk:
+            self._listbox.insert("end", *chunk)
+            self._shown += len(chunk)
+
+    def _on_scroll(self, first, last):
+        if float(last) > 0.9 and self._shown < len(self._results):
+            self._listbox.after_idle(self._render_page)
+
+    def _move(self, step):
+        if not self._popup:
+            self.open(filtered=False)
+        lb = self._listbox
+        if not lb or not self._shown:
+            return "break"
+        cur = lb.curselection()
+        i = max(0, min(self._shown - 1, (cur[0] + step) if cur else 0))
+        if i >= self._shown - 1:
+            self._render_page()
+        lb.selection_clear(0, "end")
+        lb.selection_set(i)
+        lb.see(i)
+        return "break"
+
+    def _choose(self):
+        lb = self._listbox
+        if lb:
+            cur = lb.curselection()
+            if cur:
+                self.var.set(lb.get(cur[0]))
+            elif self._results:
+                self.var.set(self._results[0])
+        self.close()
+        self.entry.icursor("end")
+        return "break"
+
+
+class PresetMenu(tk.Menubutton):
+    def __init__(self, parent, font, colors, on_change=None):
+        super().__init__(parent, text="Presets ▾", font=font, relief="flat", bd=0,
+                         bg=colors["panel"], fg=colors["text"], cursor="hand2",
+                         activebackground=colors["border"], activeforeground=colors["accent"],
+                         highlightthickness=1, highlightbackground=colors["border"])
+        self.menu = tk.Menu(self, tearoff=False, font=font, bg=colors["panel"], fg=colors["text"],
+                            activebackground=colors["accent_dim"],
+                            activeforeground=colors["accent"], selectcolor=colors["accent"])
+        self["menu"] = self.menu
+        self.on_change = on_change
+        self.selected = []
+        self._vars = {}
+
+    def set_catalog(self, catalog):
+        self.menu.delete(0, "end")
+        self._vars = {}
+        for name, p in catalog.items():
+            var = self._vars[name] = tk.BooleanVar(value=name in self.selected)
+            self.menu.add_checkbutton(label=f"{name}   {p['args']}", variable=var,
+                                      command=lambda n=name: self._toggle(n))
+
+    def set(self, names):
+        self.selected = list(names)
+        for name, var in self._vars.items():
+            var.set(name in self.selected)
+        self._changed()
+
+    def get(self):
+        return list(self.selected)
+
+    def _toggle(self, name):
+        if self._vars[name].get():
+            self.selected.append(name)
+        elif name in self.selected:
+            self.selected.remove(name)
+        self._changed()
+
+    def _changed(self):
+        self.config(text=f"Presets ({len(self.selected)}) ▾" if self.selected else "Presets ▾")
+        if self.on_change:
+            self.on_change()
@@ -0,0 +1,255 @@
+import os
+import re
+import sys
+import json
+import struct
+import argparse
+import threading
+
+import vr_pe
+
+# VR readiness check run before a patch is applied: which VR runtimes can this
+# build actually load? Only a handful of places are looked at, never the asset
+# files around them:
+#
+#   <game>_Data/Plugins (two levels)   native runtime DLLs and their architecture
+#   <game>_Data/boot.config            vr-enabled / vr-device-list (built-in VR)
+#   <game>_Data/UnitySubsystems        XR plugin providers (2019.3+), names only
+#   <game>_Data/globalgamemanagers     the first bytes of the header: Unity version
+#
+# Facts are cached per _Data folder in vr_preflight_index.json, keyed by the
+# mtimes of everything that was read; an unchanged build costs a few stat()s.
+
+HERE          = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE    = os.path.join(HERE, "vr_preflight_index.json")
+INDEX_VERSION = 1
+HEADER_BYTES  = 128
+PLUGIN_DEPTH  = 2        # Plugins/ and Plugins/<arch>/
+
+RUNTIMES = {
+    "openvr": {"label": "SteamVR (OpenVR)", "dlls": ("openvr_api.dll",),
+               "device": "openvr", "xr": "openvr"},
+    "oculus": {"label": "Oculus", "dlls": ("OVRPlugin.dll",),
+               "device": "oculus", "xr": "oculus"},
+    "openxr": {"label": "OpenXR", "dlls": ("UnityOpenXR.dll", "openxr_loader.dll"),
+               "device": None, "xr": "openxr"},
+}
+VRMODES = {"openvr": "openvr", "steamvr": "openvr", "oculus": "oculus"}
+
+_PLUGIN_NAMES = {dll.lower() for r in RUNTIMES.values() for dll in r["dlls"]}
+_VRMODE = re.compile(r"(?i)(?:^|\s)-vrmode\s+\"?([A-Za-z]+)")
+
+_lock = threading.Lock()
+
+
+def _sig(path):
+    try:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def unity_version(path):
+    # Version string from a SerializedFile header (format 9..21 and 22+)
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEADER_BYTES)
+    except OSError:
+        return None
+    if len(head) < 24:
+        return None
+    fmt = struct.unpack_from(">I", head, 8)[0]
+    if fmt >= 22:
+        start = 48
+    elif fmt >= 9:
+        start = 20
+    else:
+        return None
+    end = head.find(b"\0", start)
+    text = head[start:end if end > 0 else len(head)].decode("ascii", "replace")
+    return text if re.match(r"\d{4}\.\d+\.\d+", text) else None
+
+
+def read_boot_config(path):
+    out = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep and key.strip().startswith(("vr-", "xr-")):
+                    out[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return out
+
+
+def _walk_plugins(root, base, depth, found, dirs):
+    # Only file names are looked at; subfolders of Plugins are mostly per-arch
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    dirs.append(root)
+    for e in entries:
+        low = e.name.lower()
+        try:
+            if e.is_dir():
+                if depth > 1 and not low.endswith((".bundle", ".framework")):
+                    _walk_plugins(e.path, base, depth - 1, found, dirs)
+            elif low in _PLUGIN_NAMES:
+                info = vr_pe.read_pe_info(e.path)
+                found.setdefault(low, []).append({"rel": os.path.relpath(e.path, base).replace(os.sep, "/"),
+                                                  "arch": info["arch"] if info else None})
+        except OSError:
+            continue
+
+
+def _scan(game_exe, data_dir):
+    plugins, dirs = {}, []
+    _walk_plugins(os.path.join(data_dir, "Plugins"), data_dir, PLUGIN_DEPTH, plugins, dirs)
+    subsystems = os.path.join(data_dir, "UnitySubsystems")
+    try:
+        xr = sorted(e.name for e in os.scandir(subsystems) if e.is_dir())
+        dirs.append(subsystems)
+    except OSError:
+        xr = []
+    boot = read_boot_config(os.path.join(data_dir, "boot.config"))
+    info = vr_pe.read_pe_info(game_exe)
+    return {"unity": unity_version(os.path.join(data_dir, "globalgamemanagers")),
+            "arch": info["arch"] if info else None,
+            "boot": boot,
+            "devices": [d.strip().lower() for d in boot.get("vr-device-list", "").split(",") if d.strip()],
+            "xr": xr,
+            "plugins": plugins}, dirs
+
+
+def _signature(game_exe, data_dir, dirs):
+    paths = [game_exe, os.path.join(data_dir, "Plugins"), os.path.join(data_dir, "UnitySubsystems"),
+             os.path.join(data_dir, "boot.config"), os.path.join(data_dir, "globalgamemanagers")]
+    return {p: _sig(p) for p in dict.fromkeys(paths + dirs)}
+
+
+def load_index(path=INDEX_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "builds": {}}
+
+
+def save_index(idx, path=INDEX_FILE):
+    tmp = path + f".{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(idx, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def scan(game_exe, data_dir, index_path=None):
+    # Facts about one build; re-read only when something it depends on changed
+    index_path = index_path or INDEX_FILE
+    key = os.path.normcase(os.path.abspath(data_dir))
+    with _lock:
+        idx = load_index(index_path)
+        hit = idx["builds"].get(key)
+        if hit and all(_sig(p) == s for p, s in hit["sig"].items()) and game_exe in hit["sig"]:
+            return dict(hit["facts"], cached=True)
+    facts, dirs = _scan(game_exe, data_dir)
+    with _lock:
+        idx = load_index(index_path)
+        idx["builds"][key] = {"sig": _signature(game_exe, data_dir, dirs), "facts": facts}
+        save_index(idx, index_path)
+    return dict(facts, cached=False)
+
+
+def requested_runtime(args):
+    # The runtime named by the last -vrmode in args, or None
+    modes = _VRMODE.findall(args or "")
+    return VRMODES.get(modes[-1].lower(), modes[-1].lower()) if modes else None
+
+
+def assess(facts):
+    # {runtime: (state, detail)}; state is "ready", "missing", "wrong arch",
+    # "not enabled" or absent when the build shows no sign of the runtime
+    out = {}
+    builtin = facts["boot"].get("vr-enabled") == "1" or bool(facts["devices"])
+    for name, rt in RUNTIMES.items():
+        dlls = [p for dll in rt["dlls"] for p in facts["plugins"].get(dll.lower(), ())]
+        listed = rt["device"] in facts["devices"]
+        xr = any(rt["xr"] in d.lower() for d in facts["xr"])
+        if not dlls and not listed and not xr:
+            continue
+        rel = [p["rel"] for p in dlls]
+        if not dlls:
+            out[name] = ("missing", f"{rt['dlls'][0]} not in Plugins")
+        elif facts["arch"] and not any(p["arch"] == facts["arch"] for p in dlls):
+            out[name] = ("wrong arch", f"{', '.join(rel)} is {dlls[0]['arch']}, the game is {facts['arch']}")
+        elif builtin and rt["device"] and not listed and not xr:
+            out[name] = ("not enabled", f"not in vr-device-list ({', '.join(facts['devices']) or 'empty'})")
+        else:
+            out[name] = ("ready", ", ".join(rel))
+    return out
+
+
+def check(folder, exe, args=None, log=None, data_dir=None):
+    # Logs the findings; returns False only when the -vrmode in args can't load
+    log = log or (lambda msg, tag="info": None)
+    data_dir = data_dir or os.path.join(folder, os.path.splitext(exe)[0] + "_Data")
+    if not os.path.isdir(data_dir):
+        log(f"VR preflight skipped: {os.path.basename(data_dir)} not found", "dim"); return True
+    facts = scan(os.path.join(folder, exe), data_dir)
+    runtimes = assess(facts)
+    want = requested_runtime(args)
+    unity = f"Unity {facts['unity']}" if facts["unity"] else "Unity version unknown"
+    summary = ", ".join(f"{RUNTIMES[n]['label']} {state}" for n, (state, _) in runtimes.items())
+    log(f"VR preflight: {unity}, {facts['arch'] or '?'} — {summary or 'no VR runtime found'}", "dim")
+    for name, (state, detail) in runtimes.items():
+        if state != "ready" and name != want:
+            log(f"  {RUNTIMES[name]['label']}: {state} ({detail})", "dim")
+    if want and want in RUNTIMES and runtimes.get(want, ("missing",))[0] != "ready":
+        state, detail = runtimes.get(want, ("missing", f"{RUNTIMES[want]['dlls'][0]} not in Plugins"))
+        log(f"-vrmode {want} will likely fail: {RUNTIMES[want]['label']} is {state} ({detail})", "warn")
+        return False
+    return True
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Report which VR runtimes a Unity build can load")
+    ap.add_argument("folder")
+    ap.add_argument("exe", nargs="?", help="game EXE (default: detected)")
+    ap.add_argument("--args", default="", help="launch arguments; their -vrmode decides the exit code")
+    ap.add_argument("--data", help="_Data folder (default: <exe>_Data)")
+    ap.add_argument("--json", action="store_true", help="print the raw facts")
+    opts = ap.parse_args(argv)
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(errors="replace")
+
+    exe = opts.exe
+    if not exe:
+        try:
+            ranked = vr_pe.rank_game_exes(opts.folder)
+        except OSError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        if not ranked:
+            print("error: no game EXE found", file=sys.stderr)
+            return 2
+        exe = ranked[0]["name"]
+    if opts.json:
+        data = opts.data or os.path.join(opts.folder, os.path.splitext(exe)[0] + "_Data")
+        facts = scan(os.path.join(opts.folder, exe), data)
+        print(json.dumps(dict(facts, runtimes=assess(facts)), indent=2))
+        return 0
+    ok = check(opts.folder, exe, opts.args, lambda msg, tag="info": print(msg), opts.data)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import os
+import re
+import sys
+import json
+import shlex
+import argparse
+
+# Named Unity player flag sets that stack onto a profile's free-text args.
+# Profiles store preset names, so editing a preset changes every profile that
+# uses it on its next apply. Users add or override presets in vr_presets.json:
+#
+#   {"presets":   {"jobs-6": {"args": "-job-worker-count 6", "description": "..."}},
+#    "conflicts": [["-my-flag-a", "-my-flag-b"]]}
+#
+# Composition walks presets in order, then the free-text args, and keeps the
+# last occurrence of each flag; flags in the same conflict group replace each other.
+
+HERE      = os.path.dirname(os.path.abspath(__file__))
+USER_FILE = os.path.join(HERE, "vr_presets.json")
+
+BUILTIN = {
+    "openvr":          {"args": "-vrmode openvr",
+                        "description": "Start the player in SteamVR / OpenVR mode"},
+    "oculus":          {"args": "-vrmode oculus",
+                        "description": "Start the player with the Oculus runtime"},
+    "d3d11":           {"args": "-force-d3d11",
+                        "description": "Direct3D 11 renderer; the most compatible choice for VR"},
+    "d3d12":           {"args": "-force-d3d12",
+                        "description": "Direct3D 12 renderer"},
+    "vulkan":          {"args": "-force-vulkan",
+                        "description": "Vulkan renderer"},
+    "gfx-jobs-native": {"args": "-force-gfx-jobs native",
+                        "description": "Native graphics jobs; spreads render submission over worker threads"},
+    "jobs-4":          {"args": "-job-worker-count 4",
+                        "description": "Cap the job system at 4 worker threads (leaves cores for SteamVR)"},
+    "fullscreen":      {"args": "-screen-fullscreen 1",
+                        "description": "Exclusive fullscreen desktop mirror"},
+    "windowed":        {"args": "-screen-fullscreen 0",
+                        "description": "Windowed desktop mirror; cheaper to composite alongside the headset"},
+    "small-mirror":    {"args": "-screen-fullscreen 0 -screen-width 1280 -screen-height 720",
+                        "description": "Small windowed mirror at 1280x720"},
+    "no-gpu-skinning": {"args": "-disable-gpu-skinning",
+                        "description": "Skin meshes on the CPU; helps when the GPU is the bottleneck"},
+    "nolog":           {"args": "-nolog",
+                        "description": "Don't write Player.log (less disk I/O during play)"},
+}
+
+CONFLICTS = [
+    {"-force-d3d11", "-force-d3d12", "-force-vulkan", "-force-glcore",
+     "-force-d3d11-singlethreaded", "-force-metal"},
+    {"-popupwindow", "-window-mode"},
+]
+
+_FLAG = re.compile(r"-[A-Za-z]")
+
+_cache = {"path": None, "mtime": None, "catalog": None, "conflicts": None}
+
+
+def _load_user(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    presets = {}
+    for name, p in (data.get("presets") or {}).items():
+        if isinstance(p, str):
+            p = {"args": p}
+        if not isinstance(p, dict) or not isinstance(p.get("args"), str):
+            raise ValueError(f"{os.path.basename(path)}: preset '{name}' needs an 'args' string")
+        presets[name] = {"args": p["args"], "description": p.get("description", ""), "user": True}
+    groups = [{f.lower() for f in g} for g in data.get("conflicts") or []]
+    return presets, groups
+
+
+def load_catalog(path=USER_FILE):
+    # Returns (catalog, conflict groups); the user file is re-read only when it changes
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    if _cache["catalog"] is None or (_cache["path"], _cache["mtime"]) != (path, mtime):
+        catalog = {k: dict(v) for k, v in BUILTIN.items()}
+        conflicts = list(CONFLICTS)
+        if mtime is not None:
+            user, groups = _load_user(path)
+            catalog.update(user)
+            conflicts += groups
+        _cache.update(mtime=mtime, catalog=catalog, conflicts=conflicts, path=path)
+    return _cache["catalog"], _cache["conflicts"]
+
+
+def split_flags(text):
+    # "-a 1 -b -c x y" → [("-a", ["-a", "1"]), ("-b", ["-b"]), ("-c", ["-c", "x", "y"])]
+    try:
+        tokens = shlex.split(text or "", posix=False)
+    except ValueError as e:
+        raise ValueError(f"can't parse arguments {text!r}: {e}")
+    out = []
+    for tok in tokens:
+        if _FLAG.match(tok) or not out:
+            out.append((tok.lower() if _FLAG.match(tok) else None, [tok]))
+        else:
+            out[-1][1].append(tok)
+    return out
+
+
+def compose(names, extra="", path=USER_FILE):
+    # Returns (command line, notes); raises ValueError for unknown presets or bad quoting
+    catalog, conflicts = load_catalog(path)
+    group_of = {flag: i for i, group in enumerate(conflicts) for flag in group}
+    unknown = [n for n in names if n not in catalog]
+    if unknown:
+        raise ValueError(f"unknown preset(s): {', '.join(unknown)}")
+
+    kept, notes = [], []     # kept: [(flag, tokens, source)]
+    for source, text in [(n, catalog[n]["args"]) for n in names] + [("args", extra)]:
+        for flag, tokens in split_flags(text):
+            if flag is not None:
+                for i, (k, t, s) in enumerate(kept):
+                    if k == flag or (k in group_of and group_of[k] == group_of.get(flag)):
+                        if t != tokens:
+                            notes.append(f"{' '.join(t)} ({s}) replaced by {' '.join(tokens)} ({source})")
+                        del kept[i]
+                        break
+            kept.append((flag, tokens, source))
+    return " ".join(" ".join(t) for _, t, _ in kept), notes
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="List Unity argument presets or compose a command line")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="show every preset")
+    c = sub.add_parser("compose", help="stack presets and print the final arguments")
+    c.add_argument("presets", nargs="*")
+    c.add_argument("--args", default="", help="free-text arguments applied last")
+    opts = ap.parse_args(argv)
+
+    try:
+        catalog, _ = load_catalog()
+        if opts.cmd == "list":
+            for name, p in catalog.items():
+                tag = " (user)" if p.get("user") else ""
+                print(f"{name:<16} {p['args']:<44} {p['description']}{tag}")
+            return 0
+        line, notes = compose(opts.presets, opts.args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    for n in notes:
+        print(f"# {n}", file=sys.stderr)
+    print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
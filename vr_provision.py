@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import Counter
+
+import vr_backup
+import vr_fingerprint
+import vr_preflight
+
+# Supplies a VR runtime DLL a build is missing (the classic
+# "DllNotFoundException: OVRPlugin" in Below Zero) from another install that
+# has it: every profiled game and every game in the last Steam scan is a
+# candidate source. Only copies built for the target's architecture count, and
+# when installs disagree the most common hash wins. The file is reflinked where
+# possible and copied otherwise, never hardlinked: both games keep using it, and
+# an update of one must not rewrite the other's copy. Each placed file is recorded
+# in vr_provisioned.json so undo/remove deletes exactly what was added, and
+# only while it is still the file we put there.
+
+INDEX_FILE    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vr_provisioned.json")
+INDEX_VERSION = 1
+
+_lock = threading.Lock()
+
+
+def load_index(path=None):
+    try:
+        with open(path or INDEX_FILE, "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "installs": {}}
+
+
+def save_index(idx, path=None):
+    path = path or INDEX_FILE
+    tmp = path + f".{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(idx, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def known_installs():
+    # (folder, exe) of every profiled and Steam-scanned game. Imported here
+    # because vr_store and vr_steam both import vr_patch, which imports us.
+    import vr_store
+    import vr_steam
+    seen = {}
+    for tool in ("launcher", "wrapper"):
+        try:
+            store = vr_store.open_store(tool)
+        except Exception:
+            continue
+        try:
+            for _, p in store.items():
+                if p.get("folder") and p.get("exe"):
+                    seen.setdefault(os.path.normcase(os.path.abspath(p["folder"])), (p["folder"], p["exe"]))
+        finally:
+            store.close()
+    for lib in vr_steam.load_index(vr_steam.INDEX_FILE)["libraries"].values():
+        for m in lib.get("manifests", {}).values():
+            g = m.get("game")
+            if g:
+                seen.setdefault(os.path.normcase(os.path.abspath(g["folder"])), (g["folder"], g["exe"]))
+    return list(seen.values())
+
+
+def _builds(folder, exe):
+    # The live (game EXE, _Data) pairs of an install, wrapped or not
+    base = os.path.splitext(exe)[0]
+    for game, data in ((f"{base}Real.exe", f"{base}Real_Data"), (exe, f"{base}_Data")):
+        if os.path.isdir(os.path.join(folder, data)):
+            yield os.path.join(folder, game), os.path.join(folder, data)
+
+
+def candidates(dll, arch, exclude=None, installs=None):
+    # [{path, rel, sha, folder}] of dll (lower-case name) built for arch, elsewhere than exclude
+    skip = os.path.normcase(os.path.abspath(exclude)) if exclude else None
+    found = []
+    for folder, exe in (known_installs() if installs is None else installs):
+        if os.path.normcase(os.path.abspath(folder)) == skip:
+            continue
+        for game_exe, data_dir in _builds(folder, exe):
+            try:
+                facts = vr_preflight.scan(game_exe, data_dir)
+            except OSError:
+                continue
+            for p in facts["plugins"].get(dll, ()):
+                if p["arch"] == arch:
+                    found.append({"path": os.path.join(data_dir, p["rel"]), "rel": p["rel"],
+                                  "folder": folder})
+    shas = vr_fingerprint.default_cache().sha_many([c["path"] for c in found])
+    return [dict(c, sha=shas[c["path"]]) for c in found if shas[c["path"]]]
+
+
+def _pick(found):
+    # The copy most installs agree on; the newest file breaks a tie
+    votes = Counter(c["sha"] for c in found)
+    def rank(c):
+        try:
+            mtime = os.stat(c["path"]).st_mtime
+        except OSError:
+            mtime = 0
+        return (votes[c["sha"]], mtime)
+    return max(found, key=rank), len(votes)
+
+
+def provision(folder, exe, data_dir, runtime, arch, log, installs=None):
+    # Places the runtime's DLL into data_dir/Plugins; returns True if it did
+    rt = vr_preflight.RUNTIMES.get(runtime)
+    if not rt or len(rt["dlls"]) != 1 or not arch:
+        return False
+    dll = rt["dlls"][0]
+    found = candidates(dll.lower(), arch, folder, installs)
+    if not found:
+        log(f"No other install has an {arch} {dll} to borrow — copy it in by hand "
+            f"(see Troubleshooting)", "warn")
+        return False
+    src, variants = _pick(found)
+    plugins = os.path.join(data_dir, "Plugins")
+    sub = os.path.dirname(src["rel"])          # e.g. Plugins/x86_64
+    target_dir = os.path.join(data_dir, sub) if os.path.isdir(os.path.join(data_dir, sub)) else plugins
+    dst = os.path.join(target_dir, os.path.basename(src["path"]))
+    if os.path.exists(dst):
+        return False
+    os.makedirs(target_dir, exist_ok=True)
+    method = vr_backup.place(src["path"], dst, allow_link=False)
+    if vr_fingerprint.default_cache().sha(dst) != src["sha"]:
+        os.remove(dst)
+        log(f"{os.path.basename(dst)} changed while it was copied; removed", "err"); return False
+    rel = os.path.relpath(dst, data_dir).replace(os.sep, "/")
+    with _lock:
+        idx = load_index()
+        recs = idx["installs"].setdefault(vr_fingerprint.install_key(folder, exe), [])
+        recs[:] = [r for r in recs if r["rel"].lower() != rel.lower()]
+        recs.append({"rel": rel, "sha": src["sha"], "source": src["path"], "method": method,
+                     "when": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        save_index(idx)
+    note = f", {variants} different builds seen" if variants > 1 else ""
+    log(f"Provisioned {os.path.relpath(dst, folder)} from {os.path.basename(src['folder'])} "
+        f"({method}, {src['sha'][:12]}{note})", "ok")
+    return True
+
+
+def remove(folder, exe, data_dirs, log):
+    # Deletes the files provisioned for an install that are still unchanged; returns how many
+    key = vr_fingerprint.install_key(folder, exe)
+    with _lock:
+        idx = load_index()
+        recs = idx["installs"].pop(key, None)
+        if recs is None:
+            return 0
+        removed = 0
+        for r in recs:
+            for data_dir in data_dirs:
+                path = os.path.join(data_dir, r["rel"])
+                if not os.path.exists(path):
+                    continue
+                if vr_fingerprint.default_cache().sha(path) != r["sha"]:
+                    log(f"Kept {r['rel']}: changed since it was provisioned", "warn")
+                    break
+                os.remove(path)
+                removed += 1
+                log(f"Removed provisioned {r['rel']}", "ok")
+                break
+        save_index(idx)
+    return removed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Borrow a missing VR runtime DLL from another installed game")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="show every provisioned file")
+    for name, help_ in (("add", "provision the runtime's DLL into a game"),
+                        ("remove", "delete what was provisioned into a game")):
+        p = sub.add_parser(name, help=help_)
+        p.add_argument("folder")
+        p.add_argument("exe")
+        if name == "add":
+            p.add_argument("--runtime", default="oculus",
+                           choices=[n for n, r in vr_preflight.RUNTIMES.items() if len(r["dlls"]) == 1])
+    opts = ap.parse_args(argv)
+    log = lambda msg, tag="info": print(msg, file=sys.stderr if tag == "err" else sys.stdout)
+
+    if opts.cmd == "list":
+        rows = [(key, r) for key, recs in load_index()["installs"].items() for r in recs]
+        for key, r in rows:
+            print(f"{r['sha'][:12]}  {r['method']:<8}  {key.split('|')[0]}  {r['rel']}  ← {r['source']}")
+        if not rows:
+            print("Nothing provisioned.")
+        return 0
+    builds = list(_builds(opts.folder, opts.exe))
+    if opts.cmd == "remove":
+        removed = remove(opts.folder, opts.exe, [d for _, d in builds], log)
+        print(f"{removed} file(s) removed")
+        return 0
+    if not builds:
+        print(f"error: no _Data folder for {opts.exe} in {opts.folder}", file=sys.stderr)
+        return 2
+    game_exe, data_dir = builds[0]
+    facts = vr_preflight.scan(game_exe, data_dir)
+    state = vr_preflight.assess(facts).get(opts.runtime, ("missing",))[0]
+    if state != "missing":
+        print(f"{vr_preflight.RUNTIMES[opts.runtime]['label']} is {state}; nothing to provision")
+        return 0
+    return 0 if provision(opts.folder, opts.exe, data_dir, opts.runtime, facts["arch"], log) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
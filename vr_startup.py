@@ -0,0 +1,37 @@
+import sys
+import time
+
+# Start-up phase timer for the Tk apps. Each app marks the end of a phase as it
+# goes; with --startup-timing the breakdown is printed and logged once the
+# profiles have loaded. Times are from the first line of the script, so the
+# interpreter's own start-up is not included (see python -X importtime).
+
+FLAG = "--startup-timing"
+
+
+class StartupTimer:
+    def __init__(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.perf_counter()
+        self.marks = []
+
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter()))
+
+    def phases(self):
+        # [(phase, ms)] in order, each measured from the previous mark
+        out, prev = [], self.t0
+        for phase, t in self.marks:
+            out.append((phase, (t - prev) * 1000))
+            prev = t
+        return out
+
+    def total_ms(self):
+        return ((self.marks[-1][1] if self.marks else self.t0) - self.t0) * 1000
+
+    def report(self):
+        parts = " · ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.phases())
+        return f"Start-up: {parts} · total {self.total_ms():.0f} ms"
+
+
+def requested(argv=None):
+    return FLAG in (sys.argv[1:] if argv is None else argv)
@@ -0,0 +1,291 @@
+import os
+import sys
+import json
+import argparse
+
+import vr_patch as patch
+import vr_store
+
+# Steam library discovery: libraryfolders.vdf → appmanifest_*.acf → Unity games.
+# Results live in an on-disk index keyed by library path; a library whose
+# steamapps directory mtime is unchanged is served straight from the index,
+# and inside a changed library only manifests with a new mtime are re-read.
+
+INDEX_FILE = os.path.join(patch.HERE, "vr_steam_index.json")
+INDEX_VERSION = 1
+
+STEAM_DEFAULTS = [
+    r"C:\Program Files (x86)\Steam",
+    r"C:\Program Files\Steam",
+    os.path.expanduser("~/.steam/steam"),
+    os.path.expanduser("~/.local/share/Steam"),
+    os.path.expanduser("~/Library/Application Support/Steam"),
+]
+
+
+# ── Text VDF (KeyValues) ────────────────────────────────────────────────────
+
+_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+
+def _tokens(text):
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c in " \t\r\n":
+            i += 1
+        elif c == "/" and text.startswith("//", i):
+            j = text.find("\n", i)
+            i = n if j < 0 else j + 1
+        elif c in "{}":
+            yield c
+            i += 1
+        elif c == '"':
+            out, i = [], i + 1
+            while i < n and text[i] != '"':
+                if text[i] == "\\" and i + 1 < n:
+                    out.append(_ESCAPES.get(text[i + 1], "\\" + text[i + 1]))
+                    i += 2
+                else:
+                    out.append(text[i])
+                    i += 1
+            yield "s", "".join(out)
+            i += 1
+        elif c == "[":
+            # platform conditional such as [$WIN32] — ignored
+            j = text.find("]", i)
+            i = n if j < 0 else j + 1
+        else:
+            j = i
+            while j < n and text[j] not in ' \t\r\n{}"':
+                j += 1
+            yield "s", text[i:j]
+            i = j
+
+
+def parse_vdf(text):
+    root = {}
+    stack = [root]
+    key = None
+    for tok in _tokens(text):
+        if tok == "{":
+            child = {}
+            if key is not None:
+                stack[-1][key] = child
+            stack.append(child)
+            key = None
+        elif tok == "}":
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+        elif key is None:
+            key = tok[1]
+        else:
+            stack[-1][key] = tok[1]
+            key = None
+    return root
+
+
+def vdf_get(d, key, default=None):
+    if key in d:
+        return d[key]
+    lk = key.lower()
+    for k, v in d.items():
+        if k.lower() == lk:
+            return v
+    return default
+
+
+def _read_vdf(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return parse_vdf(f.read())
+
+
+# ── Discovery ───────────────────────────────────────────────────────────────
+
+def find_steam_root():
+    if sys.platform == "win32":
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam") as k:
+                path = winreg.QueryValueEx(k, "SteamPath")[0]
+                if os.path.isdir(path):
+                    return os.path.normpath(path)
+        except OSError:
+            pass
+    return next((p for p in STEAM_DEFAULTS if os.path.isdir(os.path.join(p, "steamapps"))), None)
+
+
+def library_paths(steam_root):
+    libs = [os.path.normpath(steam_root)]
+    vdf = os.path.join(steam_root, "steamapps", "libraryfolders.vdf")
+    try:
+        data = _read_vdf(vdf)
+    except OSError:
+        return libs
+    folders = vdf_get(data, "libraryfolders", {})
+    for key, val in folders.items():
+        if isinstance(val, dict):
+            path = vdf_get(val, "path")       # current format
+        elif key.isdigit():
+            path = val                        # pre-2021 format
+        else:
+            continue
+        if path:
+            path = os.path.normpath(path)
+            if path not in libs:
+                libs.append(path)
+    return libs
+
+
+def _find_unity_exe(game_dir):
+    # Single top-level listing; a Unity player is <name>.exe + <name>_Data + UnityPlayer.dll.
+    # A wrapped install only has <base>Real.exe + <base>Real_Data; its game EXE is <base>.exe.
+    try:
+        with os.scandir(game_dir) as it:
+            names = {e.name.lower(): (e.name, e.is_dir()) for e in it}
+    except OSError:
+        return None
+    if "unityplayer.dll" not in names:
+        return None
+    wrapped = None
+    for low, (name, is_dir) in sorted(names.items()):
+        if not (is_dir and low.endswith("_data")):
+            continue
+        exe = names.get(low[:-5] + ".exe")
+        if not exe or exe[1]:
+            continue
+        base = names.get(low[:-9] + ".exe") if low.endswith("real_data") else None
+        if base and not base[1]:
+            wrapped = wrapped or base[0]
+        else:
+            return exe[0]
+    return wrapped
+
+
+def _scan_manifest(steamapps, acf_name):
+    data = vdf_get(_read_vdf(os.path.join(steamapps, acf_name)), "AppState", {})
+    installdir = vdf_get(data, "installdir", "")
+    if not installdir:
+        return None
+    game_dir = os.path.join(steamapps, "common", installdir)
+    exe = _find_unity_exe(game_dir)
+    if not exe:
+        return None
+    return {"appid": vdf_get(data, "appid", ""), "name": vdf_get(data, "name", installdir),
+            "folder": game_dir, "exe": exe}
+
+
+def load_index(path=INDEX_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "libraries": {}}
+
+
+def save_index(idx, path=INDEX_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(idx, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _scan_library(lib, cached, stats):
+    steamapps = os.path.join(lib, "steamapps")
+    try:
+        mtime = os.stat(steamapps).st_mtime_ns
+    except OSError:
+        return None
+    if cached and cached.get("mtime") == mtime:
+        stats["cached"] += 1
+        return cached
+
+    stats["scanned"] += 1
+    old = (cached or {}).get("manifests", {})
+    manifests = {}
+    with os.scandir(steamapps) as it:
+        for e in it:
+            if not (e.name.startswith("appmanifest_") and e.name.endswith(".acf")):
+                continue
+            m = e.stat().st_mtime_ns
+            prev = old.get(e.name)
+            if prev and prev["mtime"] == m:
+                manifests[e.name] = prev
+                continue
+            stats["manifests"] += 1
+            try:
+                game = _scan_manifest(steamapps, e.name)
+            except OSError:
+                game = None
+            manifests[e.name] = {"mtime": m, "game": game}
+    return {"mtime": mtime, "manifests": manifests}
+
+
+def scan(steam_root=None, index_path=INDEX_FILE, force=False, log=None):
+    steam_root = steam_root or find_steam_root()
+    if not steam_root:
+        if log: log("Steam installation not found.", "err")
+        return []
+    idx = load_index(index_path)
+    stats = {"cached": 0, "scanned": 0, "manifests": 0}
+    libs = {}
+    for lib in library_paths(steam_root):
+        entry = _scan_library(lib, None if force else idx["libraries"].get(lib), stats)
+        if entry is not None:
+            libs[lib] = entry
+    idx["libraries"] = libs
+    try:
+        save_index(idx, index_path)
+    except OSError as e:
+        if log: log(f"Could not write scan index: {e}", "warn")
+
+    games = [m["game"] for lib in libs.values() for m in lib["manifests"].values() if m["game"]]
+    games.sort(key=lambda g: g["name"].lower())
+    if log:
+        log(f"Steam scan: {len(libs)} librar{'y' if len(libs) == 1 else 'ies'} "
+            f"({stats['cached']} unchanged, {stats['scanned']} rescanned, "
+            f"{stats['manifests']} manifest(s) read) → {len(games)} Unity game(s)", "ok")
+    return games
+
+
+def add_profiles(store, games, tool, args=patch.DEFAULT_ARGS):
+    # Returns the names added; existing names and already-profiled folders are left alone
+    new = {}
+    for g in games:
+        if g["name"] in store or g["name"] in new or store.by_folder(g["folder"]):
+            continue
+        new[g["name"]] = patch.new_profile(tool, g["folder"], g["exe"], args)
+    if new:
+        store.put_many(new)
+    return list(new)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Discover installed Unity games in Steam libraries")
+    ap.add_argument("--steam", help="Steam install directory (default: auto-detect)")
+    ap.add_argument("--force", action="store_true", help="ignore the index and rescan everything")
+    ap.add_argument("--add-profiles", choices=("launcher", "wrapper"),
+                    help="create a profile for every discovered game in that tool's profile file")
+    ap.add_argument("--args", default=patch.DEFAULT_ARGS, help="launch arguments for new profiles")
+    opts = ap.parse_args(argv)
+
+    def log(msg, tag="info"):
+        print(msg, file=sys.stderr if tag == "err" else sys.stdout)
+
+    games = scan(opts.steam, force=opts.force, log=log)
+    for g in games:
+        print(f"{g['appid']:>8}  {g['name']:<40} {g['exe']:<28} {g['folder']}")
+    if opts.add_profiles:
+        store = vr_store.open_store(opts.add_profiles)
+        added = add_profiles(store, games, opts.add_profiles, opts.args)
+        print(f"{len(added)} profile(s) added to {os.path.basename(store.path)}")
+        store.close()
+    return 0 if games else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
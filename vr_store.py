@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+import vr_patch as patch
+import vr_trace
+
+# SQLite profile store (WAL). Each save/delete touches one row; settings such as
+# last_profile live in their own table, and whether each patch is meant to be in
+# place (for vr_watch) in another. The old JSON profile file is imported
+# once on first open and can be regenerated with export_json().
+
+LAUNCHER_DB = os.path.join(patch.HERE, "vr_launcher_profiles.db")
+WRAPPER_DB  = os.path.join(patch.HERE, "vr_wrapper_profiles.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name    TEXT PRIMARY KEY,
+    folder  TEXT NOT NULL,
+    data    TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_folder ON profiles(folder);
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS patches (
+    folder  TEXT NOT NULL,
+    item    TEXT NOT NULL,
+    patched INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (folder, item)
+);
+"""
+
+
+def _norm_folder(folder):
+    return os.path.normcase(os.path.normpath(folder)) if folder else ""
+
+
+class ProfileStore:
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self.migrated = 0
+        self.migration_error = None
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        if legacy_json and self.get_setting("migrated_from") is None:
+            self._migrate(legacy_json)
+
+    def _migrate(self, json_path):
+        if not os.path.exists(json_path):
+            self.set_setting("migrated_from", "")
+            return
+        try:
+            cfg = read_json(json_path)
+        except (OSError, ValueError) as e:
+            # Leave the flag unset so a repaired file is picked up next start
+            self.migration_error = f"Could not import {os.path.basename(json_path)}: {e}"
+            return
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            for name, p in cfg.get("profiles", {}).items():
+                self._put(name, p)
+            for key, value in cfg.items():
+                if key != "profiles":
+                    self._set(key, value)
+            self._set("migrated_from", json_path)
+        self.migrated = len(cfg.get("profiles", {}))
+
+    # ── profiles ────────────────────────────────────────────────────────────
+
+    def names(self):
+        with self._lock:
+            rows = self._db.execute("SELECT name FROM profiles ORDER BY name COLLATE NOCASE")
+            return [r[0] for r in rows]
+
+    def items(self):
+        with self._lock:
+            rows = self._db.execute("SELECT name, data FROM profiles ORDER BY name COLLATE NOCASE")
+            return [(name, json.loads(data)) for name, data in rows]
+
+    def index_rows(self):
+        # (name, folder) pairs for the picker's search index, no JSON decoding
+        with self._lock:
+            return self._db.execute("SELECT name, folder FROM profiles").fetchall()
+
+    def get(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT data FROM profiles WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __contains__(self, name):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM profiles WHERE name = ?",
+                                    (name,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def by_folder(self, folder):
+        with self._lock:
+            rows = self._db.execute("SELECT name FROM profiles WHERE folder = ?",
+                                    (_norm_folder(folder),))
+            return [r[0] for r in rows]
+
+    def _put(self, name, profile):
+        self._db.execute(
+            "INSERT INTO profiles (name, folder, data, updated) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET folder = excluded.folder, "
+            "data = excluded.data, updated = excluded.updated",
+            (name, _norm_folder(profile.get("folder", "")),
+             json.dumps(profile, ensure_ascii=False), time.time()))
+
+    @vr_trace.traced("save_profile")
+    def put(self, name, profile):
+        # Returns False when the stored row is already identical (nothing written)
+        with self._lock:
+            if self.get(name) == profile:
+                return False
+            self._put(name, profile)
+            return True
+
+    def put_many(self, profiles):
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            for name, p in profiles.items():
+                self._put(name, p)
+
+    def delete(self, name):
+        with self._lock:
+            cur = self._db.execute("DELETE FROM profiles WHERE name = ?", (name,))
+            return cur.rowcount > 0
+
+    # ── settings ────────────────────────────────────────────────────────────
+
+    def _set(self, key, value):
+        self._db.execute("INSERT INTO settings (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                         (key, json.dumps(value, ensure_ascii=False)))
+
+    def get_setting(self, key, default=None):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_setting(self, key, value):
+        with self._lock:
+            if self.get_setting(key) != value:
+                self._set(key, value)
+
+    # ── patch state ─────────────────────────────────────────────────────────
+
+    def set_patched(self, folder, item, patched):
+        # item: launcher name or game EXE; whether its patch is meant to be in place
+        with self._lock:
+            self._db.execute("INSERT INTO patches (folder, item, patched, updated) VALUES (?, ?, ?, ?) "
+                             "ON CONFLICT(folder, item) DO UPDATE SET patched = excluded.patched, "
+                             "updated = excluded.updated",
+                             (_norm_folder(folder), os.path.normcase(item), int(patched), time.time()))
+
+    def is_patched(self, folder, item):
+        # True/False as last set, None if never recorded
+        with self._lock:
+            row = self._db.execute("SELECT patched FROM patches WHERE folder = ? AND item = ?",
+                                   (_norm_folder(folder), os.path.normcase(item))).fetchone()
+        return bool(row[0]) if row else None
+
+    # ── compatibility ───────────────────────────────────────────────────────
+
+    def as_config(self):
+        # Same shape as the legacy JSON profile file
+        cfg = {"profiles": dict(self.items())}
+        with self._lock:
+            for key, value in self._db.execute("SELECT key, value FROM settings ORDER BY key"):
+                if key != "migrated_from":
+                    cfg[key] = json.loads(value)
+        cfg.setdefault("last_profile", "")
+        return cfg
+
+    def export_json(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.as_config(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def read_json(path):
+    # A legacy/exported profile file; read and format errors are raised, never swallowed
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    if not isinstance(cfg, dict) or not isinstance(cfg.get("profiles", {}), dict):
+        raise ValueError('not a profile file (expected {"profiles": {...}})')
+    return cfg
+
+
+def open_store(tool):
+    if tool == "launcher":
+        return ProfileStore(LAUNCHER_DB, patch.LAUNCHER_CONFIG)
+    return ProfileStore(WRAPPER_DB, patch.WRAPPER_CONFIG)
+
+
+def mark_patched(tool, folder, item, patched):
+    store = open_store(tool)
+    try:
+        store.set_patched(folder, item, patched)
+    finally:
+        store.close()
+
+
+def patched_state(tool, folder, item):
+    store = open_store(tool)
+    try:
+        return store.is_patched(folder, item)
+    finally:
+        store.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export or import VR patcher profiles as JSON")
+    ap.add_argument("tool", choices=("launcher", "wrapper"))
+    ap.add_argument("action", choices=("export", "import"))
+    ap.add_argument("path", nargs="?", help="JSON file (default: the legacy profile file)")
+    opts = ap.parse_args(argv)
+
+    store = open_store(opts.tool)
+    path = opts.path or (patch.LAUNCHER_CONFIG if opts.tool == "launcher" else patch.WRAPPER_CONFIG)
+    if opts.action == "export":
+        store.export_json(path)
+        print(f"{len(store)} profile(s) exported to {path}")
+    else:
+        try:
+            cfg = read_json(path)
+        except (OSError, ValueError) as e:
+            print(f"error: could not import {path}: {e}", file=sys.stderr)
+            store.close()
+            return 2
+        store.put_many(cfg.get("profiles", {}))
+        for key, value in cfg.items():
+            if key != "profiles":
+                store.set_setting(key, value)
+        print(f"{len(cfg.get('profiles', {}))} profile(s) imported from {path}")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import date
+
+# Launch-latency records written by launchers/wrappers built with timing on.
+# One tab-separated line per launch in <game folder>/vr_launch_timing.log:
+#
+#   v1  <utc start>  <launcher exe>  <boot ms>  <call ms>  <return ms>  <pid>  <dropped args>
+#
+# boot = OS process start → Main, call/return = Main → Process.Start call/return.
+# Launcher overhead is boot + return. Logs are parsed incrementally: the index
+# remembers a byte offset per log and only the new tail is read on each update.
+
+LOG_NAME      = "vr_launch_timing.log"
+INDEX_FILE    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vr_timing_index.json")
+INDEX_VERSION = 1
+KEEP_DAYS     = 365    # records older than this are dropped from the index
+KEEP_RECORDS  = 2000   # and only this many of the newest are kept per log
+
+_lock = threading.Lock()
+
+
+def _utc_cutoff(days):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - days * 86400))
+
+
+def parse_line(line):
+    parts = line.rstrip("\r\n").split("\t")
+    if len(parts) < 7 or parts[0] != "v1":
+        return None
+    try:
+        boot, call, ret = float(parts[3]), float(parts[4]), float(parts[5])
+        return {"when": parts[1][:19], "exe": parts[2], "boot_ms": boot, "call_ms": call,
+                "return_ms": ret, "overhead_ms": max(boot, 0.0) + ret, "pid": int(parts[6]),
+                "dropped": parts[7] if len(parts) > 7 else ""}
+    except ValueError:
+        return None
+
+
+def load_index(path=INDEX_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "logs": {}}
+
+
+def save_index(idx, path=INDEX_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(idx, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_tail(log_path, entry):
+    # Parses only bytes past the saved offset; a shrunk or replaced file starts over
+    st = os.stat(log_path)
+    if st.st_size < entry["offset"] or st.st_ino != entry.get("ino", st.st_ino):
+        entry.update(offset=0, records=[])
+    entry["ino"] = st.st_ino
+    if st.st_size == entry["offset"]:
+        return 0
+    with open(log_path, "rb") as f:
+        f.seek(entry["offset"])
+        chunk = f.read()
+    end = chunk.rfind(b"\n") + 1    # leave a half-written last line for next time
+    added = 0
+    for raw in chunk[:end].decode("utf-8", errors="replace").splitlines():
+        rec = parse_line(raw)
+        if rec:
+            entry["records"].append([rec["when"], round(rec["overhead_ms"], 1),
+                                     round(rec["return_ms"], 1), rec["exe"]])
+            added += 1
+    entry["offset"] += end
+    cutoff = _utc_cutoff(KEEP_DAYS)
+    if entry["records"] and entry["records"][0][0] < cutoff:
+        entry["records"] = [r for r in entry["records"] if r[0] >= cutoff]
+    del entry["records"][:-KEEP_RECORDS]
+    return added
+
+
+def update(folders, index_path=INDEX_FILE):
+    # Returns {folder: [[when, overhead_ms, return_ms, exe], ...]} for folders with a log
+    out = {}
+    with _lock:
+        idx = load_index(index_path)
+        changed = False
+        for folder in folders:
+            log_path = os.path.join(folder, LOG_NAME)
+            key = os.path.normcase(os.path.abspath(log_path))
+            if not os.path.isfile(log_path):
+                continue
+            entry = idx["logs"].setdefault(key, {"offset": 0, "records": []})
+            try:
+                before = entry["offset"]
+                _read_tail(log_path, entry)
+                changed |= entry["offset"] != before
+            except OSError:
+                continue
+            out[folder] = entry["records"]
+        if changed:
+            try:
+                save_index(idx, index_path)
+            except OSError:
+                pass
+    return out
+
+
+def percentile(values, q):
+    # Linear interpolation between closest ranks; values need not be sorted
+    if not values:
+        return None
+    s = sorted(values)
+    pos = (len(s) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (pos - lo)
+
+
+def summarize(records, by=None):
+    # by: None for one row, "day", "week" or "month" for one row per period
+    groups = {}
+    for when, overhead, _ret, _exe in records:
+        if by == "day":
+            key = when[:10]
+        elif by == "week":
+            y, w, _ = date.fromisoformat(when[:10]).isocalendar()
+            key = f"{y}-W{w:02d}"
+        elif by == "month":
+            key = when[:7]
+        else:
+            key = "all"
+        groups.setdefault(key, []).append(overhead)
+    return [{"period": k, "count": len(v), "p50": percentile(v, 0.5), "p95": percentile(v, 0.95)}
+            for k, v in sorted(groups.items())]
+
+
+def log_summary(folder, log, recent_days=30):
+    # One status line for check_status; silent when the game has no timing log
+    records = update([folder]).get(folder)
+    if not records:
+        return
+    cutoff = _utc_cutoff(recent_days)
+    recent = [r for r in records if r[0] >= cutoff]
+    span = f"last {recent_days} days" if recent else "all time"
+    row = summarize(recent or records)[0]
+    log(f"Launch overhead: p50 {row['p50']:.0f} ms, p95 {row['p95']:.0f} ms "
+        f"over {row['count']} launch(es) ({span})", "info")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Launcher overhead per profile from launch timing logs")
+    ap.add_argument("tool", choices=("launcher", "wrapper"))
+    ap.add_argument("--only", nargs="+", metavar="NAME", help="restrict to these profile names")
+    ap.add_argument("--by", choices=("day", "week", "month"), help="one row per period")
+    opts = ap.parse_args(argv)
+
+    import vr_store
+    store = vr_store.open_store(opts.tool)
+    profiles = [(n, p) for n, p in store.items() if not opts.only or n in opts.only]
+    store.close()
+    timings = update([p.get("folder", "") for _, p in profiles if p.get("folder")])
+
+    shown = 0
+    for name, p in profiles:
+        records = timings.get(p.get("folder", ""))
+        if not records:
+            continue
+        shown += 1
+        print(name)
+        for row in summarize(records, opts.by):
+            print(f"  {row['period']:<10} {row['count']:>6} launch(es)   "
+                  f"p50 {row['p50']:8.1f} ms   p95 {row['p95']:8.1f} ms")
+    if not shown:
+        print("No launch timing records (enable 'Record launch timing' and launch the game).")
+    return 0 if shown else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
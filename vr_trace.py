@@ -0,0 +1,267 @@
+import os
+import sys
+import json
+import time
+import argparse
+import cProfile
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+
+# Timed spans around each patch operation and its stages (compile, backup,
+# renames, fingerprints, ...). Spans nest per thread; a span's path is its
+# parents' names joined with "/", e.g. apply_wrapper/compile. Timing is always
+# collected into in-process histograms. The rest is opt-in through the environment,
+# so the GUIs, batch mode and the daemon all honour it:
+#
+#   VR_TRACE=1     append one JSON line per operation to vr_trace.jsonl and
+#                  rewrite vr_metrics.prom (Prometheus text format) after each
+#   VR_PROFILE=1   cProfile each operation into .vr_profiles/ (one at a time)
+#
+#   python vr_trace.py                # per-stage count / median / p95 / max from vr_trace.jsonl
+
+HERE         = os.path.dirname(os.path.abspath(__file__))
+TRACE_FILE   = os.path.join(HERE, "vr_trace.jsonl")
+METRICS_FILE = os.path.join(HERE, "vr_metrics.prom")
+PROFILE_DIR  = os.path.join(HERE, ".vr_profiles")
+BUCKETS      = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_local     = threading.local()
+_lock      = threading.Lock()
+_metrics   = {}                 # path → [count, seconds, failures, per-bucket counts]
+_profiling = threading.Lock()   # cProfile can't run two profilers at once
+
+
+def _on(var):
+    return os.environ.get(var, "") not in ("", "0")
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+class Span:
+    __slots__ = ("name", "path", "attrs", "t0", "seconds", "ok", "children")
+
+    def __init__(self, name, path, attrs):
+        self.name, self.path, self.attrs = name, path, attrs
+        self.t0, self.seconds, self.ok, self.children = time.perf_counter(), 0.0, None, []
+
+
+# ── recording ───────────────────────────────────────────────────────────────
+
+def observe(path, seconds, failed=False):
+    # Adds one sample to the histograms without a span (e.g. Tk log redraws)
+    with _lock:
+        m = _metrics.get(path)
+        if m is None:
+            m = _metrics[path] = [0, 0.0, 0, [0] * len(BUCKETS)]
+        m[0] += 1
+        m[1] += seconds
+        m[2] += bool(failed)
+        for i, le in enumerate(BUCKETS):
+            if seconds <= le:
+                m[3][i] += 1
+                break
+
+
+@contextmanager
+def span(name, **attrs):
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    s = Span(name, f"{parent.path}/{name}" if parent else name, attrs)
+    stack.append(s)
+    try:
+        yield s
+    except BaseException:
+        s.ok = False
+        raise
+    finally:
+        s.seconds = time.perf_counter() - s.t0
+        stack.pop()
+        observe(s.path, s.seconds, s.ok is False)
+        if parent:
+            parent.children.append(s)
+        else:
+            _finish(s)
+
+
+def traced(name=None):
+    # Decorator: the call becomes a span; a bool result is its outcome. The
+    # call's log callback (if any) is timed, and with VR_PROFILE a top-level
+    # call is run under cProfile.
+    def wrap(fn):
+        sig = inspect.signature(fn)
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            bound = sig.bind_partial(*args, **kwargs)
+            folder = bound.arguments.get("folder")
+            with span(label, **({"folder": folder} if isinstance(folder, str) else {})) as s:
+                log = bound.arguments.get("log")
+                if callable(log):
+                    s.attrs.update(log_lines=0, log_ms=0.0)
+                    def timed_log(msg, tag="info"):
+                        t = time.perf_counter()
+                        try:
+                            return log(msg, tag)
+                        finally:
+                            s.attrs["log_lines"] += 1
+                            s.attrs["log_ms"] += (time.perf_counter() - t) * 1000
+                    bound.arguments["log"] = timed_log
+                prof = None
+                if len(_stack()) == 1 and _on("VR_PROFILE") and _profiling.acquire(blocking=False):
+                    prof = cProfile.Profile()
+                    try:
+                        prof.enable()
+                    except ValueError:      # another profiler is active (3.12+)
+                        prof = None
+                        _profiling.release()
+                try:
+                    result = fn(*bound.args, **bound.kwargs)
+                finally:
+                    if prof:
+                        prof.disable()
+                        _profiling.release()
+                        s.attrs["profile"] = _dump(prof, label)
+                if isinstance(result, bool):
+                    s.ok = result
+                return result
+        return inner
+    return wrap
+
+
+def _dump(prof, label):
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+    path = os.path.join(PROFILE_DIR, f"{stamp}-{label}-{os.getpid()}.prof")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        prof.dump_stats(path)
+        return path
+    except OSError:
+        return None
+
+
+# ── export ──────────────────────────────────────────────────────────────────
+
+def _flatten(s, t0, out):
+    for c in s.children:
+        rec = {"span": c.path, "start_ms": round((c.t0 - t0) * 1000, 3),
+               "ms": round(c.seconds * 1000, 3)}
+        if c.ok is False:
+            rec["ok"] = False
+        if c.attrs:
+            rec.update(c.attrs)
+        out.append(rec)
+        _flatten(c, t0, out)
+    return out
+
+
+def record(s):
+    # The JSON-lines record for a finished top-level span
+    rec = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "op": s.name, "pid": os.getpid(),
+           "ms": round(s.seconds * 1000, 3), "ok": s.ok is not False}
+    rec.update({k: round(v, 3) if isinstance(v, float) else v for k, v in s.attrs.items()})
+    rec["spans"] = _flatten(s, s.t0, [])
+    return rec
+
+
+def _finish(s):
+    if not _on("VR_TRACE"):
+        return
+    line = json.dumps(record(s), ensure_ascii=False) + "\n"
+    with _lock:
+        try:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+    write_metrics()
+
+
+def _label(value):
+    # Prometheus label values escape backslash, double quote and newline
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus():
+    with _lock:
+        items = sorted((_label(path), [m[0], m[1], m[2], list(m[3])]) for path, m in _metrics.items())
+    out = ["# HELP vr_span_seconds Time spent in patch operations and their stages.",
+           "# TYPE vr_span_seconds histogram"]
+    for path, (count, total, _, buckets) in items:
+        cum = 0
+        for le, n in zip(BUCKETS, buckets):
+            cum += n
+            out.append(f'vr_span_seconds_bucket{{span="{path}",le="{le:g}"}} {cum}')
+        out.append(f'vr_span_seconds_bucket{{span="{path}",le="+Inf"}} {count}')
+        out.append(f'vr_span_seconds_sum{{span="{path}"}} {total:.6f}')
+        out.append(f'vr_span_seconds_count{{span="{path}"}} {count}')
+    out += ["# HELP vr_span_failures_total Spans that returned False or raised.",
+            "# TYPE vr_span_failures_total counter"]
+    out += [f'vr_span_failures_total{{span="{path}"}} {m[2]}' for path, m in items]
+    return "\n".join(out) + "\n"
+
+
+def write_metrics(path=None):
+    path = path or METRICS_FILE
+    tmp = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus())
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# ── summary ─────────────────────────────────────────────────────────────────
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(path=TRACE_FILE, op=None):
+    # {span path: [ms, ...]} over every record in a trace file (operations included)
+    samples = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if op and rec.get("op") != op:
+                continue
+            samples.setdefault(rec["op"], []).append(rec["ms"])
+            for s in rec.get("spans", ()):
+                samples.setdefault(s["span"], []).append(s["ms"])
+    return samples
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Summarize patch operation traces (written with VR_TRACE=1)")
+    ap.add_argument("file", nargs="?", default=TRACE_FILE)
+    ap.add_argument("--op", help="only this operation, e.g. apply_wrapper")
+    opts = ap.parse_args(argv)
+    try:
+        samples = summarize(opts.file, opts.op)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not samples:
+        print("No traces.")
+        return 0
+    print(f"{'span':<40} {'count':>6} {'median':>10} {'p95':>10} {'max':>10}")
+    for path in sorted(samples):
+        v = samples[path]
+        print(f"{path:<40} {len(v):>6} {_pct(v, 0.5):>8.1f}ms {_pct(v, 0.95):>8.1f}ms {max(v):>8.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import sqlite3
+import argparse
+
+import vr_batch
+import vr_store
+import vr_patch as patch
+import vr_compilers
+
+# Watches every profiled game folder for a patch that went missing: a Steam
+# update or "Verify integrity" writing the original EXE over a wrapper, or a
+# launcher that was deleted. Only the few files a patch consists of are looked
+# at, never the directory tree. On Linux an inotify watch on each game folder
+# reports changes; elsewhere those files are stat()ed every --interval seconds.
+# A folder is checked once it has been quiet for SETTLE seconds, so a running
+# Steam update is never raced.
+#
+#   python vr_watch.py                       # report problems
+#   python vr_watch.py wrapper --reapply     # and repair them
+#   python vr_watch.py --once                # one pass, exit 1 on any problem
+
+SETTLE   = 10      # seconds without changes before a folder is checked
+INTERVAL = 2.0     # polling period (and inotify wake-up period)
+RESCAN   = 300     # full stat pass even with inotify, in case an event was lost
+RELOAD   = 60      # re-read the profile stores this often
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM  = 0x040
+IN_MOVED_TO    = 0x080
+IN_CREATE      = 0x100
+IN_DELETE      = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF   = 0x800
+IN_Q_OVERFLOW  = 0x4000
+IN_IGNORED     = 0x8000
+IN_ONLYDIR     = 0x01000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+              IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT = struct.Struct("iIII")
+
+
+# ── inotify ─────────────────────────────────────────────────────────────────
+
+class Inotify:
+    # Directory watches through libc; raises OSError where inotify isn't available
+    def __init__(self):
+        import ctypes, ctypes.util
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is Linux-only")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        self._ctypes = ctypes
+
+    def add(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            e = self._ctypes.get_errno()
+            raise OSError(e, os.strerror(e), path)
+        return wd
+
+    def remove(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout):
+        # [(wd, mask, name)] for events within timeout seconds
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events, pos = [], 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0").decode("utf-8", "replace")
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+# ── state of one patch ──────────────────────────────────────────────────────
+
+def watched_paths(tool, entry):
+    # The files that make up the patch, by role
+    folder, exe = entry["folder"], entry["exe"]
+    if tool == "launcher":
+        art = patch._launcher_artifacts(folder, entry["launcher_name"])
+        return {"game": os.path.join(folder, exe), **art}
+    _, wrap_exe, real_exe, orig_data, real_data = patch.wrapper_paths(folder, exe)
+    return {"exe": wrap_exe, "real": real_exe, "data": orig_data, "real_data": real_data}
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def snapshot(paths):
+    return tuple(_stat_key(p) for p in paths.values())
+
+
+LAUNCHER_NEEDS = {"exe": ("exe",), "sidecar": ("exe", "sidecar"), "proton": ("proton",)}
+
+
+def diagnose(tool, entry, paths):
+    # (state, message); states: ok, off (not patched), missing (reapply),
+    # clobbered (original EXE written over the wrapper), flag (needs a human)
+    exists = {k: os.path.exists(p) for k, p in paths.items()}
+    if tool == "launcher":
+        if not exists["game"]:
+            return "flag", f"game EXE missing: {entry['exe']}"
+        if entry["mode"] == "proton" and exists["proton"] and not patch._is_our_script(paths["proton"]):
+            return "flag", f"{os.path.basename(paths['proton'])} was replaced by a foreign script"
+        need = LAUNCHER_NEEDS[entry["mode"]]
+        gone = [os.path.basename(paths[k]) for k in need if not exists[k]]
+        if not gone:
+            return "ok", ""
+        if len(gone) == len(need):
+            return "off", f"{entry['launcher_name']} not present"
+        return "missing", f"deleted: {', '.join(gone)}"
+
+    base = os.path.splitext(entry["exe"])[0]
+    if exists["data"] and exists["real_data"]:
+        return "flag", (f"{base}_Data and {base}Real_Data both exist; an update probably wrote "
+                        f"new game files into {base}_Data. Undo, verify files in Steam, then apply")
+    if not exists["real"]:
+        if exists["exe"] and patch.exe_kind(paths["exe"])[0] == "wrapper":
+            return "flag", f"wrapper present but {base}Real.exe is missing"
+        if not exists["exe"]:
+            return "flag", f"game EXE missing: {entry['exe']}"
+        return "off", "wrapper not applied"
+    if not exists["exe"]:
+        return "missing", f"wrapper {entry['exe']} deleted"
+    if patch.exe_kind(paths["exe"])[0] != "wrapper":
+        return "clobbered", f"{entry['exe']} was overwritten by the original game EXE (Steam update?)"
+    return "ok", ""
+
+
+def intended(tool, entry):
+    # Whether the patch is meant to be in place, as last recorded by apply/remove/undo;
+    # None for patches made before that was recorded
+    item = entry["launcher_name"] if tool == "launcher" else entry["exe"]
+    try:
+        return vr_store.patched_state(tool, entry["folder"], item)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def repair(tool, entry, state, log):
+    if state == "clobbered":
+        # The fresh EXE is the updated game; it replaces the stale Real.exe
+        _, wrap_exe, real_exe, _, _ = patch.wrapper_paths(entry["folder"], entry["exe"])
+        os.replace(wrap_exe, real_exe)
+        log(f"Updated game EXE kept as {os.path.basename(real_exe)}", "ok")
+    return vr_batch.run_operation(tool, "apply", entry, log)
+
+
+# ── watcher ─────────────────────────────────────────────────────────────────
+
+class Watcher:
+    def __init__(self, tools, reapply=False, interval=INTERVAL, settle=SETTLE,
+                 out=sys.stdout, use_inotify=True):
+        self.tools    = tools
+        self.reapply  = reapply
+        self.interval = interval
+        self.settle   = settle
+        self.out      = out
+        self.watched  = {}     # (tool, name) → {entry, paths, snap, changed, armed, acted}
+        self.problems = {}     # (tool, name) → message of the last reported problem
+        self.notify   = None
+        self._wds     = {}     # folder → wd
+        self._folders = {}     # wd → folder
+        if use_inotify:
+            try:
+                self.notify = Inotify()
+            except (OSError, AttributeError):
+                self.notify = None
+
+    def say(self, key, msg, tag="info"):
+        stamp = time.strftime("%H:%M:%S")
+        name = f"{key[0]}/{key[1]}" if key else ""
+        print(f"{stamp} {vr_batch.ICONS.get(tag, '  ')}{name:<32} {msg}", file=self.out, flush=True)
+
+    # ── profiles ────────────────────────────────────────────────────────────
+
+    def load(self):
+        seen = set()
+        for tool in self.tools:
+            try:
+                entries = vr_batch.load_entries(tool)
+            except Exception as e:
+                self.say(None, f"{tool} profiles not reloaded: {e}", "warn")
+                seen.update(k for k in self.watched if k[0] == tool)
+                continue
+            for entry in entries:
+                key = (tool, entry["name"])
+                seen.add(key)
+                paths = watched_paths(tool, entry)
+                w = self.watched.get(key)
+                if w and w["paths"] == paths:
+                    w["entry"] = entry
+                    continue
+                self.watched[key] = {"entry": entry, "paths": paths, "snap": snapshot(paths),
+                                     "changed": 0.0, "armed": None, "acted": None}
+        for key in set(self.watched) - seen:
+            del self.watched[key]
+            self.problems.pop(key, None)
+        self._sync_watches()
+
+    def _sync_watches(self):
+        if not self.notify:
+            return
+        folders = {w["entry"]["folder"] for w in self.watched.values()}
+        for folder in set(self._wds) - folders:
+            self.notify.remove(self._wds.pop(folder))
+        for folder in folders - set(self._wds):
+            try:
+                wd = self.notify.add(folder)
+            except OSError:
+                continue      # missing folder: the stat pass reports it
+            self._wds[folder] = wd
+            self._folders[wd] = folder
+
+    # ── change detection ────────────────────────────────────────────────────
+
+    def poll(self, keys=None):
+        # Re-stats the patch files; anything that changed starts a settle period
+        now = time.monotonic()
+        for key in keys if keys is not None else list(self.watched):
+            w = self.watched[key]
+            snap = snapshot(w["paths"])
+            if snap != w["snap"]:
+                w["snap"], w["changed"] = snap, now
+
+    def _drain_events(self, timeout):
+        dirty = set()
+        for wd, mask, name in self.notify.read(timeout):
+            if mask & IN_Q_OVERFLOW:
+                return None
+            folder = self._folders.get(wd)
+            if folder is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                self._folders.pop(wd, None)
+                self._wds.pop(folder, None)
+            for key, w in self.watched.items():
+                if w["entry"]["folder"] != folder:
+                    continue
+                if not name or any(os.path.basename(p).lower() == name.lower()
+                                   for p in w["paths"].values()):
+                    dirty.add(key)
+        return dirty
+
+    # ── evaluation ──────────────────────────────────────────────────────────
+
+    def check(self, key, w):
+        tool, entry = key[0], w["entry"]
+        if not os.path.isdir(entry["folder"]):
+            state, msg = "flag", f"folder not found: {entry['folder']}"
+        else:
+            state, msg = diagnose(tool, entry, w["paths"])
+        armed = w["armed"]
+        if state not in ("ok", "flag"):
+            # Removed or undone with the tool is off, whatever is left behind; a
+            # launcher gone without that was deleted. A wrapper back to "off" was
+            # undone by hand. Older patches fall back to what this watcher saw.
+            meant = intended(tool, entry)
+            if meant is False:
+                state = "off"
+            elif state == "off" and tool == "launcher" and (meant or armed):
+                state, msg = "missing", f"{entry['launcher_name']} deleted"
+        if state in ("ok", "off"):
+            w["armed"] = state == "ok"
+            if key in self.problems:
+                self.say(key, "patch OK again" if state == "ok" else msg, "ok" if state == "ok" else "dim")
+                del self.problems[key]
+            elif armed is None and state == "ok":
+                self.say(key, "watching", "dim")
+            return True
+        w["armed"] = True
+
+        if state == "flag" or not self.reapply:
+            if self.problems.get(key) != msg:
+                self.say(key, msg, "err" if state == "flag" else "warn")
+                self.problems[key] = msg
+            return False
+        if w["acted"] == w["snap"]:
+            return False      # already tried on exactly these files; wait for the next change
+        w["acted"] = w["snap"]
+        self.say(key, f"{msg} — reapplying", "warn")
+        lines = []
+        try:
+            ok = repair(tool, entry, state, lambda m, tag="info": lines.append((tag, m)))
+        except Exception as e:
+            ok = False
+            lines.append(("err", f"{type(e).__name__}: {e}"))
+        for tag, m in lines:
+            if tag in ("err", "warn") or not ok:
+                self.say(key, m, tag)
+        w["snap"] = snapshot(w["paths"])
+        if ok:
+            self.say(key, "reapplied", "ok")
+            self.problems.pop(key, None)
+        else:
+            self.say(key, "reapply failed; will retry after the next change", "err")
+            self.problems[key] = msg
+        return ok
+
+    def check_settled(self):
+        now = time.monotonic()
+        for key, w in list(self.watched.items()):
+            if w["changed"] is not None and now - w["changed"] >= self.settle:
+                w["changed"] = None
+                self.check(key, w)
+
+    # ── main loop ───────────────────────────────────────────────────────────
+
+    def once(self):
+        self.load()
+        return all([self.check(key, w) for key, w in list(self.watched.items())])
+
+    def run(self, stop=None):
+        self.load()
+        backend = "inotify" if self.notify else f"polling every {self.interval:g} s"
+        self.say(None, f"Watching {len(self.watched)} profile(s) ({backend}); "
+                       f"{'reapplying' if self.reapply else 'reporting'} on change")
+        last_reload = last_rescan = time.monotonic()
+        while not (stop and stop.is_set()):
+            if self.notify:
+                dirty = self._drain_events(self.interval)
+                if dirty is None:
+                    self.poll()
+                elif dirty:
+                    self.poll(dirty)
+                    now = time.monotonic()
+                    for key in dirty:
+                        self.watched[key]["changed"] = now
+            else:
+                time.sleep(self.interval)
+                self.poll()
+            now = time.monotonic()
+            if now - last_reload >= RELOAD:
+                last_reload = now
+                self.load()
+            if self.notify and now - last_rescan >= RESCAN:
+                last_rescan = now
+                self.poll()
+            self.check_settled()
+
+    def close(self):
+        if self.notify:
+            self.notify.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Watch profiled game folders and repair patches that updates undo")
+    ap.add_argument("tools", nargs="*", metavar="{launcher,wrapper}",
+                    help="which profile stores to watch (default: both)")
+    ap.add_argument("--reapply", action="store_true",
+                    help="re-create missing launchers and wrappers instead of only reporting them")
+    ap.add_argument("--once", action="store_true", help="check every folder once and exit")
+    ap.add_argument("--interval", type=float, default=INTERVAL, help="polling period in seconds")
+    ap.add_argument("--settle", type=float, default=SETTLE,
+                    help="seconds a folder must be quiet before it is checked")
+    ap.add_argument("--poll", action="store_true", help="don't use inotify")
+    ap.add_argument("--compiler", choices=vr_compilers.ORDER, help="C# compiler backend to use")
+    opts = ap.parse_args(argv)
+    for tool in opts.tools:
+        if tool not in vr_batch.TOOLS:
+            ap.error(f"unknown tool: {tool}")
+    if opts.compiler:
+        os.environ["VR_COMPILER"] = opts.compiler
+
+    watcher = Watcher(opts.tools or ["launcher", "wrapper"], opts.reapply, opts.interval,
+                      opts.settle, use_inotify=not opts.poll and not opts.once)
+    try:
+        if opts.once:
+            return 0 if watcher.once() else 1
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import queue
+import threading
+
+# Background executor for the Tk apps. Filesystem and compiler work runs on one
+# worker thread (so queued operations never race on the same folder); anything
+# that touches widgets is marshalled back to the Tk thread through after().
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, runner, label, fn, args, on_done, on_error=None):
+        self.runner   = runner
+        self.label    = label
+        self.fn       = fn
+        self.args     = args
+        self.on_done  = on_done
+        self.on_error = on_error
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise Cancelled()
+
+    def log(self, msg, tag="info"):
+        # Same signature as App.log, safe to call from the worker thread
+        self.runner.call_ui(self.runner.log, msg, tag)
+
+
+class TaskRunner:
+    def __init__(self, root, log, on_state=None, poll_ms=40):
+        self.root     = root
+        self.log      = log
+        self.on_state = on_state
+        self.poll_ms  = poll_ms
+        self.current  = None
+        self._queued  = []
+        self._lock    = threading.Lock()
+        self._jobs    = queue.Queue()
+        self._ui      = queue.Queue()
+        self._thread  = threading.Thread(target=self._loop, name="vr-worker", daemon=True)
+        self._thread.start()
+        self._after_id = root.after(poll_ms, self._pump)
+
+    # ── Tk thread ───────────────────────────────────────────────────────────
+
+    def submit(self, label, fn, *args, on_done=None, on_error=None):
+        # fn(task, *args) runs on the worker; on_done(result) runs on the Tk thread,
+        # or on_error(exception) if fn raised (cancelling is not an error)
+        task = Task(self, label, fn, args, on_done, on_error)
+        with self._lock:
+            self._queued.append(task)
+        self._jobs.put(task)
+        self._notify()
+        return task
+
+    def cancel_all(self):
+        with self._lock:
+            tasks = list(self._queued)
+            if self.current:
+                tasks.append(self.current)
+        for t in tasks:
+            t.cancel()
+        return len(tasks)
+
+    @property
+    def busy(self):
+        with self._lock:
+            return self.current is not None or bool(self._queued)
+
+    def state(self):
+        with self._lock:
+            label = self.current.label if self.current else None
+            return label, len(self._queued)
+
+    def shutdown(self, timeout=5.0):
+        self.cancel_all()
+        self._jobs.put(None)
+        self._thread.join(timeout)
+        try:
+            self.root.after_cancel(self._after_id)
+        except Exception:
+            pass
+
+    def _pump(self):
+        while True:
+            try:
+                fn, args = self._ui.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                self.log(f"UI callback error: {e}", "err")
+        self._after_id = self.root.after(self.poll_ms, self._pump)
+
+    # ── any thread ──────────────────────────────────────────────────────────
+
+    def call_ui(self, fn, *args):
+        self._ui.put((fn, args))
+
+    def _notify(self):
+        if self.on_state:
+            self.call_ui(lambda: self.on_state(*self.state()))
+
+    # ── worker thread ───────────────────────────────────────────────────────
+
+    def _loop(self):
+        while True:
+            task = self._jobs.get()
+            if task is None:
+                return
+            with self._lock:
+                self._queued.remove(task)
+                self.current = None if task.cancelled else task
+            if task.cancelled:
+                self.call_ui(self.log, f"Cancelled before start: {task.label}", "warn")
+                self._notify()
+                continue
+            self._notify()
+            try:
+                result = task.fn(task, *task.args)
+            except Cancelled:
+                result = None
+                self.call_ui(self.log, f"Cancelled: {task.label}", "warn")
+            except Exception as e:
+                result = None
+                self.call_ui(self.log, f"{task.label} failed: {e}", "err")
+                if task.on_error:
+                    self.call_ui(task.on_error, e)
+            else:
+                if task.on_done:
+                    self.call_ui(task.on_done, result)
+            with self._lock:
+                self.current = None
+            self._notify()
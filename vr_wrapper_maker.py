@@ -1,9 +1,27 @@
+import sys
+import time
+
+_T0 = time.perf_counter()
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1:] != ["--startup-timing"]:
+    # Headless batch mode - never touches tkinter
+    from vr_batch import main
+    sys.exit(main("wrapper"))
+
 import tkinter as tk
-from tkinter import filedialog, font, messagebox
+from tkinter import filedialog, font, messagebox, ttk
 import os
-import subprocess
-import json
-from datetime import datetime
+import threading
+
+import vr_patch as patch
+import vr_pe
+from vr_picker import PresetMenu, ProfilePicker
+import vr_presets
+import vr_steam
+import vr_store
+from vr_log import LogSink, MAX_LINES as LOG_MAX_LINES
+import vr_startup
+from vr_worker import TaskRunner
 
 BG         = "#0a0a0f"
 PANEL      = "#12121a"
@@ -17,60 +35,28 @@ YELLOW     = "#e0b83c"
 BLUE       = "#6090e0"
 PURPLE     = "#a080e0"
 
-CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vr_wrapper_profiles.json")
-
-CSC_PATHS = [
-    r"C:\Windows\Microsoft.NET\Framework64\v4.0.30319\csc.exe",
-    r"C:\Windows\Microsoft.NET\Framework\v4.0.30319\csc.exe",
-]
-
-WRAPPER_TEMPLATE = r'''
-using System;
-using System.Diagnostics;
-using System.IO;
-
-class VRWrapper {{
-    static void Main(string[] args) {{
-        string gameDir = AppDomain.CurrentDomain.BaseDirectory;
-        string realExe = Path.Combine(gameDir, "{real_exe}");
-        ProcessStartInfo psi = new ProcessStartInfo();
-        psi.FileName = realExe;
-        psi.Arguments = "{vr_args}";
-        psi.UseShellExecute = false;
-        psi.WorkingDirectory = gameDir;
-        Process.Start(psi);
-    }}
-}}
-'''
-
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {"profiles": {}, "last_profile": ""}
-
-def save_config(cfg):
-    try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Config save error: {e}")
-
 
 class App(tk.Tk):
-    def __init__(self):
+    # The window is built and painted first; the profile store, presets and the
+    # last profile are loaded on the worker afterwards, so a slow disk or an
+    # unreachable network share can't keep the window from appearing.
+    def __init__(self, timer=None, report_timing=False):
+        self.timer = timer or vr_startup.StartupTimer()
+        self.report_timing = report_timing
+        self.timer.mark("imports")
         super().__init__()
         self.title("VR Wrapper Maker")
-        self.geometry("680x720")
+        self.geometry("680x830")
         self.resizable(False, False)
         self.configure(bg=BG)
-        self.cfg = load_config()
+        self.store = None
+        self._loading = False
         self.setup_fonts()
         self.build_ui()
-        self.load_last_profile()
+        self.runner = TaskRunner(self, self.log, on_state=self._on_task_state)
+        self.timer.mark("UI build")
+        self.bind("<Expose>", self._on_expose, add="+")
+        self.after(1000, self._start_loading)    # in case no Expose ever arrives
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_fonts(self):
@@ -78,8 +64,8 @@ class App(tk.Tk):
         self.f_label  = font.Font(family="Consolas", size=8)
         self.f_input  = font.Font(family="Consolas", size=9)
         self.f_btn    = font.Font(family="Consolas", size=9, weight="bold")
-        self.f_log    = font.Font(family="Consolas", size=8)
-        self.f_sub    = font.Font(family="Consolas", size=9)
+        self.f_log    = self.f_label     # same face and size; one font object
+        self.f_sub    = self.f_input
 
     def build_ui(self):
         pad = 24
@@ -97,19 +83,12 @@ class App(tk.Tk):
         prof_row = tk.Frame(self, bg=BG)
         prof_row.pack(fill="x", padx=pad, pady=(4, 0))
 
-        self.var_profile = tk.StringVar()
-        self.combo_profiles = tk.OptionMenu(prof_row, self.var_profile, "")
-        self.combo_profiles.config(
-            font=self.f_input, bg=PANEL, fg=TEXT,
-            activebackground=BORDER, activeforeground=ACCENT,
-            highlightthickness=1, highlightbackground=BORDER,
-            relief="flat", bd=0, width=28
-        )
-        self.combo_profiles["menu"].config(
-            bg=PANEL, fg=TEXT, activebackground=ACCENT_DIM,
-            activeforeground=ACCENT, font=self.f_input
-        )
-        self.combo_profiles.pack(side="left", ipady=4)
+        self.picker = ProfilePicker(prof_row, self.f_input, {
+            "bg": BG, "panel": PANEL, "border": BORDER, "text": TEXT,
+            "accent": ACCENT, "accent_dim": ACCENT_DIM,
+        })
+        self.picker.pack(side="left")
+        self.var_profile = self.picker.var
 
         tk.Frame(prof_row, bg=BG, width=8).pack(side="left")
         self._btn(prof_row, "Load",   self.load_profile,   ACCENT,  side="left", w=70)
@@ -117,6 +96,8 @@ class App(tk.Tk):
         self._btn(prof_row, "Save",   self.save_profile,   PURPLE,  side="left", w=70)
         tk.Frame(prof_row, bg=BG, width=6).pack(side="left")
         self._btn(prof_row, "Delete", self.delete_profile, RED,     side="left", w=70)
+        tk.Frame(prof_row, bg=BG, width=6).pack(side="left")
+        self._btn(prof_row, "Scan",   self.scan_steam,     BLUE,    side="left", w=70)
 
         self._sep(pad, top=14)
 
@@ -131,9 +112,38 @@ class App(tk.Tk):
         self.var_exe = tk.StringVar()
         self._entry(self, self.var_exe, fill="x", padx=pad)
 
-        self._label("FORCED LAUNCH ARGUMENTS", pad, top=14)
+        self._label("FORCED LAUNCH ARGUMENTS  (added after the ticked presets; later flags win)", pad, top=14)
         self.var_args = tk.StringVar(value="-vrmode openvr")
         self._entry(self, self.var_args, fill="x", padx=pad, fg=ACCENT)
+        preset_row = tk.Frame(self, bg=BG)
+        preset_row.pack(fill="x", padx=pad, pady=(4, 0))
+        self.var_final = tk.StringVar()
+        self.presets = PresetMenu(preset_row, self.f_input, {
+            "panel": PANEL, "border": BORDER, "text": TEXT,
+            "accent": ACCENT, "accent_dim": ACCENT_DIM,
+        }, on_change=self._update_final)
+        self.presets.pack(side="left", ipady=3, ipadx=6)
+        tk.Label(preset_row, textvariable=self.var_final, font=self.f_label, bg=BG, fg=DIM,
+                 anchor="w").pack(side="left", fill="x", expand=True, padx=(8, 0))
+        self.var_args.trace_add("write", lambda *_: self._update_final())
+        self._label("PROCESS  (priority · CPU affinity 0-3,6 or 0xF0 · env KEY=VALUE; KEY2=VALUE)", pad, top=14)
+        proc_row = tk.Frame(self, bg=BG)
+        proc_row.pack(fill="x", padx=pad, pady=(4, 0))
+        self.var_priority = tk.StringVar(value="")
+        ttk.Combobox(proc_row, textvariable=self.var_priority, values=("",) + patch.PRIORITIES,
+                     state="readonly", width=12, font=self.f_input).pack(side="left", ipady=3)
+        tk.Frame(proc_row, bg=BG, width=8).pack(side="left")
+        self.var_affinity = tk.StringVar()
+        self._entry(proc_row, self.var_affinity, side="left").config(width=12)
+        tk.Frame(proc_row, bg=BG, width=8).pack(side="left")
+        self.var_env = tk.StringVar()
+        self._entry(proc_row, self.var_env, side="left", fill="x", expand=True)
+
+        self.var_timing = tk.BooleanVar(value=False)
+        tk.Checkbutton(self, text="Record launch timing (vr_launch_timing.log, see vr_timing.py)",
+                       variable=self.var_timing, font=self.f_label, bg=BG, fg=TEXT,
+                       selectcolor=PANEL, activebackground=BG, activeforeground=ACCENT,
+                       highlightthickness=0, cursor="hand2").pack(anchor="w", padx=pad, pady=(6, 0))
 
         self._sep(pad, top=18)
 
@@ -146,6 +156,21 @@ class App(tk.Tk):
         tk.Frame(btns, bg=BG, width=8).pack(side="left")
         self._btn(btns, "?  STATUS", self.check_status,  DIM,    side="left", w=120)
 
+        prog = tk.Frame(self, bg=BG)
+        prog.pack(fill="x", padx=pad, pady=(10, 0))
+        style = ttk.Style(self)
+        style.theme_use("clam")
+        style.configure("VR.Horizontal.TProgressbar", troughcolor=PANEL, background=ACCENT,
+                        bordercolor=BORDER, lightcolor=ACCENT, darkcolor=ACCENT)
+        self.progress = ttk.Progressbar(prog, mode="indeterminate", length=160,
+                                        style="VR.Horizontal.TProgressbar")
+        self.progress.pack(side="left")
+        self.var_task = tk.StringVar(value="Idle")
+        tk.Label(prog, textvariable=self.var_task, font=self.f_label,
+                 bg=BG, fg=DIM).pack(side="left", padx=10)
+        self.btn_cancel = self._btn(prog, "Cancel", self.cancel_tasks, RED, side="right", w=70)
+        self.btn_cancel.config(state="disabled")
+
         self._sep(pad, top=16)
 
         self._label("LOG", pad)
@@ -166,8 +191,7 @@ class App(tk.Tk):
         for tag, color in [("ok", ACCENT), ("warn", YELLOW), ("err", RED),
                            ("dim", DIM), ("info", BLUE), ("time", DIM), ("purple", PURPLE)]:
             self.txt_log.tag_config(tag, foreground=color)
-
-        self._refresh_profile_menu()
+        self.log_sink = LogSink(self.txt_log)
         self.log("Welcome! Select a profile or configure a new game.", DIM)
 
     def _sep(self, pad, top=14):
@@ -204,14 +228,7 @@ class App(tk.Tk):
         return b
 
     def log(self, msg, tag="info"):
-        self.txt_log.configure(state="normal")
-        ts = datetime.now().strftime("%H:%M:%S")
-        self.txt_log.insert("end", f"[{ts}] ", "time")
-        icon = {"ok":"✓ ","warn":"⚠ ","err":"✗ ","dim":"  ","info":"  ","purple":"★ "}.get(tag, "")
-        self.txt_log.insert("end", icon + msg + "\n", tag)
-        self.txt_log.configure(state="disabled")
-        self.txt_log.see("end")
-        self.update_idletasks()
+        self.log_sink.write(msg, tag)
 
     def log_ok    (self, m): self.log(m, "ok")
     def log_warn  (self, m): self.log(m, "warn")
@@ -219,6 +236,21 @@ class App(tk.Tk):
     def log_dim   (self, m): self.log(m, "dim")
     def log_purple(self, m): self.log(m, "purple")
 
+    def _on_task_state(self, label, queued):
+        more = f"  (+{queued} queued)" if queued else ""
+        if label:
+            self.progress.start(12)
+            self.var_task.set(f"Running: {label}{more}")
+            self.btn_cancel.config(state="normal")
+        else:
+            self.progress.stop()
+            self.var_task.set(f"Waiting{more}" if queued else "Idle")
+            self.btn_cancel.config(state="normal" if queued else "disabled")
+
+    def cancel_tasks(self):
+        if self.runner.cancel_all():
+            self.log_warn("Cancelling...")
+
     def browse_folder(self):
         d = filedialog.askdirectory(title="Select game folder")
         if not d: return
@@ -226,189 +258,244 @@ class App(tk.Tk):
         self._auto_detect_exe(d)
 
     def _auto_detect_exe(self, folder):
-        skip = {"crashhandler","uninstall","helper","launcher","unitycrash","subnautica32"}
-        exes = []
-        try:
-            for f in os.listdir(folder):
-                if f.lower().endswith(".exe") and not any(s in f.lower() for s in skip):
-                    exes.append((os.path.getsize(os.path.join(folder, f)), f))
-        except Exception:
+        self.runner.submit("Detect game EXE", lambda t: vr_pe.rank_game_exes(folder),
+                           on_done=lambda ranked: self._show_detected(folder, ranked))
+
+    def _show_detected(self, folder, ranked):
+        if ranked:
+            best = ranked[0]
+            game_exe = best["name"]
+            # Already wrapped: XReal.exe owns XReal_Data, but the profile wants X.exe
+            base = os.path.splitext(game_exe)[0]
+            if base.endswith("Real") and os.path.exists(os.path.join(folder, base[:-4] + ".exe")):
+                game_exe = base[:-4] + ".exe"
+                self.log_dim(f"Wrapper already applied ({best['name']} is the real game)")
+            self.var_exe.set(game_exe)
+            self.log_dim(f"Auto-detected: {vr_pe.describe(best)}")
+            for c in ranked[1:3]:
+                self.log_dim(f"  runner-up: {vr_pe.describe(c)}")
+            if best["confidence"] < 0.5:
+                self.log_warn("Low confidence — check the game EXE name.")
+
+    # ── deferred start-up ───────────────────────────────────────────────────
+
+    def _on_expose(self, event):
+        if event.widget is self:
+            self.after_idle(self._start_loading)
+
+    def _start_loading(self):
+        if self._loading:
             return
-        if exes:
-            exes.sort(reverse=True)
-            self.var_exe.set(exes[0][1])
-            self.log_dim(f"Auto-detected: {exes[0][1]}")
-
-    def _refresh_profile_menu(self):
-        menu = self.combo_profiles["menu"]
-        menu.delete(0, "end")
-        profiles = list(self.cfg["profiles"].keys())
-        if not profiles:
-            menu.add_command(label="(no profiles)", command=lambda: None)
-            self.var_profile.set("(no profiles)")
-        else:
-            for name in profiles:
-                menu.add_command(label=name, command=lambda n=name: self.var_profile.set(n))
-            last = self.cfg.get("last_profile", "")
-            self.var_profile.set(last if last in profiles else profiles[0])
-
-    def load_last_profile(self):
-        last = self.cfg.get("last_profile", "")
-        if last and last in self.cfg["profiles"]:
-            self._apply_profile(last)
-            self.log_purple(f"Auto-loaded profile: {last}")
+        self._loading = True
+        self.timer.mark("first paint")
+        self.runner.submit("Loading profiles", self._load_state, on_done=self._on_loaded,
+                           on_error=self._on_load_failed)
+
+    def _load_state(self, task):
+        # Worker thread: everything that reads the disk, nothing that touches widgets
+        store = vr_store.open_store("wrapper")
+        last = store.get_setting("last_profile", "")
+        try:
+            catalog, preset_error = vr_presets.load_catalog()[0], None
+        except (OSError, ValueError) as e:
+            catalog, preset_error = vr_presets.BUILTIN, e
+        return {"store": store, "rows": store.index_rows(),
+                "last": last if last and last in store else "",
+                "catalog": catalog, "preset_error": preset_error,
+                "log_max_lines": store.get_setting("log_max_lines", LOG_MAX_LINES),
+                "log_file": store.get_setting("log_file") or None}
+
+    def _on_loaded(self, state):
+        self.store = state["store"]
+        self.log_sink.max_lines = state["log_max_lines"]
+        if state["log_file"]:
+            self.log_sink.mirror_to(state["log_file"])
+        if self.store.migrated:
+            self.log_purple(f"Migrated {self.store.migrated} profile(s) to {os.path.basename(self.store.path)}")
+        if self.store.migration_error:
+            self.log_warn(self.store.migration_error)
+        self.picker.set_profiles(state["rows"], state["last"])
+        if state["preset_error"]:
+            self.log_warn(f"{os.path.basename(vr_presets.USER_FILE)} ignored: {state['preset_error']}")
+        self.presets.set_catalog(state["catalog"])
+        self._update_final()
+        if state["last"]:
+            self._apply_profile(state["last"])
+            self.log_purple(f"Auto-loaded profile: {state['last']}")
+            self._probe_folder(self.var_folder.get())
+        self.timer.mark("profiles")
+        if self.report_timing:
+            print(self.timer.report(), flush=True)
+            self.log_dim(self.timer.report())
+
+    def _on_load_failed(self, error):
+        # Keep the window usable: an empty in-memory store, nothing saved this session
+        self.store = vr_store.ProfileStore(":memory:")
+        self.picker.set_profiles([], "")
+        self.presets.set_catalog(vr_presets.BUILTIN)
+        self._update_final()
+        self.log_err(f"Profiles unavailable ({error}) — changes won't be saved until restart")
+        self.timer.mark("profiles")
+
+    def _probe_folder(self, folder):
+        # A sleeping disk or dead network share may take seconds to answer;
+        # ask on a throwaway thread so neither the window nor the worker waits
+        def probe():
+            if folder and not os.path.isdir(folder):
+                self.runner.call_ui(self.log_warn, f"Game folder not reachable: {folder}")
+        threading.Thread(target=probe, name="vr-probe", daemon=True).start()
+
+    def _ready(self):
+        if self.store is None:
+            self.log_warn("Still loading profiles...")
+        return self.store is not None
 
     def load_profile(self):
+        if not self._ready(): return
         name = self.var_profile.get()
-        if name not in self.cfg["profiles"]:
+        if name not in self.store:
             self.log_warn("No valid profile selected."); return
         self._apply_profile(name)
-        self.cfg["last_profile"] = name
-        save_config(self.cfg)
+        self.store.set_setting("last_profile", name)
         self.log_purple(f"Profile loaded: {name}")
 
+    def scan_steam(self):
+        if not self._ready(): return
+        self.log_dim("─── Scanning Steam Libraries ─────────")
+        args = self.var_args.get().strip() or patch.DEFAULT_ARGS
+        self.runner.submit("Scan Steam libraries", lambda t: vr_steam.scan(log=t.log),
+                           on_done=lambda games: self._add_scanned(games, args))
+
+    def _add_scanned(self, games, args):
+        added = vr_steam.add_profiles(self.store, games, "wrapper", args)
+        if not added:
+            self.log_dim("No new Unity games to add.")
+            return
+        folders = {g["name"]: g["folder"] for g in games}
+        for name in added:
+            self.picker.add(name, folders[name])
+        self.log_purple(f"{len(added)} profile(s) added: {', '.join(added)}")
+
     def _apply_profile(self, name):
-        p = self.cfg["profiles"][name]
+        p = self.store.get(name)
         self.var_folder.set(p.get("folder", ""))
         self.var_exe.set(p.get("exe", ""))
         self.var_args.set(p.get("args", "-vrmode openvr"))
+        self.presets.set(p.get("presets", []))
+        self.var_timing.set(bool(p.get("timing", False)))
+        self.var_priority.set(p.get("priority", ""))
+        self.var_affinity.set(p.get("affinity", ""))
+        env = p.get("env", "")
+        self.var_env.set(patch.format_env(env) if isinstance(env, dict) else env)
+
+    def _profile(self, folder, exe, args):
+        return {"folder": folder, "exe": exe, "args": args, "timing": self.var_timing.get(),
+                "priority": self.var_priority.get(), "affinity": self.var_affinity.get().strip(),
+                "env": self._env_field(), "presets": self.presets.get()}
+
+    def _launch(self):
+        # Validated launch options, or None after logging the problem
+        try:
+            return patch.launch_options({"priority": self.var_priority.get(),
+                                         "affinity": self.var_affinity.get(),
+                                         "env": self.var_env.get()})
+        except ValueError as e:
+            self.log_err(str(e))
+            return None
+
+    def _update_final(self):
+        try:
+            line, notes = vr_presets.compose(self.presets.get(), self.var_args.get())
+        except (OSError, ValueError) as e:
+            self.var_final.set(f"FINAL: {e}"); return
+        self.var_final.set(f"FINAL: {line}" + (f"   ({len(notes)} overridden)" if notes else ""))
+
+    def _compose(self, args):
+        # Final command line from presets + free-text args, or None after logging the problem
+        try:
+            line, notes = vr_presets.compose(self.presets.get(), args)
+        except (OSError, ValueError) as e:
+            self.log_err(str(e))
+            return None
+        if self.presets.get():
+            self.log_dim(f"Arguments: {line}")
+        for n in notes:
+            self.log_dim(f"  {n}")
+        return line
+
+    def _env_field(self):
+        text = self.var_env.get().strip()
+        try:
+            return patch.parse_env(text)
+        except ValueError:
+            return text    # kept as typed; apply reports the error
 
     def save_profile(self):
+        if not self._ready(): return
         folder, exe, args = self._get_inputs()
         if not folder or not exe or not args: return
         dlg = _InputDialog(self, "Save Profile", "Profile name:",
                            suggestion=os.path.basename(folder))
         name = dlg.result
         if not name: return
-        self.cfg["profiles"][name] = {"folder": folder, "exe": exe, "args": args}
-        self.cfg["last_profile"] = name
-        save_config(self.cfg)
-        self._refresh_profile_menu()
+        self.store.put(name, self._profile(folder, exe, args))
+        self.store.set_setting("last_profile", name)
+        self.picker.add(name, folder)
         self.var_profile.set(name)
         self.log_purple(f"Profile saved: '{name}'")
 
     def delete_profile(self):
+        if not self._ready(): return
         name = self.var_profile.get()
-        if name not in self.cfg["profiles"]:
+        if name not in self.store:
             self.log_warn("No valid profile selected."); return
         if not messagebox.askyesno("Delete Profile", f"Delete '{name}'?"):
             return
-        del self.cfg["profiles"][name]
-        if self.cfg.get("last_profile") == name:
-            self.cfg["last_profile"] = ""
-        save_config(self.cfg)
-        self._refresh_profile_menu()
+        self.store.delete(name)
+        if self.store.get_setting("last_profile") == name:
+            self.store.set_setting("last_profile", "")
+        self.picker.remove(name)
         self.log_warn(f"Profile deleted: '{name}'")
 
     def check_status(self):
-        folder, exe, _ = self._get_inputs()
+        folder, exe, args = self._get_inputs()
         if not folder or not exe: return
-        base = os.path.splitext(exe)[0]
-        self.log_dim("─── Status Check ─────────────────────")
-        real_exe  = os.path.join(folder, f"{base}Real.exe")
-        real_data = os.path.join(folder, f"{base}Real_Data")
-        wrap_exe  = os.path.join(folder, exe)
-        if os.path.exists(real_exe):
-            self.log_ok(f"Real EXE found: {base}Real.exe")
-        else:
-            self.log_warn("Real EXE not found — wrapper not applied")
-        if os.path.exists(real_data):
-            self.log_ok("Real Data folder found")
-        else:
-            self.log_warn("Real Data folder missing")
-        if os.path.exists(wrap_exe):
-            size = os.path.getsize(wrap_exe)
-            if size < 100_000:
-                self.log_ok(f"Wrapper is active ({size//1024} KB — small = wrapper)")
-            else:
-                self.log_dim(f"Wrapper not applied ({size//1024} KB — original)")
+        final = self._compose(args)   # what the last launch should have had
+        self.runner.submit("Status check", lambda t: patch.wrapper_status(folder, exe, t.log, final))
 
     def apply_wrapper(self):
         folder, exe, args = self._get_inputs()
-        if not folder or not exe or not args: return
-        base      = os.path.splitext(exe)[0]
-        orig_exe  = os.path.join(folder, exe)
-        real_exe  = os.path.join(folder, f"{base}Real.exe")
-        orig_data = os.path.join(folder, f"{base}_Data")
-        real_data = os.path.join(folder, f"{base}Real_Data")
-
-        self.log_dim("─── Applying Wrapper ─────────────────")
-
-        if not os.path.exists(real_exe):
-            if not os.path.exists(orig_exe):
-                self.log_err(f"EXE not found: {exe}"); return
-            os.rename(orig_exe, real_exe)
-            self.log_ok(f"{exe} → {base}Real.exe")
-        else:
-            self.log_dim(f"{base}Real.exe already exists, skipped")
-
-        if os.path.exists(orig_data) and not os.path.exists(real_data):
-            os.rename(orig_data, real_data)
-            self.log_ok(f"{base}_Data → {base}Real_Data")
-        elif os.path.exists(real_data):
-            self.log_dim(f"{base}Real_Data already exists, skipped")
-
-        csc = next((p for p in CSC_PATHS if os.path.exists(p)), None)
-        if not csc:
-            self.log_err("csc.exe not found! Is .NET Framework 4.x installed?"); return
-        self.log_ok(f"Compiler: {os.path.basename(csc)}")
-
-        cs_code  = WRAPPER_TEMPLATE.format(real_exe=f"{base}Real.exe",
-                                            vr_args=args.replace('"', '\\"'))
-        cs_path  = os.path.join(folder, "_wrapper_temp.cs")
-        out_path = os.path.join(folder, exe)
-
-        with open(cs_path, "w", encoding="utf-8") as f:
-            f.write(cs_code)
-
-        self.log_dim("Compiling...")
-        try:
-            result = subprocess.run([csc, f"/out:{out_path}", "/target:winexe", cs_path],
-                                    capture_output=True, text=True)
-            if os.path.exists(out_path):
-                self.log_ok(f"Wrapper EXE created: {exe}")
+        if not folder or not exe: return
+        timing = self.var_timing.get()
+        launch = self._launch()
+        if launch is None: return
+        final = self._compose(args)
+        if final is None: return
+
+        def done(ok):
+            if ok:
                 self.log_ok("Done! You can now launch normally from Steam.")
                 self._auto_save_profile(folder, exe, args)
-            else:
-                self.log_err("Compilation failed!")
-                if result.stderr: self.log_warn(result.stderr[:300])
-        except Exception as e:
-            self.log_err(f"Compilation error: {e}")
-        finally:
-            if os.path.exists(cs_path):
-                os.remove(cs_path)
+
+        self.runner.submit("Apply wrapper",
+                           lambda t: patch.apply_wrapper(folder, exe, final, t.log, t.cancel_event,
+                                                         timing, launch),
+                           on_done=done)
 
     def _auto_save_profile(self, folder, exe, args):
+        if not self._ready(): return
         name = os.path.basename(folder)
-        if name not in self.cfg["profiles"]:
-            self.cfg["profiles"][name] = {"folder": folder, "exe": exe, "args": args}
-            self.cfg["last_profile"] = name
-            save_config(self.cfg)
-            self._refresh_profile_menu()
+        if name not in self.store:
+            self.store.put(name, self._profile(folder, exe, args))
+            self.store.set_setting("last_profile", name)
+            self.picker.add(name, folder)
             self.var_profile.set(name)
             self.log_purple(f"Profile auto-saved: '{name}'")
 
     def undo_wrapper(self):
         folder, exe, _ = self._get_inputs()
         if not folder or not exe: return
-        base      = os.path.splitext(exe)[0]
-        wrap_exe  = os.path.join(folder, exe)
-        real_exe  = os.path.join(folder, f"{base}Real.exe")
-        orig_data = os.path.join(folder, f"{base}_Data")
-        real_data = os.path.join(folder, f"{base}Real_Data")
-
-        self.log_dim("─── Undoing Wrapper ──────────────────")
-        if not os.path.exists(real_exe):
-            self.log_warn("Real EXE not found — wrapper already removed?"); return
-        if os.path.exists(wrap_exe):
-            os.remove(wrap_exe)
-            self.log_ok(f"Wrapper deleted: {exe}")
-        os.rename(real_exe, wrap_exe)
-        self.log_ok(f"{base}Real.exe → {exe}")
-        if os.path.exists(real_data) and not os.path.exists(orig_data):
-            os.rename(real_data, orig_data)
-            self.log_ok(f"{base}Real_Data → {base}_Data")
-        self.log_ok("Undo complete.")
+        self.runner.submit("Undo wrapper", lambda t: patch.undo_wrapper(folder, exe, t.log))
 
     def _get_inputs(self):
         folder = self.var_folder.get().strip()
@@ -421,19 +508,26 @@ class App(tk.Tk):
             self.log_err(f"Folder not found: {folder}"); ok = False
         if not exe and ok:
             self.log_err("EXE name is empty!"); ok = False
-        if not args and ok:
+        if not args and not self.presets.get() and ok:
             self.log_err("Arguments cannot be empty!"); ok = False
         if not ok: return None, None, None
         return folder, exe, args
 
     def on_close(self):
-        folder = self.var_folder.get().strip()
-        exe    = self.var_exe.get().strip()
-        args   = self.var_args.get().strip()
-        last   = self.cfg.get("last_profile", "")
-        if last and last in self.cfg["profiles"]:
-            self.cfg["profiles"][last] = {"folder": folder, "exe": exe, "args": args}
-            save_config(self.cfg)
+        if self.runner.busy:
+            if not messagebox.askyesno("Quit", "An operation is still running. Cancel it and quit?"):
+                return
+        self.runner.shutdown()
+        if self.store is not None:
+            folder = self.var_folder.get().strip()
+            exe    = self.var_exe.get().strip()
+            args   = self.var_args.get().strip()
+            last   = self.store.get_setting("last_profile", "")
+            if last and last in self.store:
+                # Only rewrites the row when a field actually changed
+                self.store.put(last, self._profile(folder, exe, args))
+            self.store.close()
+        self.log_sink.close()
         self.destroy()
 
 
@@ -488,5 +582,5 @@ class _InputDialog(tk.Toplevel):
 
 
 if __name__ == "__main__":
-    app = App()
+    app = App(vr_startup.StartupTimer(_T0), report_timing=vr_startup.requested())
     app.mainloop()